@@ -1,11 +1,14 @@
 from pathlib import Path
 import argparse
+import time
 import yaml
 
 # Ensure registries populate
 import core.metrics
 from core.metrics.registry import (
     METRICS_REGISTRY,
+    to_arrays,
+    to_builtin,
 )
 
 import core.artifacts
@@ -13,6 +16,22 @@ from core.artifacts.registry import (
     ARTIFACTS_REGISTRY,
 )
 
+import core.tallies
+from core.tallies.registry import get_tally_blocks
+
+from core.pipeline.graph import Node, run_graph
+from core.pipeline.memo import Memo
+from core.pipeline import trace
+from core.pipeline.scrape import (
+    RESULTS_FILE,
+    ResultsStore,
+    is_stale,
+    scrape_results,
+)
+from core.pipeline.snapshot import METRICS_FILE, write_metrics
+from core.pipeline.surrogate import build_surrogates
+from core.pipeline.validate import parse_entry
+
 
 # ---------------------------------------------------------
 # Utilities
@@ -36,7 +55,7 @@ def build_context(study_results_dir):
 
     study_results_dir = Path(study_results_dir)
 
-    runs_dir = study_results_dir / "runs"
+    runs_dir = study_results_dir / "cases"
 
     cases = []
 
@@ -49,15 +68,42 @@ def build_context(study_results_dir):
                     "params": case_dir / "params.json",
                 })
 
+    results_path = study_results_dir / RESULTS_FILE
+
     context = {
         "study_dir": study_results_dir,
         "runs_dir": runs_dir,
         "cases": cases,
+        "results": (
+            ResultsStore(results_path) if results_path.exists() else None
+        ),
     }
 
     return context
 
 
+# ---------------------------------------------------------
+# Ingest
+# ---------------------------------------------------------
+
+def ingest(study_results_dir):
+    """
+    Rebuilds results.h5 from the case statepoints when it is missing or
+    older than any of them, using the tallies of the frozen study.
+    """
+    study_results_dir = Path(study_results_dir)
+
+    if not is_stale(study_results_dir):
+        return
+
+    frozen = load_yaml(study_results_dir / "study_frozen.yaml")
+    tally_blocks = get_tally_blocks(frozen.get("tallies", []))
+
+    print("[INGEST] scraping case statepoints")
+    with trace.stage("scrape"):
+        scrape_results(study_results_dir, tally_blocks)
+
+
 # ---------------------------------------------------------
 # Requirement Checking
 # ---------------------------------------------------------
@@ -69,8 +115,9 @@ def check_metric_requirements(func, available_observables):
     missing = [r for r in req if r not in available_observables]
 
     if missing:
+        name = getattr(func, "type_name", None) or func.__name__
         raise RuntimeError(
-            f"Result '{func.__name__}' missing observables: {missing}"
+            f"Result '{name}' missing observables: {missing}"
         )
 
 
@@ -81,8 +128,9 @@ def check_artifact_requirements(func, results_store):
     missing = [r for r in req if r not in results_store]
 
     if missing:
+        name = type(func).__name__
         raise RuntimeError(
-            f"Deliverable '{func.__name__}' missing results: {missing}"
+            f"Deliverable '{name}' missing results: {missing}"
         )
 
 
@@ -90,14 +138,25 @@ def check_artifact_requirements(func, results_store):
 # Processing Pipeline
 # ---------------------------------------------------------
 
-def process(study_name):
+def process(study_name, jobs=1, use_memo=True, evict=False,
+            trace_format="jsonl", profile=(), export_yaml=False):
     studies_root = Path("studies")
     # load analysis
     study_root = studies_root / study_name
     analysis_path = study_root / 'analysis.yaml'
     analysis = load_yaml(analysis_path)
 
-    context = build_context(study_root)
+    # results of the study live under runs/<name>/
+    study_results_dir = Path("runs") / analysis.get("name", study_name)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = "json" if trace_format == "chrome" else "jsonl"
+    trace.start(study_results_dir / "trace" / f"analyze-{stamp}.{suffix}",
+                fmt=trace_format, profile=profile,
+                profile_dir=study_results_dir / "trace" / f"profile-{stamp}")
+
+    ingest(study_results_dir)
+    context = build_context(study_results_dir)
 
     results_store = {}
 
@@ -105,18 +164,16 @@ def process(study_name):
     available_observables = set(
         analysis.get("available_observables", [])
     )
+    if context["results"] is not None:
+        available_observables |= set(context["results"].tally_names)
 
     # ------------------------------
     # METRICS
     # ------------------------------
+    nodes = {}
     for entry in analysis.get("metrics", []):
 
-        if isinstance(entry, dict):
-            name = entry["name"]
-            cfg = entry
-        else:
-            name = entry
-            cfg = {}
+        name, cfg = parse_entry(entry)
 
         if name not in METRICS_REGISTRY:
             raise RuntimeError(f"Unknown result '{name}'")
@@ -125,40 +182,65 @@ def process(study_name):
 
         check_metric_requirements(func, available_observables)
 
-        print(f"[METRIC] {name}")
-
-        output = func(context, cfg)
-
-        results_store[name] = output
-
-    # Write results.yaml at study root
-    metrics_yaml_path = Path(study_results_dir) / "metrics.yaml"
-    write_yaml(metrics_yaml_path, results_store)
+        deps = getattr(func, "requires_results", [])
+        nodes[name] = Node(name, "metric", func, cfg, deps)
 
-    print(f"Wrote metrics.yaml → {metrics_yaml_path}")
+    metric_names = list(nodes)
 
     # ------------------------------
     # DELIVERABLES
     # ------------------------------
     for entry in analysis.get("artifacts", []):
 
-        if isinstance(entry, dict):
-            name = entry["name"]
-            cfg = entry
-        else:
-            name = entry
-            cfg = {}
+        name, cfg = parse_entry(entry)
 
         if name not in ARTIFACTS_REGISTRY:
             raise RuntimeError(f"Unknown deliverable '{name}'")
 
         func = ARTIFACTS_REGISTRY[name]
 
-        check_artifact_requirements(func, results_store)
+        check_artifact_requirements(func, metric_names)
 
-        print(f"[ARIFACT] {name}")
+        # artifacts are handed every metric's output, so they wait for
+        # all metrics; requires_results is only checked above
+        nodes[name] = Node(name, "artifact", func, cfg, metric_names)
+
+    # ------------------------------
+    # EVALUATE
+    # ------------------------------
+    memo = None
+    if use_memo:
+        memo = Memo(study_results_dir / "analysis_cache")
 
-        func(context, cfg, results_store)
+    results_store = run_graph(nodes, context, jobs=jobs, memo=memo)
+
+    if memo is not None and evict:
+        removed = memo.evict()
+        print(f"Evicted {removed} stale analysis cache entries")
+
+    # metrics.h5 at study root, in declaration order; Estimates from
+    # any path (compute, compute_batch, the memo) become arrays
+    results_store = {n: to_arrays(results_store[n]) for n in metric_names}
+    cases = context["results"].cases if context["results"] else None
+    metrics_path = write_metrics(study_results_dir, results_store, cases)
+    print(f"Wrote {METRICS_FILE} → {metrics_path}")
+
+    # optional human-readable copy
+    if export_yaml:
+        metrics_yaml_path = Path(study_results_dir) / "metrics.yaml"
+        write_yaml(metrics_yaml_path, to_builtin(results_store))
+        print(f"Wrote metrics.yaml → {metrics_yaml_path}")
+
+    # ------------------------------
+    # SURROGATES
+    # ------------------------------
+    surrogate_cfg = analysis.get("surrogate")
+    if surrogate_cfg:
+        if context["results"] is None:
+            raise RuntimeError("Surrogates need results.h5; no cases found.")
+        with trace.stage("surrogate"):
+            build_surrogates(study_results_dir, context["results"],
+                             results_store, surrogate_cfg)
 
 
 # ---------------------------------------------------------
@@ -168,11 +250,36 @@ def process(study_name):
 def main():
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("study_results_dir", help="results/<study>/")
+    parser.add_argument("study", help="Name of study")
+    parser.add_argument("-j", "--jobs",
+                        type=int, default=1,
+                        help="Metrics/artifacts evaluated concurrently")
+    parser.add_argument("--no-memo",
+                        action="store_true",
+                        help="Recompute every metric and artifact")
+    parser.add_argument("--evict",
+                        action="store_true",
+                        help="Drop cached results not used by this run")
+    parser.add_argument("--trace-format",
+                        choices=["jsonl", "chrome"], default="jsonl",
+                        help="Format of runs/<study>/trace/ files")
+    parser.add_argument("--profile",
+                        nargs="+", default=[], metavar="STAGE",
+                        help="Run these stages under cProfile "
+                             "(e.g. scrape metric:keff)")
+    parser.add_argument("--yaml",
+                        action="store_true",
+                        help="Also export metrics.yaml next to metrics.h5")
 
     args = parser.parse_args()
 
-    process(args.study_results_dir)
+    try:
+        process(args.study, jobs=args.jobs,
+                use_memo=not args.no_memo, evict=args.evict,
+                trace_format=args.trace_format, profile=args.profile,
+                export_yaml=args.yaml)
+    finally:
+        trace.stop()
 
 
 if __name__ == "__main__":
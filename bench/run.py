@@ -0,0 +1,244 @@
+"""
+Benchmarks for everything around transport: YAML parsing, tally
+blocks, model build, XML export, plotting, the transport call itself
+(with a stub executable), scraping and the metric graph.
+
+    python -m bench.run --scales 10 100 1000 --tallies 4 --bins 10000 \
+        --output bench.jsonl
+
+Each stage at each scale emits one JSON line with wall and CPU time,
+so runs can be diffed for regressions. A stage is only skipped when
+an optional dependency is missing; any other error fails the run.
+"""
+import argparse
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class Skipped(Exception):
+    """
+    Raised by a stage that cannot run in this environment.
+    """
+
+
+def missing_dependency(err):
+    """
+    True for an import error of a module outside this repository.
+    """
+    if not isinstance(err, ModuleNotFoundError) or not err.name:
+        return False
+    top = err.name.split(".")[0]
+    return not ((ROOT / top).is_dir() or (ROOT / f"{top}.py").exists())
+
+
+# ---------------------------------------------------------
+# timing
+# ---------------------------------------------------------
+def timed(fn):
+    wall, cpu = time.perf_counter(), time.process_time()
+    fn()
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+def git_revision():
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                         cwd=ROOT, capture_output=True, text=True)
+    return out.stdout.strip() or None
+
+
+def stub_path(tmp):
+    """
+    Directory holding an `openmc4d` wrapper around stub_openmc4d.py.
+    """
+    bin_dir = Path(tmp) / "bin"
+    bin_dir.mkdir()
+    exe = bin_dir / "openmc4d"
+    exe.write_text(
+        "#!/bin/sh\n"
+        f'exec "{sys.executable}" "{ROOT / "bench" / "stub_openmc4d.py"}" "$@"\n'
+    )
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    return bin_dir
+
+
+# ---------------------------------------------------------
+# stages: each returns a callable timed at a given scale
+# ---------------------------------------------------------
+def stage_yaml(scale, args, tmp):
+    study = {
+        "name": "bench",
+        "model": "bench",
+        "params": {f"p{i}": list(range(8)) for i in range(scale)},
+        "tallies": ["integral-set"] * scale,
+    }
+    text = yaml.safe_dump(study)
+    return lambda: yaml.safe_load(text)
+
+
+def stage_tally_blocks(scale, args, tmp):
+    import core.tallies
+    from core.tallies.registry import get_tally_blocks
+    entries = ["absorption", "fission", "nu-fission", "integral-set"] * scale
+    return lambda: get_tally_blocks(entries)
+
+
+def stage_model_build(scale, args, tmp):
+    from bench.synthetic import build_synthetic_model
+    return lambda: build_synthetic_model(scale)
+
+
+def stage_export_xml(scale, args, tmp):
+    from bench.synthetic import build_synthetic_model
+    model = build_synthetic_model(scale)
+    out = Path(tmp) / "export"
+    out.mkdir()
+    return lambda: model.export_to_xml(str(out))
+
+
+def stage_plot(scale, args, tmp):
+    if not args.plot:
+        raise Skipped("needs --plot and a real openmc4d")
+    from bench.synthetic import build_synthetic_model
+    from core.pipeline.plot import plot_slice
+    model = build_synthetic_model(scale)
+    cfg = {"basis": "xy", "width": [scale, 2], "pixels": 100000}
+    return lambda: plot_slice(model, tmp, "bench", **cfg)
+
+
+def stage_transport(scale, args, tmp):
+    from bench.synthetic import build_synthetic_model
+    from core.pipeline.run import run_case
+
+    n_cases = min(scale, args.transport_cases)
+    case_dirs = []
+    for i in range(n_cases):
+        case_dir = Path(tmp) / f"case_{i:04d}"
+        case_dir.mkdir()
+        build_synthetic_model(10).export_to_xml(str(case_dir))
+        case_dirs.append(case_dir)
+
+    bin_dir = stub_path(tmp)
+
+    def transport():
+        # the stub shadows openmc4d only while this stage runs
+        path = os.environ["PATH"]
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{path}"
+        try:
+            return [run_case(d) for d in case_dirs]
+        finally:
+            os.environ["PATH"] = path
+
+    return transport
+
+
+def stage_scrape(scale, args, tmp):
+    from bench.synthetic import make_runs, synthetic_blocks
+    from core.pipeline.scrape import scrape_results
+    runs = make_runs(Path(tmp) / "runs", scale, args.tallies, args.bins)
+    blocks = synthetic_blocks(args.tallies, args.bins)
+    return lambda: scrape_results(runs, blocks)
+
+
+def stage_analyze(scale, args, tmp):
+    import analyze
+    from bench.synthetic import make_runs, synthetic_blocks
+    from core.metrics.registry import METRICS_REGISTRY
+    from core.pipeline.graph import Node, run_graph
+    from core.pipeline.scrape import scrape_results
+
+    runs = make_runs(Path(tmp) / "runs", scale, args.tallies, args.bins)
+    scrape_results(runs, synthetic_blocks(args.tallies, args.bins))
+    context = analyze.build_context(runs)
+    metric = METRICS_REGISTRY["production-ratio"]
+    nodes = {"production-ratio":
+             Node("production-ratio", "metric", metric, {}, [])}
+    return lambda: run_graph(nodes, context)
+
+
+STAGES = {
+    "yaml": stage_yaml,
+    "tally_blocks": stage_tally_blocks,
+    "model_build": stage_model_build,
+    "export_xml": stage_export_xml,
+    "plot": stage_plot,
+    "transport": stage_transport,
+    "scrape": stage_scrape,
+    "analyze": stage_analyze,
+}
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+",
+                        default=[10, 100, 1000],
+                        help="Cases (and model cells) per scale step")
+    parser.add_argument("--tallies", type=int, default=4,
+                        help="Synthetic mesh tallies per statepoint")
+    parser.add_argument("--bins", type=int, default=1000,
+                        help="Mesh bins per synthetic tally")
+    parser.add_argument("--transport-cases", type=int, default=20,
+                        help="Cap on stub transport runs per scale")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES),
+                        choices=list(STAGES))
+    parser.add_argument("--plot", action="store_true",
+                        help="Include geometry plotting (real openmc4d)")
+    parser.add_argument("--output", default=None,
+                        help="Append JSON lines to this file")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    revision = git_revision()
+    out = open(args.output, "a") if args.output else None
+    failed = False
+
+    for scale in args.scales:
+        for name in args.stages:
+            record = {
+                "stage": name,
+                "scale": scale,
+                "tallies": args.tallies,
+                "bins": args.bins,
+                "revision": revision,
+                "timestamp": time.time(),
+            }
+            with tempfile.TemporaryDirectory() as tmp:
+                try:
+                    fn = STAGES[name](scale, args, tmp)
+                    record["wall_time"], record["cpu_time"] = timed(fn)
+                except Exception as err:
+                    reason = f"{type(err).__name__}: {err}"
+                    if isinstance(err, Skipped) or missing_dependency(err):
+                        record["skipped"] = reason
+                    else:
+                        traceback.print_exc()
+                        record["error"] = reason
+                        failed = True
+
+            line = json.dumps(record)
+            print(line)
+            if out:
+                out.write(line + "\n")
+                out.flush()
+
+    if out:
+        out.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Stand-in for the openmc4d executable. Reads the tally names and
+scores from tallies.xml in the working directory and writes a
+synthetic statepoint.<batches>.h5, so the pipeline around transport
+can be timed without running any physics.
+"""
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench.synthetic import write_statepoint
+
+
+def main():
+    if "--version" in sys.argv or "-v" in sys.argv:
+        print("OpenMC version 0.0.0 (stub)")
+        return
+
+    cwd = Path.cwd()
+    batches = 20
+    settings = cwd / "settings.xml"
+    if settings.exists():
+        node = ET.parse(settings).getroot().find("batches")
+        if node is not None:
+            batches = int(node.text)
+
+    tallies = {}
+    tallies_xml = cwd / "tallies.xml"
+    if tallies_xml.exists():
+        for t in ET.parse(tallies_xml).getroot().iter("tally"):
+            scores = (t.findtext("scores") or "flux").split()
+            tallies[t.get("name") or f"tally {t.get('id')}"] = (1, scores)
+
+    print(" Simulating batch 1")
+    write_statepoint(cwd / f"statepoint.{batches}.h5", tallies,
+                     batches=batches)
+    print(" Creating state point")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+from core.tallies.integral import extract_1d
+from core.tallies.registry import Tally
+
+
+# ---------------------------------------------------------
+# statepoint: files with the layout StatepointReader expects
+# ---------------------------------------------------------
+def write_statepoint(path, tallies, batches=20, seed=0):
+    """
+    tallies maps name -> (n_bins, scores). Results hold random sums
+    with consistent sums of squares over `batches` realizations.
+    """
+    rng = np.random.default_rng(seed)
+    with h5py.File(path, "w") as f:
+        f.attrs["filetype"] = np.bytes_("statepoint")
+        f["current_batch"] = batches
+        f["k_combined"] = np.array([1.0 + 0.01 * rng.standard_normal(),
+                                    1e-3])
+
+        group = f.create_group("tallies")
+        group.attrs["ids"] = np.arange(1, len(tallies) + 1)
+        for tally_id, (name, (n_bins, scores)) in enumerate(
+                tallies.items(), start=1):
+            t = group.create_group(f"tally {tally_id}")
+            t["name"] = np.bytes_(name)
+            t["n_realizations"] = batches
+            t["score_bins"] = np.array([np.bytes_(s) for s in scores])
+            t["nuclides"] = np.array([np.bytes_("total")])
+
+            total = rng.random((n_bins, len(scores))) * batches
+            spread = 1.0 + 0.01 * rng.random((n_bins, len(scores)))
+            results = np.empty((n_bins, len(scores), 2))
+            results[..., 0] = total
+            results[..., 1] = total**2 / batches * spread
+            t["results"] = results
+
+
+# ---------------------------------------------------------
+# study: a runs/<study>/ tree of synthetic cases
+# ---------------------------------------------------------
+BASE_TALLIES = {
+    "absorption": (1, ["absorption"]),
+    "nu-fission": (1, ["nu-fission"]),
+}
+
+
+def synthetic_tallies(n_tallies, n_bins):
+    tallies = dict(BASE_TALLIES)
+    for i in range(n_tallies):
+        tallies[f"mesh-{i}"] = (n_bins, ["flux"])
+    return tallies
+
+
+def make_runs(root, n_cases, n_tallies, n_bins):
+    """
+    Writes runs/<study>/cases/case_XXXX with params.json and a
+    statepoint.h5 each. Returns the runs root.
+    """
+    root = Path(root)
+    tallies = synthetic_tallies(n_tallies, n_bins)
+    for i in range(n_cases):
+        case_dir = root / "cases" / f"case_{i + 1:04d}"
+        case_dir.mkdir(parents=True, exist_ok=True)
+        with open(case_dir / "params.json", "w") as f:
+            json.dump({"tube_radius": 1.0 + i / max(n_cases, 1)}, f)
+        write_statepoint(case_dir / "statepoint.h5", tallies, seed=i)
+    return root
+
+
+class SyntheticTally(Tally):
+    """
+    Reads one synthetic tally by name; stands in for user blocks.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.type_name = name
+
+    def extract(self, statepoint):
+        return extract_1d(statepoint, self.name)
+
+
+def synthetic_blocks(n_tallies, n_bins):
+    return [SyntheticTally(n) for n in synthetic_tallies(n_tallies, n_bins)]
+
+
+# ---------------------------------------------------------
+# model: n slab cells, each with its own material
+# ---------------------------------------------------------
+def build_synthetic_model(n_cells, particles=1000, batches=20):
+    import openmc4d as mc
+
+    xs = [mc.XPlane(x0=float(i)) for i in range(n_cells + 1)]
+    xs[0].boundary_type = "vacuum"
+    xs[-1].boundary_type = "vacuum"
+    y0, y1 = mc.YPlane(y0=-1.0), mc.YPlane(y0=1.0)
+    z0, z1 = mc.ZPlane(z0=-1.0), mc.ZPlane(z0=1.0)
+    for s in (y0, y1, z0, z1):
+        s.boundary_type = "reflective"
+
+    materials, cells = [], []
+    for i in range(n_cells):
+        m = mc.Material()
+        m.add_nuclide("U235", 1e-3 * (1 + i % 7))
+        m.add_nuclide("H1", 6e-2)
+        m.set_density("g/cm3", 1.0)
+        materials.append(m)
+        region = +xs[i] & -xs[i + 1] & +y0 & -y1 & +z0 & -z1
+        cells.append(mc.Cell(fill=m, region=region))
+
+    model = mc.Model()
+    model.materials = mc.Materials(materials)
+    model.geometry = mc.Geometry(cells)
+    model.settings = mc.Settings()
+    model.settings.particles = particles
+    model.settings.batches = batches
+    model.settings.inactive = batches // 2
+    return model
@@ -0,0 +1,6 @@
+# =================================
+# Add user artifacts here
+#   name -> module (relative to this package), imported on first use
+# =================================
+MANIFEST = {
+}
@@ -1,4 +1,6 @@
-ARTIFACTS_REGISTRY = {}
+from core.lazy import LazyRegistry
+
+ARTIFACTS_REGISTRY = LazyRegistry("core.artifacts", "artifact")
 
 
 def register_artifact(name):
@@ -6,10 +8,10 @@ def register_artifact(name):
     Decorator used by artifacts to register themselves.
     """
     def decorator(cls):
-        if name in ARTIFACTS_REGISTRY:
+        if ARTIFACTS_REGISTRY.is_loaded(name):
             raise ValueError(f"Artifact '{name}' already registered.")
         
-        ARTIFACTS_REGISTRY[name] = cls()
+        ARTIFACTS_REGISTRY.register(name, cls())
         return cls
     return decorator
 
@@ -0,0 +1,142 @@
+import importlib
+import importlib.util
+import sys
+from collections.abc import Mapping
+
+
+# ---------------------------------------------------------
+# lazy_import: defer loading a heavy dependency until used
+# ---------------------------------------------------------
+class _Missing:
+    """
+    Placeholder for an uninstalled module; fails on first use, not
+    on import, so stages that never touch it still run.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        raise ImportError(f"No module named '{self._name}'")
+
+
+def lazy_import(name):
+    """
+    Returns module `name`, executed only on first attribute access.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _Missing(name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# ---------------------------------------------------------
+# registry: entries resolved from a package manifest
+# ---------------------------------------------------------
+class LazyRegistry(Mapping):
+    """
+    Registry whose entries are imported on first lookup.
+
+    `package` must define MANIFEST = {name: module}, module being
+    relative to the package. Looking up a name imports only its
+    module, whose register_* decorator then fills the entry.
+    Iterating lists every declared name without importing anything.
+
+    A manifest module that does not exist makes its names unknown
+    (KeyError). Once a module is imported, its decorators must
+    register exactly the names the manifest maps to it.
+    """
+
+    def __init__(self, package, kind):
+        self.package = package
+        self.kind = kind
+        self._entries = {}
+        self._manifest = None
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            pkg = importlib.import_module(self.package)
+            self._manifest = dict(getattr(pkg, "MANIFEST", {}))
+        return self._manifest
+
+    # -----------------------------
+    # used by register_* decorators
+    # -----------------------------
+    def is_loaded(self, name):
+        return name in self._entries
+
+    def register(self, name, entry):
+        self._entries[name] = entry
+
+    # -----------------------------
+    # loading
+    # -----------------------------
+    def load(self, module):
+        """
+        Imports a manifest module and checks what it registered.
+        Returns False if the module does not exist.
+        """
+        full_name = importlib.util.resolve_name(module, self.package)
+        before = set(self._entries)
+        try:
+            importlib.import_module(full_name)
+        except ModuleNotFoundError as err:
+            if err.name != full_name:
+                raise
+            return False
+
+        declared = {n for n, m in self.manifest.items() if m == module}
+        missing = sorted(declared - set(self._entries))
+        if missing:
+            raise RuntimeError(
+                f"{self.package}.MANIFEST maps {missing} to {module}, "
+                f"which does not register them as a {self.kind}"
+            )
+        extra = sorted(set(self._entries) - before - set(self.manifest))
+        if extra:
+            raise RuntimeError(
+                f"{full_name} registers {self.kind} names missing from "
+                f"{self.package}.MANIFEST: {extra}"
+            )
+        return True
+
+    def check(self):
+        """
+        Imports every manifest module, raising on any disagreement
+        between the manifest and the decorators.
+        """
+        for module in sorted(set(self.manifest.values())):
+            if not self.load(module):
+                raise RuntimeError(
+                    f"{self.package}.MANIFEST lists missing module {module}"
+                )
+
+    # -----------------------------
+    # mapping interface
+    # -----------------------------
+    def __getitem__(self, name):
+        if name not in self._entries and name in self.manifest:
+            self.load(self.manifest[name])
+        if name not in self._entries:
+            raise KeyError(name)
+        return self._entries[name]
+
+    def __contains__(self, name):
+        return name in self._entries or name in self.manifest
+
+    def __iter__(self):
+        yield from self.manifest
+        yield from (n for n in self._entries if n not in self.manifest)
+
+    def __len__(self):
+        return len(set(self.manifest) | set(self._entries))
@@ -1,4 +1,8 @@
 # =================================
 # Add user metrics here
+#   name -> module (relative to this package), imported on first use
 # =================================
-from . import metric
\ No newline at end of file
+MANIFEST = {
+    "example_metric": ".metric",
+    "production-ratio": ".metric",
+}
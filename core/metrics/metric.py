@@ -1,6 +1,44 @@
-from .registry import register_metric
+from core.lazy import lazy_import
+from core.tallies.stats import Estimate
+from .registry import register_metric, Metric
+
+np = lazy_import("numpy")
+
 
 @register_metric("example_metric")
-class Metric:
-    def compute():
-        pass
\ No newline at end of file
+class ExampleMetric(Metric):
+    def compute(self, context, cfg):
+        pass
+
+
+def _case_totals(observable):
+    # (cases, ...) -> (cases,), summed over every bin
+    est = Estimate.from_observable(observable)
+    return est.reshape(est.shape[0], -1).sum(axis=1)
+
+
+# ---------------------------------------------------------
+# production ratio: nu-fission / absorption over the sweep
+# ---------------------------------------------------------
+@register_metric("production-ratio")
+class ProductionRatio(Metric):
+    """
+    nu-fission / absorption of each case. Both tallies score the same
+    histories and are positively correlated, so propagating their
+    errors as independent overstates the ratio's std_dev: the error
+    bar reported here is conservative. For a tight one, bootstrap the
+    ratio over interval_batches (core.tallies.stats).
+    """
+    requires_observables = ['nu-fission', 'absorption']
+
+    def compute_batch(self, observables, cfg):
+        ratio = (_case_totals(observables['nu-fission'])
+                 / _case_totals(observables['absorption']))
+        return {
+            'per_case': ratio,
+            'aggregate': {
+                'min': np.nanmin(ratio.mean),
+                'max': np.nanmax(ratio.mean),
+                'mean': np.nanmean(ratio.mean),
+            },
+        }
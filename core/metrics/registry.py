@@ -1,10 +1,18 @@
+from core.lazy import LazyRegistry, lazy_import
+from core.tallies.stats import Estimate
 
-METRICS_REGISTRY = {}
+np = lazy_import("numpy")
+
+METRICS_REGISTRY = LazyRegistry("core.metrics", "metric")
 
 class Metric:
     default_config = {}
 
     type_name = None
+
+    # tally block names this metric reads from the results store
+    requires_observables = []
+
     def merge_config(self, user_cfg):
         cfg = dict(self.default_config)
 
@@ -19,8 +27,66 @@ class Metric:
         else:
             setattr(self, 'name', f'{self.type_name}:{instance_name}')
 
-    def compute(self):
+    def compute(self, context, cfg):
+        raise NotImplementedError
+
+    def compute_batch(self, observables, cfg):
+        """
+        Vectorized form over the whole sweep.
+
+        observables maps each name in requires_observables to
+        {"mean": array, "std_dev": array}, stacked with the case index
+        as the first axis; Estimate.from_observable carries the error
+        bars through arithmetic. Return {"per_case": ..., "aggregate":
+        ...}, values being arrays, scalars or Estimates.
+        """
         raise NotImplementedError
+
+    def is_batch(self):
+        return type(self).compute_batch is not Metric.compute_batch
+
+    def __call__(self, context, cfg):
+        if not self.is_batch():
+            return to_arrays(self.compute(context, cfg))
+
+        results = context.get("results")
+        if results is None:
+            raise RuntimeError(
+                f"Metric '{self.type_name}' needs the results store; "
+                "run the ingest stage first."
+            )
+        observables = results.stack(self.requires_observables)
+        return to_arrays(self.compute_batch(observables, cfg))
+
+
+# ---------------------------------------------------------
+# utility: Estimates → {mean, std_dev} arrays for metrics.h5
+# ---------------------------------------------------------
+def to_arrays(value):
+    if isinstance(value, Estimate):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {k: to_arrays(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_arrays(v) for v in value]
+    return value
+
+
+# ---------------------------------------------------------
+# utility: numpy output → plain python for metrics.yaml
+# ---------------------------------------------------------
+def to_builtin(value):
+    if isinstance(value, Estimate):
+        return to_builtin(value.to_dict())
+    if isinstance(value, dict):
+        return {k: to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
     
 
 def register_metric(name):
@@ -28,10 +94,10 @@ def register_metric(name):
     Decorator used by metrics to register themselves.
     """
     def decorator(cls):
-        if name in METRICS_REGISTRY:
+        if METRICS_REGISTRY.is_loaded(name):
             raise ValueError(f"Metric '{name}' already registered.")
-        
-        METRICS_REGISTRY[name] = cls()
+        cls.type_name = name
+        METRICS_REGISTRY.register(name, cls())
         return cls
     return decorator
 
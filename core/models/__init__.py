@@ -1,5 +1,8 @@
 
 # =================================
 # Add user models here
+#   name -> module (relative to this package), imported on first use
 # =================================
-from . import model
\ No newline at end of file
+MANIFEST = {
+    "example_model": ".model",
+}
@@ -1,9 +1,12 @@
-import openmc4d as mc
+from core.lazy import lazy_import
 from .params import *
 from .registry import register_model
 
+mc = lazy_import("openmc4d")
 
-@register_model("example_model")
+
+@register_model("example_model",
+                settings=["seed", "batches", "inactive", "particles"])
 def build_model(config):
     p = resolve(config)
     model = mc.Model()
@@ -1,16 +1,27 @@
+from core.lazy import LazyRegistry
 
+MODEL_REGISTRY = LazyRegistry("core.models", "model")
 
-
-MODEL_REGISTRY = {}
-
-def register_model(name):
+def register_model(name, geometry=None, materials=None, settings=None):
     """
     Decorator used by model files to register themselves.
+
+    geometry, materials and settings optionally list the parameters
+    that affect each component. Parameters listed under settings must
+    be openmc4d Settings attributes (particles, batches, seed, ...);
+    the pipeline then reuses a built model and only rewrites
+    settings.xml when nothing else changed. Unlisted parameters are
+    assumed to affect every component.
     """
     def decorator(func):
-        if name in MODEL_REGISTRY:
+        if MODEL_REGISTRY.is_loaded(name):
             raise ValueError(f"Model '{name}' already registered.")
-        MODEL_REGISTRY[name] = func
+        func.components = {
+            "geometry": list(geometry) if geometry is not None else None,
+            "materials": list(materials) if materials is not None else None,
+            "settings": list(settings or []),
+        }
+        MODEL_REGISTRY.register(name, func)
         return func
     return decorator
 
@@ -20,4 +31,4 @@ def get_model_block(name):
         available = ", ".join(MODEL_REGISTRY)
         raise ValueError(f"Unknown model '{name}'. Available: {available}")
     
-    return MODEL_REGISTRY[name]
\ No newline at end of file
+    return MODEL_REGISTRY[name]
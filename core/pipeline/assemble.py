@@ -1,8 +1,159 @@
-import openmc4d as mc
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+from core.lazy import lazy_import
+from core.models.params import resolve
+from core.tallies.merge import merge_tallies, write_tally_map
+from . import trace
+from .attach import enable_triggers
+from .cache import link_file
+from .warm import apply_warm_start
+
+mc = lazy_import("openmc4d")
 
 
 # ---------------------------------------------------------
 # assemble: generate xml files from openmc model
 # ---------------------------------------------------------
 def assemble_xml(model, case_dir):
-    model.export_to_xml(case_dir)
\ No newline at end of file
+    model.export_to_xml(case_dir)
+
+
+def _export(obj, case_dir, component):
+    # never write through a hard link shared with another case
+    target = Path(case_dir) / f"{component}.xml"
+    target.unlink(missing_ok=True)
+    obj.export_to_xml(str(target))
+    return target
+
+
+def _digest(values):
+    blob = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ---------------------------------------------------------
+# assembler: build + export with reuse across sweep cases
+# ---------------------------------------------------------
+class ModelAssembler:
+    """
+    Builds a case model, attaches tallies and exports XML, reusing work
+    from earlier cases according to the parameter groups the model
+    declared in register_model:
+
+    - if only settings parameters changed, the built model is reused,
+      its Settings attributes are updated, and only settings.xml is
+      written; the other XML files are linked from the earlier case.
+    - otherwise the model is rebuilt (with auto ids reset so XML is
+      reproducible), and geometry.xml / materials.xml are still linked
+      when their declared parameters match an earlier export.
+
+    Models are kept in a small LRU keyed by their non-settings
+    parameters. With an early_stopping config, tally triggers bound
+    each case's batch count (see enable_triggers).
+
+    After the tally blocks attach, tallies sharing filters are merged
+    (see core.tallies.merge) and the mapping is written to each case.
+    """
+
+    def __init__(self, model_block, tally_blocks, max_models=4,
+                 early_stopping=None):
+        self.model_block = model_block
+        self.tally_blocks = tally_blocks
+        self.early_stopping = early_stopping
+        self.components = getattr(model_block, "components", {})
+        self.max_models = max_models
+
+        # structure key -> (model, settings before triggers, case_dir)
+        self._models = OrderedDict()
+        self._exports = {}             # (component, key) -> xml path
+        self.tally_map = {}            # block tally -> merged tally
+
+    def _component_key(self, name, p):
+        declared = self.components.get(name)
+        if declared is None:
+            # undeclared: every non-settings parameter matters
+            settings = set(self.components.get("settings", []))
+            declared = [k for k in p if k not in settings]
+        return _digest({k: p.get(k) for k in declared})
+
+    def _link_or_export(self, component, key, obj, case_dir):
+        source = self._exports.get((component, key))
+        if source is not None and source.exists():
+            link_file(source, Path(case_dir) / f"{component}.xml")
+            return
+        self._exports[(component, key)] = _export(obj, case_dir, component)
+
+    def assemble(self, params, case_dir, seed=None, seed_inactive=None):
+        """
+        Returns the model used for this case. `seed` is a statepoint
+        whose source bank starts the case (see core.pipeline.warm).
+        """
+        p = resolve(params)
+        case = Path(case_dir).name
+        settings = self.components.get("settings", [])
+        structure = _digest({k: v for k, v in p.items()
+                             if k not in settings})
+
+        if structure in self._models:
+            base, base_settings, base_dir = self._models[structure]
+            self._models.move_to_end(structure)
+
+            with trace.stage("model_build", case):
+                model = copy.copy(base)
+                model.settings = copy.deepcopy(base_settings)
+                for k in settings:
+                    setattr(model.settings, k, p[k])
+                if seed is not None:
+                    apply_warm_start(model.settings, seed, seed_inactive)
+                enable_triggers(model.settings, self.early_stopping)
+
+            with trace.stage("xml_assembly", case):
+                for component in ("geometry", "materials", "tallies"):
+                    source = Path(base_dir) / f"{component}.xml"
+                    target = Path(case_dir) / f"{component}.xml"
+                    if source.exists():
+                        link_file(source, target)
+                    else:
+                        target.unlink(missing_ok=True)
+                write_tally_map(self.tally_map, case_dir)
+                _export(model.settings, case_dir, "settings")
+            return model
+
+        with trace.stage("model_build", case):
+            mc.reset_auto_ids()
+            model = self.model_block(params)
+
+        with trace.stage("tally_attach", case):
+            for block in self.tally_blocks:
+                block.attach(model)
+            if model.tallies:
+                tallies, self.tally_map = merge_tallies(model.tallies)
+                model.tallies = mc.Tallies(tallies)
+
+        base_settings = copy.deepcopy(model.settings)
+        if seed is not None:
+            apply_warm_start(model.settings, seed, seed_inactive)
+        enable_triggers(model.settings, self.early_stopping)
+
+        with trace.stage("xml_assembly", case):
+            self._link_or_export("geometry",
+                                 self._component_key("geometry", p),
+                                 model.geometry, case_dir)
+            self._link_or_export("materials",
+                                 self._component_key("materials", p),
+                                 model.materials, case_dir)
+            _export(model.settings, case_dir, "settings")
+            if model.tallies:
+                _export(model.tallies, case_dir, "tallies")
+            else:
+                (Path(case_dir) / "tallies.xml").unlink(missing_ok=True)
+            write_tally_map(self.tally_map, case_dir)
+
+        self._models[structure] = (model, base_settings, case_dir)
+        if len(self._models) > self.max_models:
+            self._models.popitem(last=False)
+        return model
@@ -1,4 +1,6 @@
-import openmc4d as mc
+from core.lazy import lazy_import
+
+mc = lazy_import("openmc4d")
 
 # ---------------------------------------------------------
 # attach: add tallies to the model
@@ -9,4 +11,26 @@ def attach_tallies(model, observable_builders):
         t = b.build()
         tallies += t
 
-    model.tallies = tallies
\ No newline at end of file
+    model.tallies = tallies
+
+
+# ---------------------------------------------------------
+# triggers: stop a case once its tally targets are met
+# ---------------------------------------------------------
+def enable_triggers(settings, early_stopping):
+    """
+    Turns the case's batch budget into a trigger-controlled range:
+    transport runs at least `min_batches`, then checks the tally
+    triggers every `interval` batches and stops once all are met or
+    the original `batches` budget is used up.
+    """
+    if not early_stopping:
+        return
+
+    budget = settings.batches
+    settings.batches = int(early_stopping.get(
+        'min_batches', settings.inactive + 1))
+    settings.trigger_active = True
+    settings.trigger_max_batches = int(early_stopping.get(
+        'max_batches', budget))
+    settings.trigger_batch_interval = int(early_stopping.get('interval', 1))
@@ -0,0 +1,118 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from core.models.params import resolve
+from core.tallies.merge import TALLY_MAP_FILE
+
+
+# ---------------------------------------------------------
+# key: content hash of everything that determines a case
+# ---------------------------------------------------------
+def case_key(model_name, model_block, params, tally_blocks, run_cfg=None):
+    """
+    Hash of the resolved parameters, the model name and source, the
+    tally block configs and any run-mode config (e.g. early stopping).
+    Equal keys give equal statepoints.
+    """
+    payload = {
+        "run": run_cfg or {},
+        "model": model_name,
+        "model_source": inspect.getsource(inspect.getmodule(model_block)),
+        "params": resolve(params),
+        "tallies": [
+            {
+                "type": b.type_name,
+                "name": getattr(b, "name", b.type_name),
+                "cfg": getattr(b, "cfg", b.default_config),
+                "source": inspect.getsource(type(b)),
+            }
+            for b in tally_blocks
+        ],
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ---------------------------------------------------------
+# utility: hard-link a file, copying across filesystems
+# ---------------------------------------------------------
+def link_file(src, dst):
+    """
+    Safe to call concurrently for the same dst: the link is made under
+    a unique name and renamed over dst in one step.
+    """
+    dst = Path(dst)
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    # rename is a no-op when dst already links to the same file
+    tmp.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------
+# lookup: put a cached statepoint in place for a case
+# ---------------------------------------------------------
+def lookup(cache_root, key, case_dir):
+    """
+    Returns True when case_dir holds a statepoint matching key,
+    hard-linking it from the cache if necessary.
+    """
+    case_dir = Path(case_dir)
+    key_path = case_dir / "case.key"
+    statepoint = case_dir / "statepoint.h5"
+
+    if statepoint.exists() and key_path.exists():
+        if key_path.read_text().strip() == key:
+            return True
+
+    cached = Path(cache_root) / key / "statepoint.h5"
+    if not cached.exists():
+        return False
+
+    link_file(cached, statepoint)
+    tally_map = Path(cache_root) / key / TALLY_MAP_FILE
+    if tally_map.exists():
+        link_file(tally_map, case_dir / TALLY_MAP_FILE)
+    else:
+        (case_dir / TALLY_MAP_FILE).unlink(missing_ok=True)
+    key_path.write_text(key)
+    return True
+
+
+def is_cached(cache_root, key):
+    """
+    True when the cache holds a statepoint for key. Touches nothing.
+    """
+    return (Path(cache_root) / key / "statepoint.h5").exists()
+
+
+# ---------------------------------------------------------
+# store: add a finished case to the cache
+# ---------------------------------------------------------
+def store(cache_root, key, case_dir):
+    case_dir = Path(case_dir)
+    entry = Path(cache_root) / key
+    entry.mkdir(parents=True, exist_ok=True)
+
+    link_file(case_dir / "statepoint.h5", entry / "statepoint.h5")
+    # merged tallies are only readable together with their map
+    if (case_dir / TALLY_MAP_FILE).exists():
+        link_file(case_dir / TALLY_MAP_FILE, entry / TALLY_MAP_FILE)
+    (case_dir / "case.key").write_text(key)
+
+
+# ---------------------------------------------------------
+# invalidate: drop a stale result before a case is rerun
+# ---------------------------------------------------------
+def invalidate(case_dir):
+    case_dir = Path(case_dir)
+    for stale in ("case.key", "statepoint.h5", TALLY_MAP_FILE):
+        (case_dir / stale).unlink(missing_ok=True)
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from .run import TransportError, run_case
+from .schedule import threads_per_case
+from .supervise import KILL_GRACE, force_kill, run_case_async
+from .worker import STATUS_FILE
+
+EXECUTOR_REGISTRY = {}
+
+
+def register_executor(name):
+    """
+    Decorator used by executor backends to register themselves.
+    """
+    def decorator(cls):
+        if name in EXECUTOR_REGISTRY:
+            raise ValueError(f"Executor '{name}' already registered.")
+        cls.type_name = name
+        EXECUTOR_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def get_executor(name, **cfg):
+    if name not in EXECUTOR_REGISTRY:
+        available = ", ".join(EXECUTOR_REGISTRY)
+        raise ValueError(f"Unknown executor '{name}'. Available: {available}")
+    return EXECUTOR_REGISTRY[name](**cfg)
+
+
+# ---------------------------------------------------------
+# base: interface used by core.pipeline.schedule.run_cases
+# ---------------------------------------------------------
+class Executor:
+    """
+    submit() queues one case, flush() hands queued cases to the
+    backend, wait() blocks until at least one case ends and returns
+    [(case_dir, attempt, usage, error)], usage being the dict returned
+    by run_case and error None on success. capacity bounds the number
+    of cases in flight.
+    """
+    capacity = 1
+
+    def submit(self, case_dir, attempt):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def wait(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------
+# local: process pool on this machine
+# ---------------------------------------------------------
+@register_executor("local")
+class LocalExecutor(Executor):
+
+    def __init__(self, jobs=1, threads=None, **cfg):
+        self.capacity = jobs
+        self.threads = threads_per_case(jobs, threads)
+        self.pool = ProcessPoolExecutor(max_workers=jobs)
+        self.futures = {}
+
+    def submit(self, case_dir, attempt):
+        fut = self.pool.submit(run_case, case_dir, self.threads, attempt)
+        self.futures[fut] = (case_dir, attempt)
+
+    def wait(self):
+        return _wait_futures(self.futures)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def _wait_futures(futures):
+    # futures: {future: (case_dir, attempt)}; pops the finished ones
+    finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+    results = []
+    for fut in finished:
+        case_dir, attempt = futures.pop(fut)
+        try:
+            results.append((case_dir, attempt, fut.result(), None))
+        except Exception as err:
+            results.append((case_dir, attempt, None, err))
+    return results
+
+
+# ---------------------------------------------------------
+# async: supervised subprocesses on one event loop
+# ---------------------------------------------------------
+@register_executor("async")
+class AsyncExecutor(Executor):
+    """
+    Runs openmc4d as subprocesses supervised from a single asyncio
+    event loop in a background thread (see core.pipeline.supervise).
+    Output is parsed into progress events as it arrives, and cases
+    that exceed their limits are killed instead of holding a slot.
+
+    Config (study.yaml `executor:` block or keyword arguments):
+        timeout, stall_timeout (seconds), max_rss_mb, poll_interval,
+        progress_interval (seconds between progress lines per case),
+        openmc_exec
+    """
+
+    def __init__(self, jobs=1, threads=None, openmc_exec="openmc4d",
+                 timeout=None, stall_timeout=None, max_rss_mb=None,
+                 poll_interval=1.0, progress_interval=30, **cfg):
+        self.capacity = jobs
+        self.threads = threads_per_case(jobs, threads)
+        self.limits = {
+            "openmc_exec": openmc_exec,
+            "timeout": timeout,
+            "stall_timeout": stall_timeout,
+            "max_rss_mb": max_rss_mb,
+            "poll_interval": poll_interval,
+        }
+        self.progress_interval = progress_interval
+        self.last_report = {}
+        self.futures = {}
+        self.procs = set()    # openmc4d processes not yet waited on
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       daemon=True)
+        self.thread.start()
+
+    def report(self, case, event):
+        # runs on the loop thread; throttled per case
+        now = time.perf_counter()
+        if event["event"] == "batch":
+            if now - self.last_report.get(case, -1e9) < self.progress_interval:
+                return
+            self.last_report[case] = now
+            line = f"[PROGRESS] {case} batch {event['batch']}"
+            if "keff_mean" in event:
+                line += (f" k={event['keff_mean']:.5f}"
+                         f" +/- {event['keff_std_dev']:.5f}")
+            elif "keff" in event:
+                line += f" k={event['keff']:.5f}"
+            if "particles_per_second" in event:
+                line += f" ({event['particles_per_second']:.3g} p/s)"
+        else:
+            line = (f"[PROGRESS] {case} {event['phase']} rate "
+                    f"{event['particles_per_second']:.3g} p/s")
+        print(line, flush=True)
+
+    def submit(self, case_dir, attempt):
+        coro = run_case_async(case_dir, self.threads, attempt,
+                              on_progress=self.report, procs=self.procs,
+                              **self.limits)
+        fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.futures[fut] = (case_dir, attempt)
+
+    def wait(self):
+        return _wait_futures(self.futures)
+
+    def _alive(self):
+        return [p for p in list(self.procs) if p.returncode is None]
+
+    def _wait_alive(self, timeout):
+        deadline = time.perf_counter() + timeout
+        while self._alive() and time.perf_counter() < deadline:
+            time.sleep(0.1)
+
+    def close(self):
+        # cancelling a case sends SIGTERM to its process group; groups
+        # still alive after the grace period are killed here, before
+        # the loop (and its delayed SIGKILL) goes away
+        for fut in self.futures:
+            fut.cancel()
+        self._wait_alive(KILL_GRACE)
+        for proc in self._alive():
+            force_kill(proc)
+        self._wait_alive(1.0)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+# ---------------------------------------------------------
+# batch: SLURM-style job arrays
+# ---------------------------------------------------------
+@register_executor("slurm")
+class SlurmExecutor(Executor):
+    """
+    Submits queued cases as job arrays of up to `chunk_size` cases.
+    Each array task runs `cases_per_task` cases back to back, so small
+    cases share one allocation. Completion is detected from the
+    status.json each case writes; a job that leaves the queue without
+    writing it counts as failed.
+
+    Config (study.yaml `executor:` block or keyword arguments):
+        chunk_size, cases_per_task, max_in_flight, poll_interval,
+        threads, sbatch_args (list of extra sbatch options)
+    """
+
+    def __init__(self, batch_dir, threads=None, chunk_size=64,
+                 cases_per_task=1, max_in_flight=1024, poll_interval=30,
+                 sbatch_args=None, **cfg):
+        self.batch_dir = Path(batch_dir)
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        self.threads = threads
+        self.chunk_size = chunk_size
+        self.cases_per_task = cases_per_task
+        self.capacity = max_in_flight
+        self.poll_interval = poll_interval
+        self.sbatch_args = list(sbatch_args or [])
+
+        self.queued = []
+        self.running = {}     # case_dir -> (attempt, job id)
+        self.n_arrays = len(list(self.batch_dir.glob("array_*.txt")))
+
+    def submit(self, case_dir, attempt):
+        (Path(case_dir) / STATUS_FILE).unlink(missing_ok=True)
+        self.queued.append((case_dir, attempt))
+        if len(self.queued) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        while self.queued:
+            chunk = self.queued[:self.chunk_size]
+            self.queued = self.queued[self.chunk_size:]
+            self._submit_chunk(chunk)
+
+    def _submit_chunk(self, chunk):
+        self.n_arrays += 1
+        stem = self.batch_dir / f"array_{self.n_arrays:04d}"
+
+        case_list = stem.with_suffix(".txt")
+        case_list.write_text("".join(
+            f"{Path(d).resolve()} {attempt}\n" for d, attempt in chunk
+        ))
+
+        n_tasks = -(-len(chunk) // self.cases_per_task)
+        script = stem.with_suffix(".sh")
+        script.write_text(self._script(case_list))
+
+        job_id = self._submit_array(script, n_tasks)
+        print(f"[BATCH] array {job_id}: {len(chunk)} cases, {n_tasks} tasks")
+        for d, attempt in chunk:
+            self.running[d] = (attempt, job_id)
+
+    def _script(self, case_list):
+        threads = "" if self.threads is None else f" --threads {self.threads}"
+        return (
+            "#!/bin/bash\n"
+            f"cd {shlex.quote(str(Path.cwd()))}\n"
+            f"{shlex.quote(sys.executable)} -m core.pipeline.worker "
+            f"{shlex.quote(str(case_list))} "
+            f"--task ${{SLURM_ARRAY_TASK_ID}} "
+            f"--per-task {self.cases_per_task}{threads}\n"
+        )
+
+    def _submit_array(self, script, n_tasks):
+        args = ["sbatch", "--parsable", f"--array=0-{n_tasks - 1}",
+                f"--output={self.batch_dir}/%A_%a.out"]
+        if self.threads:
+            args.append(f"--cpus-per-task={self.threads}")
+        args += self.sbatch_args + [str(script)]
+        out = subprocess.run(args, check=True, capture_output=True, text=True)
+        return out.stdout.strip().split(";")[0]
+
+    def _active_jobs(self):
+        """
+        Job ids still queued or running, or None when squeue fails.
+        """
+        jobs = {job for _, job in self.running.values()}
+        out = subprocess.run(
+            ["squeue", "--noheader", "--format=%F", "--jobs", ",".join(jobs)],
+            capture_output=True, text=True,
+        )
+        if out.returncode == 0:
+            return set(out.stdout.split())
+        # squeue rejects the request once every job in it is purged
+        if "Invalid job id" in out.stderr:
+            return set()
+        return None
+
+    def _collect(self):
+        results = []
+        for case_dir, (attempt, job_id) in list(self.running.items()):
+            status = Path(case_dir) / STATUS_FILE
+            if not status.exists():
+                continue
+            with open(status, "r") as f:
+                info = json.load(f)
+            del self.running[case_dir]
+            err = info.get("error")
+            if err:
+                err = TransportError(err, info.get("exit_status"))
+            results.append((case_dir, attempt, info.get("usage"),
+                            err or None))
+        return results
+
+    def wait(self):
+        while True:
+            results = self._collect()
+            if results:
+                return results
+
+            active = self._active_jobs()
+            if active is None:
+                # transient squeue / slurmctld failure: no job can be
+                # declared lost on this poll, try again on the next
+                print("[BATCH] squeue failed; checking again next poll")
+                time.sleep(self.poll_interval)
+                continue
+            # jobs gone from the queue without a status file have died
+            lost = [d for d, (_, job) in self.running.items()
+                    if job not in active]
+            results = self._collect()
+            for case_dir in lost:
+                if case_dir in self.running:
+                    attempt, job = self.running.pop(case_dir)
+                    results.append((case_dir, attempt, None, RuntimeError(
+                        f"batch job {job} ended without a status")))
+            if results:
+                return results
+
+            time.sleep(self.poll_interval)
+
+
+# ---------------------------------------------------------
+# fake batch: the slurm backend on local subprocesses
+# ---------------------------------------------------------
+@register_executor("fake-slurm")
+class FakeSlurmExecutor(SlurmExecutor):
+    """
+    Runs the generated array scripts as local background processes,
+    one per task, so the batch path can be exercised without a
+    cluster.
+    """
+
+    def __init__(self, batch_dir, poll_interval=1, **cfg):
+        super().__init__(batch_dir, poll_interval=poll_interval, **cfg)
+        self.procs = {}
+        self.logs = []
+
+    def _submit_array(self, script, n_tasks):
+        job_id = f"fake{self.n_arrays}"
+        self.procs[job_id] = []
+        for task in range(n_tasks):
+            log = open(self.batch_dir / f"{job_id}_{task}.out", "w")
+            self.logs.append(log)
+            self.procs[job_id].append(subprocess.Popen(
+                ["bash", str(script)],
+                env={**os.environ, "SLURM_ARRAY_TASK_ID": str(task)},
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            ))
+        return job_id
+
+    def _active_jobs(self):
+        return {
+            job for job, procs in self.procs.items()
+            if any(p.poll() is None for p in procs)
+        }
+
+    def close(self):
+        for procs in self.procs.values():
+            for p in procs:
+                p.wait()
+        for log in self.logs:
+            log.close()
@@ -0,0 +1,146 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from types import MappingProxyType
+
+from . import trace
+
+
+# ---------------------------------------------------------
+# node: one metric or artifact and what it waits on
+# ---------------------------------------------------------
+class Node:
+
+    def __init__(self, name, kind, func, cfg, deps):
+        self.name = name
+        self.kind = kind
+        self.func = func
+        self.cfg = cfg
+        self.deps = set(deps)
+
+
+def run_node(node, context, inputs):
+    """
+    Worker entry point. Metrics return their output; artifacts are
+    called for their side effects with a read-only view of the
+    results they depend on.
+    """
+    if node.kind == "metric":
+        return node.func(context, node.cfg)
+    node.func(context, node.cfg, MappingProxyType(inputs))
+    return None
+
+
+# ---------------------------------------------------------
+# graph: validate dependencies and reject cycles
+# ---------------------------------------------------------
+def check_graph(nodes):
+    for node in nodes.values():
+        missing = [d for d in node.deps if d not in nodes]
+        if missing:
+            raise RuntimeError(
+                f"{node.kind.capitalize()} '{node.name}' "
+                f"depends on unknown results: {missing}"
+            )
+        # only metrics produce results
+        if node.kind == "metric":
+            artifacts = [d for d in node.deps if nodes[d].kind != "metric"]
+            if artifacts:
+                raise RuntimeError(
+                    f"Metric '{node.name}' depends on artifacts, "
+                    f"which produce no results: {artifacts}"
+                )
+
+    visiting, visited = set(), set()
+
+    def visit(name, path):
+        if name in visited:
+            return
+        if name in visiting:
+            cycle = " -> ".join(path + [name])
+            raise RuntimeError(f"Dependency cycle: {cycle}")
+        visiting.add(name)
+        for dep in sorted(nodes[name].deps):
+            visit(dep, path + [name])
+        visiting.discard(name)
+        visited.add(name)
+
+    for name in nodes:
+        visit(name, [])
+
+
+# ---------------------------------------------------------
+# executor: run each node as soon as its inputs are ready
+# ---------------------------------------------------------
+def run_graph(nodes, context, jobs=1, memo=None):
+    """
+    Evaluates the graph and returns {metric name: output}.
+
+    Ready nodes are submitted in declaration order. With jobs > 1 they
+    run in a process pool, so independent metrics and artifacts overlap
+    and an artifact starts as soon as the metrics it needs are done.
+    With a Memo, metrics whose key is already cached are not rerun.
+    """
+    check_graph(nodes)
+
+    results = {}
+    done = set()
+    keys = {}
+    remaining = dict(nodes)
+
+    if memo is not None:
+        fingerprint = memo.study_fingerprint(context)
+
+    def ready():
+        for name, node in list(remaining.items()):
+            if node.deps <= done:
+                del remaining[name]
+                if not cached(node):
+                    yield node
+
+    def cached(node):
+        # artifacts write files; they always run
+        if memo is None or node.kind != "metric":
+            return False
+        dep_keys = [keys[d] for d in node.deps]
+        keys[node.name] = memo.node_key(node, fingerprint, dep_keys)
+        hit, output = memo.load(keys[node.name])
+        if hit:
+            print(f"[{node.kind.upper()}] {node.name} (cached)")
+            finish(node, output, store=False)
+        return hit
+
+    def finish(node, output, store=True):
+        done.add(node.name)
+        if node.kind == "metric":
+            results[node.name] = output
+        if memo is not None and store and node.kind == "metric":
+            memo.save(keys[node.name], output)
+
+    if jobs == 1:
+        while remaining:
+            for node in ready():
+                print(f"[{node.kind.upper()}] {node.name}")
+                inputs = {d: results[d] for d in node.deps}
+                with trace.stage(f"{node.kind}:{node.name}"):
+                    output = run_node(node, context, inputs)
+                finish(node, output)
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while remaining or running:
+            for node in ready():
+                print(f"[{node.kind.upper()}] {node.name}")
+                inputs = {d: results[d] for d in node.deps}
+                name = f"{node.kind}:{node.name}"
+                fut = pool.submit(trace.measured, run_node, node, context,
+                                  inputs, profile=trace.profile_path(name))
+                running[fut] = node
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                node = running.pop(fut)
+                output, usage = fut.result()
+                trace.record(f"{node.kind}:{node.name}", **usage)
+                finish(node, output)
+
+    return results
@@ -0,0 +1,60 @@
+import json
+import os
+from pathlib import Path
+
+STATES = ("pending", "assembled", "running", "done", "failed")
+
+
+# ---------------------------------------------------------
+# manifest: persistent per-case run state
+# ---------------------------------------------------------
+class Manifest:
+    """
+    Case states for one study, kept in runs/<study>/manifest.json.
+    Every update is written atomically, so the file on disk is always
+    a complete snapshot even if the process is killed mid-sweep.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.cases = {}
+
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.cases = json.load(f).get("cases", {})
+
+    def reset(self):
+        self.cases = {}
+        self.save()
+
+    def get(self, name):
+        return self.cases.get(name, {})
+
+    def state(self, name):
+        return self.get(name).get("state")
+
+    def is_done(self, name, key):
+        entry = self.get(name)
+        return entry.get("state") == "done" and entry.get("key") == key
+
+    def update(self, name, **fields):
+        state = fields.get("state")
+        if state is not None and state not in STATES:
+            raise ValueError(f"Unknown case state '{state}'")
+
+        self.cases.setdefault(name, {}).update(fields)
+        self.save()
+
+    def unfinished(self):
+        return [
+            name for name, entry in self.cases.items()
+            if entry.get("state") != "done"
+        ]
+
+    def save(self):
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"cases": self.cases}, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
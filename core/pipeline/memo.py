@@ -0,0 +1,142 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+
+
+# ---------------------------------------------------------
+# utility: stable hash of json-able data
+# ---------------------------------------------------------
+def _digest(data):
+    blob = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _code_version(func):
+    target = func if inspect.isfunction(func) else type(func)
+    try:
+        return inspect.getsource(target)
+    except (OSError, TypeError):
+        return target.__qualname__
+
+
+# ---------------------------------------------------------
+# memo: on-disk results of metric nodes
+# ---------------------------------------------------------
+class Memo:
+    """
+    Stores metric outputs under runs/<study>/analysis_cache/.
+
+    A node's key hashes its name, config and source code together with
+    the fingerprint of the study inputs and the keys of the nodes it
+    depends on, so editing one metric's config only invalidates that
+    metric and those built on it, while a changed statepoint
+    invalidates everything. Artifacts are not memoized: their output
+    is files, which the cache cannot tell are still there.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._hashes_path = self.root / "file_hashes.json"
+        self._hashes = {}
+        if self._hashes_path.exists():
+            with open(self._hashes_path, "r") as f:
+                self._hashes = json.load(f)
+        self.used = set()
+
+    # -----------------------------
+    # fingerprints
+    # -----------------------------
+    def file_fingerprint(self, path):
+        """
+        (mtime, size, sha256) of a file. The content hash is only
+        recomputed when mtime or size change.
+        """
+        stat = os.stat(path)
+        entry = self._hashes.get(str(path))
+        if entry and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return entry
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        entry = [stat.st_mtime_ns, stat.st_size, h.hexdigest()]
+        self._hashes[str(path)] = entry
+        return entry
+
+    def study_fingerprint(self, context):
+        files = []
+        for case in context["cases"]:
+            for key in ("statepoint", "params"):
+                path = case[key]
+                if Path(path).exists():
+                    files.append((str(path), self.file_fingerprint(path)))
+
+        tmp = self._hashes_path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._hashes, f)
+        os.replace(tmp, self._hashes_path)
+
+        # only the content hashes matter for the key
+        return _digest([(p, fp[2]) for p, fp in files])
+
+    def node_key(self, node, study_fingerprint, dep_keys):
+        return _digest({
+            "name": node.name,
+            "kind": node.kind,
+            "cfg": node.cfg,
+            "code": _code_version(node.func),
+            "inputs": study_fingerprint,
+            "deps": sorted(dep_keys),
+        })
+
+    # -----------------------------
+    # entries
+    # -----------------------------
+    def _path(self, key):
+        return self.root / f"{key}.pkl"
+
+    def load(self, key):
+        """
+        Returns (hit, output).
+        """
+        path = self._path(key)
+        self.used.add(key)
+        if not path.exists():
+            return False, None
+        with open(path, "rb") as f:
+            output = pickle.load(f)
+        os.utime(path)
+        return True, output
+
+    def save(self, key, output):
+        path = self._path(key)
+        tmp = path.with_suffix(".pkl.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(output, f)
+        os.replace(tmp, path)
+        self.used.add(key)
+
+    def evict(self, max_age_days=None):
+        """
+        Removes entries not used by this run, or, with max_age_days,
+        only those unused for that long. Returns the number removed.
+        """
+        cutoff = None
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+
+        removed = 0
+        for path in self.root.glob("*.pkl"):
+            if path.stem in self.used:
+                continue
+            if cutoff is not None and path.stat().st_mtime > cutoff:
+                continue
+            path.unlink()
+            removed += 1
+        return removed
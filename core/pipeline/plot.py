@@ -1,6 +1,21 @@
-import openmc4d as mc
-import seaborn as sns
-import matplotlib.pyplot as plt
+import hashlib
+import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait
+from pathlib import Path
+
+from core.lazy import lazy_import
+from . import trace
+from .cache import link_file
+from .tiles import plot_tiled
+
+# plotting dependencies load with the first plot, not on import
+mc = lazy_import('openmc4d')
+sns = lazy_import('seaborn')
+
+# xml files that determine what a geometry plot looks like
+GEOMETRY_INPUTS = ('geometry.xml', 'materials.xml')
+
 
 def aesthetic_openmc_palette():
     base = sns.color_palette('pastel')
@@ -10,18 +25,150 @@ def aesthetic_openmc_palette():
         for m, color in enumerate(base)
     }
 
-default = {
-    'outline': False,
-    'colors': aesthetic_openmc_palette()
-}
+def default_style():
+    return {
+        'outline': False,
+        'colors': aesthetic_openmc_palette()
+    }
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_path(case_dir, name):
+    path = Path(case_dir) / name
+    return path if path.suffix else path.with_suffix('.png')
 
 
 def plot_slice(mc_obj, case_dir, name, **plot_kwargs):
-    plot_kwargs = {**plot_kwargs, **default}
-    plt.figure(figsize=(6.4*2, 4.8*2))
-    axs = mc_obj.plot(openmc_exec='openmc4d', 
-                      **plot_kwargs)
-    axs.plot()
-    plt.tight_layout()
-    plt.savefig(f'{case_dir}/{name}', dpi=300)
+    plt = _pyplot()
+    plot_kwargs = {**plot_kwargs, **default_style()}
+    fig = plt.figure(figsize=(6.4*2, 4.8*2))
+    try:
+        axs = mc_obj.plot(openmc_exec='openmc4d',
+                          **plot_kwargs)
+        axs.plot()
+        plt.tight_layout()
+        plt.savefig(plot_path(case_dir, name), dpi=300)
+    finally:
+        # release the figure, pyplot keeps every open one alive
+        plt.close('all')
+        del fig
+
+
+# ---------------------------------------------------------
+# key: geometry inputs + plot settings
+# ---------------------------------------------------------
+def geometry_key(case_dir):
+    h = hashlib.sha256()
+    for fname in GEOMETRY_INPUTS:
+        path = Path(case_dir) / fname
+        if path.exists():
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def plot_key(case_dir, plot_cfg, geometry=None):
+    h = hashlib.sha256((geometry or geometry_key(case_dir)).encode())
+    h.update(json.dumps(plot_cfg, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+# worker: render every plot of one case from its xml
+# ---------------------------------------------------------
+def plot_case(case_dir, plots, cache_root=None):
+    """
+    Rebuilds the model from the exported XML so no model objects
+    cross process boundaries. A plot whose geometry inputs and
+    settings match a cached render is hard-linked instead.
+
+    Plots with `tiles` are assembled from cached id tiles instead
+    (see core.pipeline.tiles); tiles live under cache_root/tiles.
+    """
+    case_dir = Path(case_dir)
+    model = None
+    geometry = geometry_key(case_dir)
+
+    for p in plots:
+        name, plot_cfg = next(iter(p.items()))
+        target = plot_path(case_dir, name)
+        tiled = plot_cfg.get('tiles')
+
+        cached = None
+        if cache_root is not None and not plot_cfg.get('pyramid'):
+            key = plot_key(case_dir, plot_cfg, geometry)
+            cached = Path(cache_root) / f'{key}{target.suffix}'
+            if cached.exists():
+                link_file(cached, target)
+                continue
+
+        if tiled:
+            with tempfile.TemporaryDirectory() as scratch:
+                tile_root = (Path(cache_root) / 'tiles'
+                             if cache_root is not None else scratch)
+                palette = list(default_style()['colors'].values())
+                plot_tiled(case_dir, plot_cfg, geometry, tile_root,
+                           palette, target)
+        else:
+            if model is None:
+                model = mc.Model.from_xml(
+                    geometry=str(case_dir / 'geometry.xml'),
+                    materials=str(case_dir / 'materials.xml'),
+                    settings=str(case_dir / 'settings.xml'),
+                )
+            plot_slice(model, case_dir, name, **plot_cfg)
+
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            link_file(target, cached)
+
+    return case_dir
+
+
+# ---------------------------------------------------------
+# stage: plots rendered in the background of the transport
+# ---------------------------------------------------------
+class PlotStage:
+    """
+    Worker pool for geometry plots. Cases are submitted as soon as
+    their XML is exported and render while transport runs.
+    """
+
+    def __init__(self, plots, jobs=1, cache_root=None):
+        self.plots = plots
+        self.cache_root = cache_root
+        self.pool = ProcessPoolExecutor(max_workers=jobs)
+        self.futures = {}
+
+    def submit(self, case_dir):
+        name = Path(case_dir).name
+        fut = self.pool.submit(trace.measured, plot_case, case_dir,
+                               self.plots, self.cache_root,
+                               profile=trace.profile_path("plot", name))
+        fut.add_done_callback(lambda f: self._record(name, f))
+        self.futures[fut] = case_dir
+
+    @staticmethod
+    def _record(name, fut):
+        # usage is measured in the worker, the trace written here
+        if fut.exception() is None:
+            trace.record("plot", name, **fut.result()[1])
 
+    def wait(self):
+        """
+        Blocks until every plot is done; returns failed case dirs.
+        """
+        failed = []
+        wait(self.futures)
+        for fut, case_dir in self.futures.items():
+            err = fut.exception()
+            if err is not None:
+                print(f"[PLOT FAIL] {Path(case_dir).name}: {err}")
+                failed.append(case_dir)
+        self.pool.shutdown()
+        return failed
@@ -1,9 +1,134 @@
-import openmc4d as mc
 import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .trace import io_counters
+
+
+class TransportError(RuntimeError):
+    """
+    A case failed to run. exit_status is the exit code of openmc4d
+    (negative for a signal), or None if it failed before openmc4d
+    ran; it is recorded in the run manifest.
+    """
+
+    def __init__(self, message, exit_status=None):
+        super().__init__(message)
+        self.exit_status = exit_status
+
 
 # ---------------------------------------------------------
 # run: execute simulation within case directory
 # ---------------------------------------------------------
-def run_simulation(case_dir):
-    os.chdir(case_dir)
-    mc.run(openmc_exec='openmc4d')
\ No newline at end of file
+def run_simulation(case_dir, threads=None, log=None,
+                   openmc_exec="openmc4d"):
+    """
+    Runs openmc4d in case_dir, output to `log` (stdout if None), and
+    returns its exit status and resource usage: cpu_time, max_rss_kb
+    and, on linux, io_read / io_write bytes. Raises TransportError if
+    openmc4d fails, with the ERROR lines it printed.
+
+    The process is waited on by pid so the rusage is that of this run
+    alone, not the high-water mark of every child of the worker. If
+    the wait is interrupted, openmc4d is killed and reaped.
+    """
+    # the transport process gets its own cwd, this process never
+    # changes directory so several cases can run concurrently
+    cmd = [openmc_exec]
+    if threads:
+        cmd += ["-s", str(threads)]
+    out = log if log is not None else sys.stdout
+    proc = subprocess.Popen(cmd, cwd=str(case_dir), stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True)
+    try:
+        errors = _copy_output(proc.stdout, out)
+        ru, read, written = _reap(proc)
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    if proc.returncode != 0:
+        message = f"{openmc_exec} exited with {proc.returncode}"
+        if errors:
+            message += ": " + " ".join(errors)
+        raise TransportError(message, proc.returncode)
+
+    collect_statepoint(case_dir)
+    usage = {"exit_status": proc.returncode}
+    if ru is not None:
+        usage.update(cpu_time=ru.ru_utime + ru.ru_stime,
+                     max_rss_kb=ru.ru_maxrss)
+    if read is not None:
+        usage.update(io_read=read, io_write=written)
+    return usage
+
+
+def _copy_output(stream, out):
+    # the error openmc4d reports runs from its ERROR line to the end
+    errors = []
+    for line in stream:
+        out.write(line)
+        if errors or "ERROR" in line:
+            errors.append(line.strip())
+    out.flush()
+    return [e for e in errors if e]
+
+
+def _reap(proc):
+    """
+    Waits for proc; returns its rusage and (bytes read, bytes written),
+    each None where the platform cannot report them.
+    """
+    read = written = ru = None
+    if hasattr(os, "waitid"):
+        # exited but not reaped: /proc/<pid>/io still holds its counters
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        read, written = io_counters(proc.pid)
+    if hasattr(os, "wait4"):
+        _, status, ru = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    else:
+        proc.wait()
+    return ru, read, written
+
+
+# ---------------------------------------------------------
+# case: run one case, transport output goes to run.log
+# ---------------------------------------------------------
+def run_case(case_dir, threads=None, attempt=1):
+    """
+    Returns the exit status and resource usage of the transport run:
+    wall_time and cpu_time in seconds, the peak RSS of openmc4d
+    (max_rss_kb) and, on linux, the bytes it read and wrote (io_read,
+    io_write). cpu_time and max_rss_kb are left out where the platform
+    has no per-process rusage.
+    """
+    case_dir = Path(case_dir)
+    mode = "w" if attempt == 1 else "a"
+    start = time.perf_counter()
+    with open(case_dir / "run.log", mode) as log:
+        log.write(f"# attempt {attempt}\n")
+        log.flush()
+        usage = run_simulation(case_dir, threads=threads, log=log)
+    return {"wall_time": time.perf_counter() - start, **usage}
+
+
+# ---------------------------------------------------------
+# collect: expose the final statepoint as statepoint.h5
+# ---------------------------------------------------------
+def collect_statepoint(case_dir):
+    case_dir = Path(case_dir)
+    target = case_dir / "statepoint.h5"
+
+    written = sorted(
+        case_dir.glob("statepoint.*.h5"),
+        key=lambda p: p.stat().st_mtime,
+    )
+    if written:
+        written[-1].replace(target)
+
+    return target
@@ -0,0 +1,97 @@
+import os
+from pathlib import Path
+
+# yielded by a case stream when its next case depends on running ones
+WAIT = object()
+
+
+# ---------------------------------------------------------
+# utility: split available cores between concurrent cases
+# ---------------------------------------------------------
+def threads_per_case(jobs, threads=None):
+    """
+    Threads given to each transport run. With a single job and no
+    explicit value, openmc4d keeps its own default.
+    """
+    if threads is not None:
+        return threads
+    if jobs == 1:
+        return None
+    return max(1, (os.cpu_count() or 1) // jobs)
+
+
+# ---------------------------------------------------------
+# scheduler: feed cases to an executor backend
+# ---------------------------------------------------------
+def run_cases(case_dirs, executor, retries=0,
+              on_start=None, on_done=None, on_fail=None):
+    """
+    Runs every case directory on `executor` (see core.pipeline.executors),
+    keeping at most executor.capacity cases in flight.
+
+    case_dirs may be any iterable, including a generator that builds
+    cases lazily: a new case is only pulled when there is room. If it
+    yields WAIT, no further case is pulled until a running one
+    finishes. Completion order may differ from submission order.
+
+    A failed case is resubmitted up to `retries` times and never aborts
+    the rest of the sweep. Callbacks run in this process:
+
+        on_start(case_dir, attempt)
+        on_done(case_dir, usage)
+        on_fail(case_dir, error, attempt)
+
+    Returns the case directories that still failed after all retries.
+    """
+    source = iter(case_dirs)
+    exhausted = False
+    failed = []
+    in_flight = 0
+
+    def submit(case_dir, attempt):
+        print(f"[RUN] {Path(case_dir).name} (attempt {attempt})")
+        if on_start:
+            on_start(case_dir, attempt)
+        executor.submit(case_dir, attempt)
+
+    try:
+        while True:
+            while not exhausted and in_flight < executor.capacity:
+                case_dir = next(source, None)
+                if case_dir is None:
+                    exhausted = True
+                elif case_dir is WAIT:
+                    if not in_flight:
+                        raise RuntimeError(
+                            "Case stream is waiting but no case is running"
+                        )
+                    break
+                else:
+                    submit(case_dir, 1)
+                    in_flight += 1
+
+            executor.flush()
+            if not in_flight:
+                break
+
+            for case_dir, attempt, usage, err in executor.wait():
+                in_flight -= 1
+                if err is not None:
+                    print(f"[FAIL] {Path(case_dir).name}: {err}")
+                    if on_fail:
+                        on_fail(case_dir, err, attempt)
+                    if attempt <= retries:
+                        submit(case_dir, attempt + 1)
+                        in_flight += 1
+                    else:
+                        failed.append(case_dir)
+                    continue
+
+                wall_time = usage["wall_time"]
+                print(f"[DONE] {Path(case_dir).name} ({wall_time:.1f} s)")
+                if on_done:
+                    on_done(case_dir, usage)
+    finally:
+        executor.close()
+
+    return failed
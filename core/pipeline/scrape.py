@@ -0,0 +1,175 @@
+import json
+from pathlib import Path
+
+from core.lazy import lazy_import
+from core.models.params import resolve
+from core.tallies.statepoint import StatepointReader, StdDevReader
+from core.tallies.stats import Estimate
+
+h5py = lazy_import("h5py")
+np = lazy_import("numpy")
+
+RESULTS_FILE = "results.h5"
+
+
+# ---------------------------------------------------------
+# utility: stack per-case arrays, NaN for missing cases
+# ---------------------------------------------------------
+def _stack(values):
+    ref = next((v for v in values if v is not None), None)
+    if ref is None:
+        return None
+    ref = np.asarray(ref, dtype=float)
+    filler = np.full(ref.shape, np.nan)
+    return np.stack([
+        filler if v is None else np.asarray(v, dtype=float)
+        for v in values
+    ])
+
+
+def _column(values):
+    if all(isinstance(v, (bool, int, float, np.number)) for v in values):
+        return np.asarray(values)
+    return np.asarray([json.dumps(v) if not isinstance(v, str) else v
+                       for v in values], dtype=h5py.string_dtype())
+
+
+# ---------------------------------------------------------
+# scrape: ingest every case into one columnar store
+# ---------------------------------------------------------
+def scrape_results(runs_root, tally_blocks):
+    """
+    Writes runs/<study>/results.h5 with one row per case:
+
+        /cases                   case names
+        /params/<name>           resolved sweep parameters
+        /tallies/<block>/mean    stacked Tally.extract output
+        /tallies/<block>/std_dev matching standard deviations
+
+    Each statepoint is opened once for all tally blocks. Cases without
+    a statepoint are kept as rows of NaN so indices stay aligned.
+    """
+    runs_root = Path(runs_root)
+    case_dirs = sorted(
+        d for d in (runs_root / "cases").iterdir() if d.is_dir()
+    )
+
+    names = []
+    params = []
+    means = {b.name: [] for b in tally_blocks}
+    std_devs = {b.name: [] for b in tally_blocks}
+
+    for case_dir in case_dirs:
+        names.append(case_dir.name)
+        with open(case_dir / "params.json", "r") as f:
+            params.append(resolve(json.load(f)))
+
+        statepoint = case_dir / "statepoint.h5"
+        if not statepoint.exists():
+            for b in tally_blocks:
+                means[b.name].append(None)
+                std_devs[b.name].append(None)
+            continue
+
+        with StatepointReader(statepoint) as sp:
+            for b in tally_blocks:
+                means[b.name].append(b.extract(sp))
+                std_devs[b.name].append(b.extract(StdDevReader(sp)))
+
+    path = runs_root / RESULTS_FILE
+    tmp = path.with_suffix(".h5.tmp")
+    with h5py.File(tmp, "w") as f:
+        f["cases"] = np.asarray(names, dtype=h5py.string_dtype())
+
+        group = f.create_group("params")
+        keys = sorted({k for p in params for k in p})
+        for k in keys:
+            group[k] = _column([p.get(k) for p in params])
+
+        group = f.create_group("tallies")
+        for b in tally_blocks:
+            mean = _stack(means[b.name])
+            if mean is None:
+                continue
+            block_group = group.create_group(b.name)
+            block_group["mean"] = mean
+            block_group["std_dev"] = _stack(std_devs[b.name])
+    tmp.replace(path)
+
+    print(f"Scraped {len(names)} cases → {path}")
+    return path
+
+
+# ---------------------------------------------------------
+# utility: store is stale if any statepoint is newer
+# ---------------------------------------------------------
+def is_stale(runs_root):
+    runs_root = Path(runs_root)
+    path = runs_root / RESULTS_FILE
+    if not path.exists():
+        return True
+    built = path.stat().st_mtime
+    return any(
+        sp.stat().st_mtime > built
+        for sp in (runs_root / "cases").glob("*/statepoint.h5")
+    )
+
+
+# ---------------------------------------------------------
+# store: read side of results.h5
+# ---------------------------------------------------------
+class ResultsStore:
+    """
+    Whole-sweep view of results.h5. Arrays have the case index as
+    their first axis; tally arrays are read only when asked for.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with h5py.File(self.path, "r") as f:
+            self.cases = [c.decode() if isinstance(c, bytes) else c
+                          for c in f["cases"][()]]
+            self.params = {k: f["params"][k][()] for k in f["params"]}
+            self.tally_names = list(f["tallies"])
+
+    def __len__(self):
+        return len(self.cases)
+
+    def _read(self, name, field):
+        if name not in self.tally_names:
+            raise LookupError(
+                f"Tally '{name}' not in {self.path}. "
+                f"Available: {', '.join(self.tally_names)}"
+            )
+        with h5py.File(self.path, "r") as f:
+            return f["tallies"][name][field][()]
+
+    def mean(self, name):
+        return self._read(name, "mean")
+
+    def std_dev(self, name):
+        return self._read(name, "std_dev")
+
+    def estimate(self, name):
+        """
+        Mean and std_dev of one tally over the sweep as an Estimate.
+        """
+        return Estimate(self.mean(name), self.std_dev(name))
+
+    def stack(self, names):
+        """
+        {name: {"mean": ..., "std_dev": ...}} for several tallies,
+        read from one open file.
+        """
+        missing = [n for n in names if n not in self.tally_names]
+        if missing:
+            raise LookupError(f"Tallies not in {self.path}: {missing}")
+
+        with h5py.File(self.path, "r") as f:
+            return {
+                n: {
+                    "mean": f["tallies"][n]["mean"][()],
+                    "std_dev": f["tallies"][n]["std_dev"][()],
+                }
+                for n in names
+            }
@@ -0,0 +1,154 @@
+import json
+from pathlib import Path
+
+from core.lazy import lazy_import
+
+h5py = lazy_import("h5py")
+np = lazy_import("numpy")
+
+METRICS_FILE = "metrics.h5"
+
+
+# ---------------------------------------------------------
+# write: nested dict of arrays → one HDF5 file
+# ---------------------------------------------------------
+def _is_plain(value):
+    # scalars, or (nested) lists of them: representable as json
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(v) for v in value)
+    return value is None or isinstance(value, (str, bool, int, float,
+                                                np.generic))
+
+
+def _all_str(value):
+    if isinstance(value, (list, tuple)):
+        return all(_all_str(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind == "U"
+    return isinstance(value, str)
+
+
+def _json_default(value):
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _write_group(group, data):
+    for key, value in data.items():
+        key = str(key).replace("/", "|")
+
+        if isinstance(value, dict):
+            _write_group(group.create_group(key, track_order=True), value)
+            continue
+        if value is None:
+            group[key] = h5py.Empty("f")
+            continue
+        if isinstance(value, str):
+            group[key] = value
+            continue
+        if isinstance(value, (list, tuple)) and not _is_plain(value):
+            # lists of dicts or arrays: one member per item
+            items = group.create_group(key, track_order=True)
+            items.attrs["list"] = True
+            _write_group(items, {str(i): v for i, v in enumerate(value)})
+            continue
+
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            array = None
+
+        if array is not None and array.dtype.kind in "biufc":
+            group[key] = array
+        elif array is not None and array.dtype.kind == "U" \
+                and _all_str(value):
+            group.create_dataset(key, data=array.astype(object),
+                                 dtype=h5py.string_dtype())
+        else:
+            # ragged or mixed values: keep them, as json text
+            group[key] = json.dumps(value, default=_json_default)
+            group[key].attrs["json"] = True
+
+
+def write_snapshot(path, data):
+    """
+    Writes a nested dict to HDF5: dicts become groups, numeric arrays
+    and scalars contiguous datasets, strings string datasets, None an
+    empty dataset, ragged or mixed lists of scalars JSON text and lists
+    holding dicts or arrays groups of their items. Key order is kept.
+    The file is replaced atomically.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(".h5.tmp")
+    with h5py.File(tmp, "w", track_order=True) as f:
+        _write_group(f, data)
+    tmp.replace(path)
+
+
+# ---------------------------------------------------------
+# read: memory-mapped where the layout allows
+# ---------------------------------------------------------
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _read_dataset(dset, path, mmap):
+    if dset.shape is None:
+        return None
+    if dset.attrs.get("json", False):
+        return json.loads(_decode(dset[()]))
+    if dset.dtype.kind in "OS":
+        if dset.ndim == 0:
+            return _decode(dset[()])
+        return dset.asstr()[()].tolist()
+    if dset.ndim == 0:
+        return dset[()].item()
+
+    offset = dset.id.get_offset()
+    if mmap and offset is not None and dset.chunks is None:
+        return np.memmap(path, mode="r", dtype=dset.dtype,
+                         shape=dset.shape, offset=offset)
+    return dset[()]
+
+
+def _read_group(group, path, mmap):
+    data = {
+        key.replace("|", "/"): (
+            _read_group(item, path, mmap)
+            if isinstance(item, h5py.Group)
+            else _read_dataset(item, path, mmap)
+        )
+        for key, item in group.items()
+    }
+    if group.attrs.get("list", False):
+        return [data[str(i)] for i in range(len(data))]
+    return data
+
+
+def read_snapshot(path, mmap=True):
+    """
+    Inverse of write_snapshot. Arrays are read-only memory maps into
+    the file unless mmap=False.
+    """
+    path = str(path)
+    with h5py.File(path, "r") as f:
+        return _read_group(f, path, mmap)
+
+
+# ---------------------------------------------------------
+# metrics: system of record of analyze.py
+# ---------------------------------------------------------
+def write_metrics(study_dir, metrics, cases=None):
+    """
+    Writes runs/<study>/metrics.h5 with /metrics/<name> holding each
+    metric's output and /cases the case names its per_case arrays
+    follow.
+    """
+    data = {"cases": list(cases or []), "metrics": metrics}
+    path = Path(study_dir) / METRICS_FILE
+    write_snapshot(path, data)
+    return path
+
+
+def load_metrics(study_dir, mmap=True):
+    snapshot = read_snapshot(Path(study_dir) / METRICS_FILE, mmap=mmap)
+    return snapshot.get("metrics", {})
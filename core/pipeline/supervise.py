@@ -0,0 +1,227 @@
+import asyncio
+import json
+import os
+import re
+import signal
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from .run import TransportError, collect_statepoint
+from .trace import io_counters
+
+PROGRESS_FILE = "progress.jsonl"
+
+# "  12/1    1.02345    1.01234 +/- 0.00123"  (batch/gen, k, mean k)
+BATCH_RE = re.compile(
+    r"^\s*(\d+)/\d+\s+([-+\d.Ee]+)"
+    r"(?:\s+([-+\d.Ee]+)\s+\+/-\s+([-+\d.Ee]+))?\s*$"
+)
+# " Simulating batch 12"  (fixed source runs)
+SIMULATING_RE = re.compile(r"Simulating batch\s+(\d+)")
+# " Calculation Rate (active)  =  12345.6 particles/second"
+RATE_RE = re.compile(
+    r"Calculation Rate \((\w+)\)\s*=\s*([-+\d.Ee]+)\s+particles/second"
+)
+
+
+# ---------------------------------------------------------
+# progress: openmc4d stdout → structured events
+# ---------------------------------------------------------
+def parse_progress(line):
+    """
+    Returns an event dict for a batch or rate line of openmc4d output,
+    otherwise None.
+    """
+    m = BATCH_RE.match(line)
+    if m:
+        event = {"event": "batch", "batch": int(m.group(1)),
+                 "keff": float(m.group(2))}
+        if m.group(3) is not None:
+            event["keff_mean"] = float(m.group(3))
+            event["keff_std_dev"] = float(m.group(4))
+        return event
+
+    m = SIMULATING_RE.search(line)
+    if m:
+        return {"event": "batch", "batch": int(m.group(1))}
+
+    m = RATE_RE.search(line)
+    if m:
+        return {"event": "rate", "phase": m.group(1),
+                "particles_per_second": float(m.group(2))}
+    return None
+
+
+def _settings_value(case_dir, tag):
+    try:
+        node = ET.parse(Path(case_dir) / "settings.xml").getroot().find(tag)
+    except (OSError, ET.ParseError):
+        return None
+    return int(node.text) if node is not None and node.text else None
+
+
+# ---------------------------------------------------------
+# process stats from /proc (linux); None elsewhere
+# ---------------------------------------------------------
+def _proc_usage(pid):
+    """
+    (rss_kb, cpu_seconds) of a running process.
+    """
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            rss = next((int(line.split()[1]) for line in f
+                        if line.startswith("VmRSS:")), 0)
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        cpu = (int(fields[11]) + int(fields[12])) / ticks
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+    return rss, cpu
+
+
+KILL_GRACE = 10.0
+
+
+def _kill(proc, grace=KILL_GRACE):
+    # openmc4d runs in its own session; signal the whole group
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    loop = asyncio.get_running_loop()
+    loop.call_later(grace, force_kill, proc)
+
+
+def force_kill(proc):
+    if proc.returncode is None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+# ---------------------------------------------------------
+# case: supervise one openmc4d subprocess
+# ---------------------------------------------------------
+async def run_case_async(case_dir, threads=None, attempt=1,
+                         openmc_exec="openmc4d", timeout=None,
+                         stall_timeout=None, max_rss_mb=None,
+                         poll_interval=1.0, on_progress=None, procs=None):
+    """
+    Runs openmc4d in case_dir without blocking the event loop.
+
+    stdout goes to run.log and every batch / rate line is parsed into
+    an event, appended to progress.jsonl and passed to on_progress(case
+    name, event). Batch events carry the elapsed time and, when
+    settings.xml gives the particle count, particles_per_second.
+
+    The case is killed and raises if it runs longer than `timeout`,
+    prints nothing for `stall_timeout`, or its resident memory passes
+    `max_rss_mb` (all seconds / MiB, None to disable). Returns the
+    same usage dict as run_case; CPU time and bytes read / written are
+    as of the last poll. The process is kept in the `procs` set, if
+    given, until it has been waited on.
+    """
+    case_dir = Path(case_dir)
+    name = case_dir.name
+    particles = _settings_value(case_dir, "particles")
+    inactive = _settings_value(case_dir, "inactive") or 0
+
+    cmd = [openmc_exec]
+    if threads:
+        cmd += ["-s", str(threads)]
+
+    mode = "w" if attempt == 1 else "a"
+    start = time.perf_counter()
+    state = {"last_output": start, "peak_rss": 0, "cpu": 0.0,
+             "io": (None, None), "error": None}
+
+    with open(case_dir / "run.log", mode) as log, \
+            open(case_dir / PROGRESS_FILE, mode) as progress:
+        log.write(f"# attempt {attempt}\n")
+        log.flush()
+
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=str(case_dir),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        if procs is not None:
+            procs.add(proc)
+
+        async def read_output():
+            async for raw in proc.stdout:
+                line = raw.decode(errors="replace")
+                log.write(line)
+                now = time.perf_counter()
+                state["last_output"] = now
+
+                event = parse_progress(line)
+                if event is None:
+                    continue
+                event["elapsed"] = now - start
+                if event["event"] == "batch" and particles:
+                    event["particles_per_second"] = (
+                        particles * event["batch"] / event["elapsed"])
+                    event["active"] = event["batch"] > inactive
+                progress.write(json.dumps({"case": name, **event}) + "\n")
+                progress.flush()
+                if on_progress:
+                    on_progress(name, event)
+
+        def check_limits():
+            now = time.perf_counter()
+            usage = _proc_usage(proc.pid)
+            if usage is not None:
+                state["peak_rss"] = max(state["peak_rss"], usage[0])
+                state["cpu"] = usage[1]
+                state["io"] = io_counters(proc.pid)
+                if max_rss_mb and usage[0] > max_rss_mb * 1024:
+                    return (f"resident memory {usage[0] // 1024} MiB "
+                            f"over the {max_rss_mb} MiB limit")
+            if timeout and now - start > timeout:
+                return f"timed out after {timeout} s"
+            if stall_timeout and now - state["last_output"] > stall_timeout:
+                return f"no output for {stall_timeout} s"
+            return None
+
+        async def watch():
+            while proc.returncode is None:
+                await asyncio.sleep(poll_interval)
+                if proc.returncode is None and state["error"] is None:
+                    state["error"] = check_limits()
+                    if state["error"] is not None:
+                        log.write(f"# killed: {state['error']}\n")
+                        _kill(proc)
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await read_output()
+            returncode = await proc.wait()
+            if procs is not None:
+                procs.discard(proc)
+        finally:
+            watcher.cancel()
+            if proc.returncode is None:
+                _kill(proc)
+
+    if state["error"] is not None:
+        raise TransportError(state["error"], returncode)
+    if returncode != 0:
+        raise TransportError(f"openmc4d exited with {returncode}",
+                             returncode)
+
+    collect_statepoint(case_dir)
+    usage = {
+        "exit_status": returncode,
+        "wall_time": time.perf_counter() - start,
+        "cpu_time": state["cpu"],
+        "max_rss_kb": state["peak_rss"],
+    }
+    read, written = state["io"]
+    if read is not None:
+        usage.update(io_read=read, io_write=written)
+    return usage
@@ -0,0 +1,260 @@
+import json
+from pathlib import Path
+
+from core.lazy import lazy_import
+from core.tallies.stats import Estimate
+
+np = lazy_import("numpy")
+
+SURROGATE_DIR = "surrogates"
+
+# added to the kernel diagonal so exact-fit cases stay well posed
+JITTER = 1e-8
+
+
+# ---------------------------------------------------------
+# surrogate: gaussian process over the sweep parameters
+# ---------------------------------------------------------
+class Surrogate:
+    """
+    Gaussian-process regression from sweep parameters to one target.
+
+    Inputs are scaled to the unit box spanned by the finished cases
+    and the target is standardized. A squared-exponential kernel is
+    used, with its length scale and amplitude picked by marginal
+    likelihood on a small grid. Per-case standard deviations, when
+    known, enter as heteroscedastic noise. predict() is a couple of
+    matrix products per chunk of points, so thousands of points take
+    milliseconds.
+    """
+
+    LENGTH_SCALES = (0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 3.0)
+    AMPLITUDES = (0.25, 1.0, 4.0)
+
+    def __init__(self, inputs, target):
+        self.inputs = list(inputs)
+        self.target = target
+
+    # -----------------------------
+    # scaling / kernel
+    # -----------------------------
+    def _unit(self, X):
+        return (X - self.lower) / self.span
+
+    def _kernel(self, A, B):
+        d2 = ((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=-1)
+        return self.amplitude * np.exp(-0.5 * d2 / self.length_scale**2)
+
+    def _factor(self):
+        K = self._kernel(self.X, self.X) + np.diag(self.noise)
+        L = np.linalg.cholesky(K)
+        self._L_inv = np.linalg.inv(L)
+        self.alpha = self._L_inv.T @ (self._L_inv @ self.y)
+        return L
+
+    def _log_likelihood(self):
+        L = self._factor()
+        return (-0.5 * self.y @ self.alpha
+                - np.log(np.diag(L)).sum()
+                - 0.5 * len(self.y) * np.log(2 * np.pi))
+
+    # -----------------------------
+    # fit
+    # -----------------------------
+    def fit(self, X, y, std_dev=None):
+        X = np.asarray(X, dtype=float).reshape(len(y), -1)
+        y = np.asarray(y, dtype=float)
+        if len(y) < 2:
+            raise ValueError(
+                f"Surrogate for '{self.target}' needs at least 2 cases"
+            )
+
+        self.lower = X.min(axis=0)
+        span = X.max(axis=0) - self.lower
+        self.span = np.where(span > 0, span, 1.0)
+        self.integer = np.all(X == np.round(X), axis=0)
+
+        self.y_mean = y.mean()
+        self.y_scale = y.std() or 1.0
+        self.X = self._unit(X)
+        self.y = (y - self.y_mean) / self.y_scale
+
+        noise = np.zeros(len(y))
+        if std_dev is not None:
+            noise = np.nan_to_num(np.asarray(std_dev, dtype=float)) ** 2
+            noise = noise / self.y_scale**2
+        self.noise = noise + JITTER
+
+        best = None
+        for self.length_scale in self.LENGTH_SCALES:
+            for self.amplitude in self.AMPLITUDES:
+                try:
+                    ll = self._log_likelihood()
+                except np.linalg.LinAlgError:
+                    continue
+                if best is None or ll > best[0]:
+                    best = (ll, self.length_scale, self.amplitude)
+        if best is None:
+            raise ValueError(f"Surrogate for '{self.target}' failed to fit")
+
+        _, self.length_scale, self.amplitude = best
+        self._factor()
+        return self
+
+    # -----------------------------
+    # query
+    # -----------------------------
+    def to_array(self, points):
+        if isinstance(points, dict):
+            missing = [k for k in self.inputs if k not in points]
+            if missing:
+                raise KeyError(f"Missing surrogate inputs: {missing}")
+            points = np.column_stack(
+                [np.atleast_1d(points[k]) for k in self.inputs])
+        points = np.asarray(points, dtype=float)
+        return points.reshape(-1, len(self.inputs))
+
+    def predict(self, points, chunk=4096):
+        """
+        Estimate of the target at points, given as an (m, inputs)
+        array or {input: values}. std_dev is the model uncertainty,
+        largest far from finished cases.
+        """
+        P = self._unit(self.to_array(points))
+        mean = np.empty(len(P))
+        var = np.empty(len(P))
+        for start in range(0, len(P), chunk):
+            Ks = self._kernel(P[start:start + chunk], self.X)
+            mean[start:start + chunk] = Ks @ self.alpha
+            v = self._L_inv @ Ks.T
+            var[start:start + chunk] = self.amplitude - (v**2).sum(axis=0)
+
+        std_dev = np.sqrt(np.clip(var, 0.0, None))
+        return Estimate(mean * self.y_scale + self.y_mean,
+                        std_dev * self.y_scale)
+
+    def suggest(self, n, candidates=4096, seed=0):
+        """
+        n parameter points where a new case would reduce the model
+        uncertainty most. Points are picked one at a time from random
+        candidates in the swept box, each treated as run before the
+        next is chosen, so suggestions spread out instead of piling up
+        at one maximum. Integer-valued inputs are rounded.
+        """
+        rng = np.random.default_rng(seed)
+        unit = rng.random((candidates, len(self.inputs)))
+        unit = np.where(self.integer,
+                        np.round(unit * self.span) / self.span, unit)
+
+        X, noise = self.X, self.noise
+        chosen = []
+        try:
+            for _ in range(n):
+                Ks = self._kernel(unit, self.X)
+                v = self._L_inv @ Ks.T
+                var = self.amplitude - (v**2).sum(axis=0)
+                best = int(np.argmax(var))
+                chosen.append(unit[best])
+                # the mean is irrelevant here: variance needs only X
+                self.X = np.vstack([self.X, unit[best]])
+                self.noise = np.append(self.noise, JITTER)
+                self.y = np.append(self.y, 0.0)
+                self._factor()
+        finally:
+            self.y = self.y[:len(X)]
+            self.X, self.noise = X, noise
+            self._factor()
+
+        points = np.asarray(chosen) * self.span + self.lower
+        return np.where(self.integer, np.round(points), points)
+
+    # -----------------------------
+    # storage
+    # -----------------------------
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"inputs": self.inputs, "target": self.target,
+                "length_scale": self.length_scale,
+                "amplitude": self.amplitude,
+                "y_mean": self.y_mean, "y_scale": self.y_scale}
+        with open(path, "wb") as f:
+            np.savez(f, X=self.X, y=self.y, noise=self.noise,
+                     lower=self.lower, span=self.span,
+                     integer=self.integer, meta=json.dumps(meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            model = cls(meta["inputs"], meta["target"])
+            for k in ("X", "y", "noise", "lower", "span", "integer"):
+                setattr(model, k, data[k])
+        for k in ("length_scale", "amplitude", "y_mean", "y_scale"):
+            setattr(model, k, meta[k])
+        model._factor()
+        return model
+
+
+# ---------------------------------------------------------
+# training data: per-case targets from an analyzed study
+# ---------------------------------------------------------
+def case_targets(name, metrics, results):
+    """
+    (values, std_dev) over the cases of results for a metric with a
+    per_case output or a tally, summed over its bins. std_dev is None
+    when the metric does not report one.
+    """
+    if name in metrics:
+        output = metrics[name]
+        per_case = output.get("per_case") if isinstance(output, dict) else None
+        if per_case is None:
+            raise ValueError(f"Metric '{name}' has no per_case output")
+        if isinstance(per_case, dict):
+            return (np.asarray(per_case["mean"], dtype=float),
+                    np.asarray(per_case["std_dev"], dtype=float))
+        return np.asarray(per_case, dtype=float), None
+
+    if name in results.tally_names:
+        total = results.estimate(name).reshape(len(results), -1).sum(axis=1)
+        return total.mean, total.std_dev
+
+    raise LookupError(f"Surrogate target '{name}' is not a metric or tally")
+
+
+def varying_inputs(results):
+    """
+    Numeric sweep parameters that differ between cases.
+    """
+    return [
+        k for k, v in results.params.items()
+        if np.issubdtype(v.dtype, np.number) and len(np.unique(v)) > 1
+    ]
+
+
+def build_surrogates(study_dir, results, metrics, cfg):
+    """
+    Fits one surrogate per target of the analysis.yaml block
+
+        surrogate:
+          targets: [production-ratio, absorption]
+          inputs: [N_tubes_y, N_tubes_z]     # default: varying params
+
+    and saves it to runs/<study>/surrogates/<target>.npz.
+    """
+    inputs = cfg.get("inputs") or varying_inputs(results)
+    if not inputs:
+        raise ValueError("No varying numeric parameters to fit on")
+    X = np.column_stack([results.params[k] for k in inputs]).astype(float)
+
+    paths = []
+    for name in cfg.get("targets", []):
+        y, std_dev = case_targets(name, metrics, results)
+        ok = np.isfinite(y)
+        model = Surrogate(inputs, name).fit(
+            X[ok], y[ok], None if std_dev is None else std_dev[ok])
+        path = Path(study_dir) / SURROGATE_DIR / f"{name}.npz"
+        model.save(path)
+        paths.append(path)
+        print(f"[SURROGATE] {name}: {ok.sum()} cases over {inputs}")
+    return paths
@@ -0,0 +1,220 @@
+import itertools
+
+from core.lazy import lazy_import
+from .schedule import WAIT
+
+np = lazy_import("numpy")
+
+SWEEP_REGISTRY = {}
+
+
+def register_sweep(name):
+    """
+    Decorator used by sweep strategies to register themselves.
+    """
+    def decorator(cls):
+        if name in SWEEP_REGISTRY:
+            raise ValueError(f"Sweep '{name}' already registered.")
+        cls.type_name = name
+        SWEEP_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def get_sweep(params, cfg):
+    """
+    Builds the sweep described by the `sweep` block of study.yaml.
+    Without one, the full cartesian product of `params` is used.
+    """
+    cfg = dict(cfg or {})
+    strategy = cfg.pop("strategy", "cartesian")
+
+    if strategy not in SWEEP_REGISTRY:
+        available = ", ".join(SWEEP_REGISTRY)
+        raise ValueError(f"Unknown sweep '{strategy}'. Available: {available}")
+
+    return SWEEP_REGISTRY[strategy](params or {}, cfg)
+
+
+# ---------------------------------------------------------
+# base: a lazy stream of case parameter dicts
+# ---------------------------------------------------------
+class Sweep:
+    """
+    cases() yields parameter dicts one at a time. An adaptive sweep
+    may yield WAIT when its next point depends on cases still running;
+    observe() is called with each finished case's statepoint (None if
+    the case failed).
+    """
+    adaptive = False
+
+    def __init__(self, params, cfg):
+        self.params = params
+        self.cfg = cfg
+
+    def cases(self):
+        raise NotImplementedError
+
+    def observe(self, params, statepoint):
+        pass
+
+
+@register_sweep("cartesian")
+class Cartesian(Sweep):
+    def cases(self):
+        keys = list(self.params)
+        values = [
+            v if isinstance(v, (list, tuple)) else [v]
+            for v in self.params.values()
+        ]
+        for prod in itertools.product(*values):
+            yield dict(zip(keys, prod))
+
+
+# ---------------------------------------------------------
+# sampling: unit hypercube points mapped onto params
+# ---------------------------------------------------------
+def _map_value(spec, u):
+    """
+    {min, max[, log, integer]} ranges are scaled, lists are treated
+    as discrete choices, scalars stay fixed.
+    """
+    if isinstance(spec, dict):
+        lo, hi = spec["min"], spec["max"]
+        if spec.get("log", False):
+            value = float(np.exp(np.log(lo) + u * (np.log(hi) - np.log(lo))))
+        else:
+            value = float(lo + u * (hi - lo))
+        if spec.get("integer", False):
+            value = int(round(value))
+        return value
+
+    if isinstance(spec, (list, tuple)):
+        return spec[min(int(u * len(spec)), len(spec) - 1)]
+
+    return spec
+
+
+class Sampled(Sweep):
+    """
+    Common base for space-filling designs: `samples` points, drawn
+    over the dimensions of `params` that are ranges or lists.
+    """
+
+    def unit_points(self, n, d, rng):
+        raise NotImplementedError
+
+    def cases(self):
+        dims = [k for k, v in self.params.items()
+                if isinstance(v, (dict, list, tuple))]
+        n = int(self.cfg.get("samples", 16))
+        rng = np.random.default_rng(self.cfg.get("seed", 0))
+        points = self.unit_points(n, len(dims), rng)
+
+        for row in points:
+            case = dict(self.params)
+            for k, u in zip(dims, row):
+                case[k] = _map_value(self.params[k], u)
+            yield case
+
+
+@register_sweep("lhs")
+class LatinHypercube(Sampled):
+    def unit_points(self, n, d, rng):
+        # one point per stratum along every dimension
+        strata = np.stack([rng.permutation(n) for _ in range(d)], axis=1)
+        return (strata + rng.random((n, d))) / n
+
+
+@register_sweep("sobol")
+class Sobol(Sampled):
+    def unit_points(self, n, d, rng):
+        try:
+            from scipy.stats import qmc
+        except ImportError as err:
+            raise ImportError(
+                "The 'sobol' sweep needs scipy (scipy.stats.qmc)."
+            ) from err
+        sampler = qmc.Sobol(d=d, scramble=True, seed=rng)
+        return sampler.random(n)
+
+
+# ---------------------------------------------------------
+# adaptive: bracket the point where an objective hits a target
+# ---------------------------------------------------------
+@register_sweep("bisect")
+class Bisect(Sweep):
+    """
+    Bisection on one range parameter until the objective (keff by
+    default) is within `tolerance` of `target`:
+
+        sweep:
+          strategy: bisect
+          param: tube_radius     # {min, max} in params
+          target: 1.0
+          tolerance: 0.001
+          max_cases: 12
+
+    The two end points run concurrently, then one midpoint at a time.
+    """
+    adaptive = True
+
+    def __init__(self, params, cfg):
+        super().__init__(params, cfg)
+        self.param = cfg["param"]
+        self.target = float(cfg.get("target", 1.0))
+        self.tolerance = float(cfg.get("tolerance", 1e-3))
+        self.max_cases = int(cfg.get("max_cases", 12))
+        self.values = {}
+
+    def objective(self, statepoint):
+        from core.tallies.statepoint import StatepointReader
+        with StatepointReader(statepoint) as sp:
+            return sp.keff[0]
+
+    def observe(self, params, statepoint):
+        x = params[self.param]
+        self.values[x] = (None if statepoint is None
+                          else self.objective(statepoint) - self.target)
+
+    def _case(self, x):
+        case = dict(self.params)
+        case[self.param] = x
+        return case
+
+    def _wait_for(self, *xs):
+        while any(x not in self.values for x in xs):
+            yield WAIT
+
+    def cases(self):
+        spec = self.params[self.param]
+        lo, hi = float(spec["min"]), float(spec["max"])
+
+        yield self._case(lo)
+        yield self._case(hi)
+        yield from self._wait_for(lo, hi)
+
+        f_lo, f_hi = self.values[lo], self.values[hi]
+        if f_lo is None or f_hi is None:
+            print("[SWEEP] bisect stopped: end point failed")
+            return
+        if f_lo * f_hi > 0:
+            print("[SWEEP] bisect stopped: target not bracketed")
+            return
+
+        for _ in range(self.max_cases - 2):
+            mid = 0.5 * (lo + hi)
+            yield self._case(mid)
+            yield from self._wait_for(mid)
+
+            f_mid = self.values[mid]
+            if f_mid is None:
+                print("[SWEEP] bisect stopped: midpoint failed")
+                return
+            if abs(f_mid) <= self.tolerance:
+                print(f"[SWEEP] {self.param} = {mid} meets target")
+                return
+            if f_lo * f_mid <= 0:
+                hi, f_hi = mid, f_mid
+            else:
+                lo, f_lo = mid, f_mid
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import math
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.lazy import lazy_import
+from .cache import link_file
+
+mc = lazy_import('openmc4d')
+np = lazy_import('numpy')
+
+DEFAULT_TILE = 512
+DEFAULT_TILE_JOBS = 4
+
+# id of pixels outside every cell / material
+VOID = -1
+BACKGROUND = (255, 255, 255)
+
+# (horizontal, vertical) coordinate index of each slice basis
+BASES = {'xy': (0, 1), 'xz': (0, 2), 'yz': (1, 2)}
+
+
+# ---------------------------------------------------------
+# ids ↔ colours: tiles are rendered with one colour per id
+# ---------------------------------------------------------
+def _encode(domain_id):
+    return ((domain_id >> 16) & 255, (domain_id >> 8) & 255, domain_id & 255)
+
+
+def _decode(rgb):
+    rgb = np.rint(np.asarray(rgb)[..., :3] * 255).astype(np.int32)
+    ids = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    ids[(rgb == BACKGROUND).all(axis=-1)] = VOID
+    return ids
+
+
+def _domain_ids(case_dir, color_by):
+    fname, tag = (('materials.xml', 'material') if color_by == 'material'
+                  else ('geometry.xml', 'cell'))
+    root = ET.parse(Path(case_dir) / fname).getroot()
+    return [int(e.get('id')) for e in root.iter(tag)]
+
+
+def colorize(ids, colors, palette):
+    """
+    RGB image of an id raster. Ids in `colors` get that colour, the
+    rest cycle through `palette`; void pixels are white.
+    """
+    unique, inverse = np.unique(ids, return_inverse=True)
+    table = np.array([
+        BACKGROUND if i == VOID
+        else colors.get(int(i), palette[int(i) % len(palette)])
+        for i in unique
+    ], dtype=np.uint8)
+    return table[inverse].reshape(ids.shape + (3,))
+
+
+# ---------------------------------------------------------
+# tile: one lattice-aligned square of id pixels
+# ---------------------------------------------------------
+def render_tile(case_dir, view, path):
+    """
+    Rasterizes `view` (origin, width, pixels, basis, color_by) with
+    openmc4d and stores the cell or material id of every pixel in
+    path (.npy).
+    """
+    import matplotlib.image as mpimg
+
+    case_dir = Path(case_dir)
+    with tempfile.TemporaryDirectory() as tmp:
+        for fname in ('geometry.xml', 'materials.xml', 'settings.xml'):
+            if (case_dir / fname).exists():
+                link_file(case_dir / fname, Path(tmp) / fname)
+
+        plot = mc.Plot()
+        plot.filename = 'tile'
+        plot.basis = view['basis']
+        plot.origin = view['origin']
+        plot.width = view['width']
+        plot.pixels = view['pixels']
+        plot.color_by = view['color_by']
+        plot.background = BACKGROUND
+        plot.colors = {i: _encode(i)
+                       for i in _domain_ids(case_dir, view['color_by'])}
+        mc.Plots([plot]).export_to_xml(tmp)
+        mc.plot_geometry(output=False, openmc_exec='openmc4d', cwd=tmp)
+        ids = _decode(mpimg.imread(Path(tmp) / 'tile.png'))
+
+    # cases sharing a geometry may render the same tile concurrently;
+    # each writes its own temporary file and renames it into place
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp',
+                                     delete=False) as f:
+        np.save(f, ids)
+    Path(f.name).replace(path)
+    return path
+
+
+def raster_shape(width, pixels):
+    """
+    (horizontal, vertical) pixel counts; an int `pixels` is a total
+    split by the aspect ratio of `width`, as in Model.plot.
+    """
+    if isinstance(pixels, (list, tuple)):
+        return int(pixels[0]), int(pixels[1])
+    rows = math.sqrt(pixels * width[1] / width[0])
+    return int(pixels / rows), int(rows)
+
+
+def tile_key(geometry, view):
+    blob = json.dumps({'geometry': geometry, **view},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ---------------------------------------------------------
+# plot: assemble a slice from cached tiles
+# ---------------------------------------------------------
+def plot_tiled(case_dir, plot_cfg, geometry, tile_root, palette, target):
+    """
+    Renders one slice as a mosaic of `tiles` x `tiles` pixel tiles.
+
+    Tiles sit on a lattice anchored at the world origin with the
+    slice's pixel size, and are cached under tile_root by geometry
+    digest and window, so zooming at the same resolution, panning or
+    re-colouring only rasterizes tiles not seen before. Missing tiles
+    render concurrently (`tile_jobs`). With `pyramid: true`, target
+    becomes a directory of zoom levels instead of one PNG.
+    """
+    import matplotlib.image as mpimg
+
+    cfg = dict(plot_cfg)
+    size = DEFAULT_TILE if cfg['tiles'] is True else int(cfg['tiles'])
+    basis = cfg.get('basis', 'xy')
+    color_by = cfg.get('color_by', 'cell')
+    origin = [float(x) for x in cfg.get('origin', (0.0, 0.0, 0.0))]
+    width = [float(x) for x in cfg['width']]
+    h_axis, v_axis = BASES[basis]
+
+    # pixel window on the lattice (rows count downwards)
+    n_h, _ = raster_shape(width, cfg.get('pixels', 40000))
+    d = width[0] / n_h
+    n_v = int(round(width[1] / d))
+    col0 = int(round((origin[h_axis] - width[0] / 2) / d))
+    row0 = int(round(-(origin[v_axis] + width[1] / 2) / d))
+
+    jobs = []
+    for tr in range(row0 // size, (row0 + n_v - 1) // size + 1):
+        for tc in range(col0 // size, (col0 + n_h - 1) // size + 1):
+            tile_origin = list(origin)
+            tile_origin[h_axis] = (tc + 0.5) * size * d
+            tile_origin[v_axis] = -(tr + 0.5) * size * d
+            view = {'basis': basis, 'color_by': color_by,
+                    'origin': tile_origin, 'width': [size * d] * 2,
+                    'pixels': [size, size]}
+            # lattice position fixes the window; floats rounded
+            key = tile_key(geometry, {
+                'basis': basis, 'color_by': color_by, 'size': size,
+                'pixel': f'{d:.12g}', 'tile': [tr, tc],
+                'slice': f'{origin[3 - h_axis - v_axis]:.12g}',
+            })
+            jobs.append((tr, tc, view, Path(tile_root) / f'{key}.npy'))
+
+    missing = [(view, path) for _, _, view, path in jobs
+               if not path.exists()]
+    if missing:
+        with ThreadPoolExecutor(cfg.get('tile_jobs',
+                                        DEFAULT_TILE_JOBS)) as pool:
+            list(pool.map(lambda j: render_tile(case_dir, *j), missing))
+
+    ids = np.full((n_v, n_h), VOID, dtype=np.int32)
+    for tr, tc, _, path in jobs:
+        tile = np.load(path, mmap_mode='r')
+        r0, c0 = tr * size - row0, tc * size - col0
+        rs = slice(max(r0, 0), min(r0 + size, n_v))
+        cs = slice(max(c0, 0), min(c0 + size, n_h))
+        ids[rs, cs] = tile[rs.start - r0:rs.stop - r0,
+                           cs.start - c0:cs.stop - c0]
+
+    colors = {int(k): tuple(v) for k, v in (cfg.get('colors') or {}).items()}
+    if cfg.get('pyramid'):
+        return write_pyramid(ids, colors, palette, size, target)
+    mpimg.imsave(target, colorize(ids, colors, palette))
+    return target
+
+
+def write_pyramid(ids, colors, palette, size, root):
+    """
+    Writes <root>/<level>/<row>_<col>.png, level 0 being full
+    resolution and each level halving it by subsampling the id
+    raster, plus <root>/pyramid.json describing the levels.
+    """
+    import matplotlib.image as mpimg
+
+    root = Path(root).with_suffix('')
+    levels = []
+    level = 0
+    while True:
+        step = 2 ** level
+        raster = ids[::step, ::step]
+        out = root / str(level)
+        out.mkdir(parents=True, exist_ok=True)
+        for r in range(0, raster.shape[0], size):
+            for c in range(0, raster.shape[1], size):
+                block = raster[r:r + size, c:c + size]
+                mpimg.imsave(out / f'{r // size}_{c // size}.png',
+                             colorize(block, colors, palette))
+        levels.append({'level': level, 'shape': list(raster.shape)})
+        if max(raster.shape) <= size:
+            break
+        level += 1
+
+    with open(root / 'pyramid.json', 'w') as f:
+        json.dump({'tile_size': size, 'levels': levels}, f, indent=2)
+    return root
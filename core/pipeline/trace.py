@@ -0,0 +1,266 @@
+import cProfile
+import json
+import os
+import re
+import resource
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# active tracer; stage() and record() are no-ops while it is None
+_tracer = None
+
+# peak RSS (kB) of the measured blocks open in this process, innermost
+# last; None where the high-water mark cannot be reset
+_peaks = []
+
+
+# ---------------------------------------------------------
+# resources: cpu, peak rss and io counters (linux /proc)
+# ---------------------------------------------------------
+def io_counters(pid="self"):
+    """
+    (bytes read, bytes written) by a process, or (None, None).
+    """
+    try:
+        with open(f"/proc/{pid}/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _peak_rss_kb():
+    try:
+        with open("/proc/self/status", "r") as f:
+            return next(int(line.split()[1]) for line in f
+                        if line.startswith("VmHWM:"))
+    except (OSError, ValueError, StopIteration):
+        return None
+
+
+def _reset_peak_rss():
+    # ru_maxrss only ever grows; writing 5 to clear_refs restarts
+    # VmHWM from the current RSS (linux >= 4.0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _fold_peak(peak):
+    for i, outer in enumerate(_peaks):
+        if outer is not None and peak is not None:
+            _peaks[i] = max(outer, peak)
+
+
+def usage_snapshot():
+    """
+    Opens a measured block; pair with usage_delta. The peak RSS
+    high-water mark restarts here, and the peak so far is handed to
+    the blocks this one is nested in.
+    """
+    _fold_peak(_peak_rss_kb())
+    _peaks.append(0 if _reset_peak_rss() else None)
+
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    read, written = io_counters()
+    return {
+        "wall": time.perf_counter(),
+        "cpu": (ru.ru_utime + ru.ru_stime
+                + children.ru_utime + children.ru_stime),
+        "io_read": read,
+        "io_write": written,
+    }
+
+
+def usage_delta(before):
+    """
+    Wall and CPU time (including reaped children), peak RSS and bytes
+    read / written since before. Peak RSS is left out where it cannot
+    be measured per block.
+    """
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    read, written = io_counters()
+    delta = {
+        "wall_time": time.perf_counter() - before["wall"],
+        "cpu_time": (ru.ru_utime + ru.ru_stime + children.ru_utime
+                     + children.ru_stime - before["cpu"]),
+    }
+
+    peak = _peaks.pop()
+    if peak is not None:
+        peak = max(peak, _peak_rss_kb() or 0)
+        delta["max_rss_kb"] = peak
+        _fold_peak(peak)
+
+    for k, v in (("io_read", read), ("io_write", written)):
+        if before[k] is not None and v is not None:
+            delta[k] = v - before[k]
+    return delta
+
+
+def measured(func, *args, profile=None):
+    """
+    Calls func(*args) and returns (result, usage). Meant to run in a
+    worker process, so that stages there report the same usage as
+    stage(); with a `profile` path it also runs under cProfile.
+    """
+    profiler = cProfile.Profile() if profile else None
+    before = usage_snapshot()
+    try:
+        if profiler:
+            profiler.enable()
+        result = func(*args)
+    finally:
+        if profiler:
+            profiler.disable()
+        usage = usage_delta(before)
+    if profiler:
+        Path(profile).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile)
+        usage["profile"] = str(profile)
+    return result, usage
+
+
+# ---------------------------------------------------------
+# tracer: one trace file per run
+# ---------------------------------------------------------
+class Tracer:
+    """
+    Writes one record per stage execution. "jsonl" appends a JSON line
+    as each stage ends; "chrome" collects events and writes a Chrome
+    trace (chrome://tracing, Perfetto) on close, with one lane per case.
+    Stages named in `profile` also run under cProfile, with stats
+    dumped to profile_dir/<stage>-<case>.prof.
+    """
+
+    def __init__(self, path, fmt="jsonl", profile=(), profile_dir=None):
+        if fmt not in ("jsonl", "chrome"):
+            raise ValueError(f"Unknown trace format '{fmt}'")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.profile = set(profile)
+        self.profile_dir = Path(profile_dir or self.path.parent)
+        self.origin = time.perf_counter()
+        self.events = []
+        self.lanes = {}
+        self.unprofiled = set()
+        self._file = open(self.path, "w") if fmt == "jsonl" else None
+
+    def profile_path(self, name, case):
+        if name not in self.profile:
+            return None
+        # stage names like "metric:k_eff" are not safe file names
+        stem = re.sub(r"[^\w.-]", "_", f"{name}-{case or 'study'}")
+        return self.profile_dir / f"{stem}.prof"
+
+    def emit(self, name, case, start, usage):
+        if self.fmt == "jsonl":
+            record = {"stage": name, "case": case,
+                      "start": start - self.origin, **usage}
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            return
+
+        lane = self.lanes.setdefault(case, len(self.lanes))
+        self.events.append({
+            "name": name,
+            "cat": "stage",
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": usage.get("wall_time", 0.0) * 1e6,
+            "pid": os.getpid(),
+            "tid": lane,
+            "args": {"case": case, **usage},
+        })
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            return
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(),
+             "tid": lane, "args": {"name": case or "study"}}
+            for case, lane in self.lanes.items()
+        ]
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": meta + self.events}, f)
+
+
+def start(path, fmt="jsonl", profile=(), profile_dir=None):
+    global _tracer
+    _tracer = Tracer(path, fmt, profile, profile_dir)
+    return _tracer
+
+
+def stop():
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        print(f"Wrote trace → {_tracer.path}")
+    _tracer = None
+
+
+# ---------------------------------------------------------
+# hooks
+# ---------------------------------------------------------
+def profile_path(name, case=None):
+    """
+    Where a worker running stage `name` should dump its profile (see
+    measured), or None when the stage is not profiled.
+    """
+    if _tracer is None:
+        return None
+    return _tracer.profile_path(name, case)
+
+
+@contextmanager
+def stage(name, case=None):
+    """
+    Records wall/CPU time, peak RSS and IO of the enclosed block.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+
+    path = tracer.profile_path(name, case)
+    profiler = cProfile.Profile() if path else None
+
+    before = usage_snapshot()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            tracer.profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+        tracer.emit(name, case, before["wall"], usage_delta(before))
+
+
+def record(name, case=None, start=None, **usage):
+    """
+    Records a stage measured elsewhere (a worker process or a batch
+    job). `start` is a perf_counter value from this process. A
+    profiled stage that comes back without a profile (e.g. the
+    openmc4d transport) is reported once instead of skipped silently.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return
+    if start is None:
+        start = time.perf_counter() - usage.get("wall_time", 0.0)
+    if (name in tracer.profile and "profile" not in usage
+            and name not in tracer.unprofiled):
+        tracer.unprofiled.add(name)
+        print(f"[TRACE] '{name}' runs outside this process "
+              "and cannot be profiled")
+    tracer.emit(name, case, start, usage)
@@ -0,0 +1,153 @@
+from pathlib import Path
+
+import yaml
+
+from core.models.params import resolve
+from core.metrics.registry import METRICS_REGISTRY
+from core.artifacts.registry import ARTIFACTS_REGISTRY
+from .manifest import Manifest
+from .schedule import WAIT
+
+
+# ---------------------------------------------------------
+# utility: analysis.yaml entries
+# ---------------------------------------------------------
+def parse_entry(entry):
+    """
+    Metric/artifact entries are a name, a dict with a "name" key,
+    or a single-key dict {name: cfg}.
+    """
+    if isinstance(entry, str):
+        return entry, {}
+    if isinstance(entry, dict):
+        if "name" in entry:
+            return entry["name"], entry
+        if len(entry) == 1:
+            name, cfg = next(iter(entry.items()))
+            return name, cfg or {}
+    raise TypeError(f"Invalid analysis entry: {entry}")
+
+
+def _resolve(registry, name, kind, problems):
+    try:
+        return registry[name]
+    except KeyError:
+        available = ", ".join(registry)
+        problems.append(f"unknown {kind} '{name}' (available: {available})")
+    except ImportError as err:
+        problems.append(f"{kind} '{name}' failed to import: {err}")
+    return None
+
+
+# ---------------------------------------------------------
+# analysis: metric/artifact dependencies vs declared tallies
+# ---------------------------------------------------------
+def check_analysis(analysis, tally_names):
+    """
+    Returns a list of problems analyze.py would hit with these tallies:
+    unknown metrics or artifacts, metrics reading tallies the study
+    does not declare, and results nothing produces.
+    """
+    problems = []
+    available = set(tally_names) | set(
+        analysis.get("available_observables", []))
+
+    metrics = {}
+    for entry in analysis.get("metrics") or []:
+        name, _ = parse_entry(entry)
+        metrics[name] = _resolve(METRICS_REGISTRY, name, "metric", problems)
+
+    for name, func in metrics.items():
+        if func is None:
+            continue
+        missing = [r for r in func.requires_observables
+                   if r not in available]
+        if missing:
+            problems.append(
+                f"metric '{name}' reads tallies not in study.yaml: {missing}"
+            )
+        missing = [r for r in getattr(func, "requires_results", [])
+                   if r not in metrics]
+        if missing:
+            problems.append(f"metric '{name}' needs results {missing}")
+
+    for entry in analysis.get("artifacts") or []:
+        name, _ = parse_entry(entry)
+        func = _resolve(ARTIFACTS_REGISTRY, name, "artifact", problems)
+        if func is None:
+            continue
+        missing = [r for r in getattr(func, "requires_results", None) or []
+                   if r not in metrics]
+        if missing:
+            problems.append(f"artifact '{name}' needs results {missing}")
+
+    return problems
+
+
+# ---------------------------------------------------------
+# sweep: cases known before anything runs
+# ---------------------------------------------------------
+def plan_cases(sweep):
+    """
+    Expands a sweep without running it. Adaptive sweeps are followed
+    up to their first WAIT. Returns (cases, bound), bound being the
+    most cases the sweep can run, or None if it has no limit.
+    """
+    cases = []
+    for params in sweep.cases():
+        if params is WAIT:
+            break
+        cases.append(params)
+
+    if not sweep.adaptive:
+        return cases, len(cases)
+    return cases, getattr(sweep, "max_cases", None)
+
+
+# ---------------------------------------------------------
+# cost: particle histories, calibrated from past manifests
+# ---------------------------------------------------------
+def case_work(params, early_stopping=None):
+    """
+    Particle-batches a case runs at most: particles x batches, with
+    early stopping capped at its max_batches.
+    """
+    p = resolve(params)
+    batches = p["batches"]
+    if early_stopping:
+        batches = int(early_stopping.get("max_batches", batches))
+    return p["particles"] * batches
+
+
+def calibrate(runs_root, model_name=None):
+    """
+    Transport seconds per particle-batch over the finished, uncached
+    cases of every runs/<study>/manifest.json. Studies of model_name
+    are used when there are any. Returns (rate, cases) or (None, 0).
+    """
+    totals = {True: [0.0, 0, 0], False: [0.0, 0, 0]}
+
+    for path in sorted(Path(runs_root).glob("*/manifest.json")):
+        frozen = path.parent / "study_frozen.yaml"
+        same_model = False
+        if frozen.exists():
+            with open(frozen, "r") as f:
+                same_model = (yaml.safe_load(f) or {}).get("model") == model_name
+
+        for entry in Manifest(path).cases.values():
+            if entry.get("state") != "done" or entry.get("cached"):
+                continue
+            if not entry.get("wall_time"):
+                continue
+            p = resolve(entry.get("params"))
+            # early-stopped cases record the batches they actually ran
+            work = p["particles"] * entry.get("batches", p["batches"])
+            t = totals[same_model]
+            t[0] += entry["wall_time"]
+            t[1] += work
+            t[2] += 1
+
+    for seconds, work, n in (totals[True], totals[False]):
+        if n and work:
+            return seconds / work, n
+    return None, 0
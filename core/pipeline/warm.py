@@ -0,0 +1,125 @@
+from pathlib import Path
+
+from core.lazy import lazy_import
+from .schedule import WAIT
+
+mc = lazy_import("openmc4d")
+
+
+# ---------------------------------------------------------
+# distance: how far apart two cases are in parameter space
+# ---------------------------------------------------------
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def distance(a, b, keys=None):
+    """
+    Sum of relative differences over numeric parameters. Cases that
+    differ in a non-numeric parameter are never neighbours.
+    """
+    keys = keys or sorted(set(a) | set(b))
+    total = 0.0
+    for k in keys:
+        x, y = a.get(k), b.get(k)
+        if x == y:
+            continue
+        if not (_numeric(x) and _numeric(y)):
+            return float("inf")
+        total += abs(x - y) / max(abs(x), abs(y))
+    return total
+
+
+# ---------------------------------------------------------
+# warm start: seed cases from a finished neighbour's source
+# ---------------------------------------------------------
+class WarmStart:
+    """
+    Configured by the `warm_start` block of study.yaml:
+
+        warm_start:
+          inactive: 10                    # inactive batches when seeded
+          params: [N_tubes_y, N_tubes_z]  # distance metric (default: all)
+
+    Each case is seeded from the fission source stored in the
+    statepoint of its nearest earlier case, with fewer inactive
+    batches and the same number of active ones. order() chains the
+    sweep so that every case has a close, earlier neighbour.
+
+    The seed depends only on the order cases are prepared in and on
+    which cases failed, never on which finished first, so a resumed
+    sweep picks the same seeds. With `lag` cases in flight, the
+    lag - 1 cases just before a case are skipped as seeds; they are
+    usually still running, and waiting for them would serialize the
+    sweep.
+    """
+
+    def __init__(self, cfg, lag=1):
+        self.inactive = int(cfg.get("inactive", 10))
+        self.keys = cfg.get("params")
+        self.lag = lag
+        self.cases = []       # (name, params) in preparation order
+        self.outcomes = {}    # name -> (statepoint, key), None if failed
+
+    def order(self, items):
+        """
+        Greedy nearest-neighbour chain over (index, params) pairs,
+        starting from the first case of the sweep.
+        """
+        remaining = list(items)
+        if not remaining:
+            return []
+        chain = [remaining.pop(0)]
+        while remaining:
+            last = chain[-1][1]
+            nxt = min(range(len(remaining)),
+                      key=lambda i: distance(last, remaining[i][1], self.keys))
+            chain.append(remaining.pop(nxt))
+        return chain
+
+    def add(self, name, params):
+        """
+        Registers the case being prepared; later cases may seed from it.
+        """
+        self.cases.append((name, params))
+
+    def record(self, name, statepoint, key):
+        """
+        Records how a case ended: its statepoint and cache key, or a
+        failure when statepoint is None or missing.
+        """
+        if statepoint is not None and Path(statepoint).exists():
+            self.outcomes[name] = (Path(statepoint).resolve(), key)
+        else:
+            self.outcomes[name] = None
+
+    def seed_for(self, params):
+        """
+        (statepoint, cache key) of the nearest earlier case that did
+        not fail, or (None, None). Returns WAIT while that case is
+        still running. The seed changes the statepoint a case
+        produces, so its key belongs in the case key.
+        """
+        earlier = self.cases[:max(0, len(self.cases) - self.lag + 1)]
+        # ties go to the earlier case
+        ranked = sorted((distance(params, other, self.keys), i, name)
+                        for i, (name, other) in enumerate(earlier))
+        for d, _, name in ranked:
+            if d == float("inf"):
+                break
+            if name not in self.outcomes:
+                return WAIT
+            if self.outcomes[name] is not None:
+                return self.outcomes[name]
+        return None, None
+
+
+def apply_warm_start(settings, statepoint, inactive):
+    """
+    Starts from the source bank in `statepoint`, cutting inactive
+    batches to `inactive` while keeping the active batch count.
+    """
+    active = settings.batches - settings.inactive
+    settings.source = mc.FileSource(str(statepoint))
+    settings.inactive = min(inactive, settings.inactive)
+    settings.batches = settings.inactive + active
@@ -0,0 +1,51 @@
+import argparse
+import json
+import traceback
+from pathlib import Path
+
+from .run import run_case
+
+# written when a batch-run case ends, polled by the batch executors
+STATUS_FILE = "status.json"
+
+
+# ---------------------------------------------------------
+# worker: run the cases of one batch array task
+# ---------------------------------------------------------
+def run_task(case_list, task, per_task, threads=None):
+    """
+    Runs lines [task*per_task, (task+1)*per_task) of case_list and
+    writes status.json into each case directory when it ends.
+    """
+    with open(case_list, "r") as f:
+        entries = [line.split() for line in f if line.strip()]
+
+    for case_dir, attempt in entries[task * per_task:(task + 1) * per_task]:
+        case_dir = Path(case_dir)
+        status = {"attempt": int(attempt)}
+        try:
+            status["usage"] = run_case(case_dir, threads, int(attempt))
+        except Exception as err:
+            status["error"] = str(err) or type(err).__name__
+            # None when the case failed before openmc4d ran
+            status["exit_status"] = getattr(err, "exit_status", None)
+            traceback.print_exc()
+
+        tmp = case_dir / (STATUS_FILE + ".tmp")
+        tmp.write_text(json.dumps(status))
+        tmp.replace(case_dir / STATUS_FILE)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("case_list")
+    parser.add_argument("--task", type=int, required=True)
+    parser.add_argument("--per-task", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    run_task(args.case_list, args.task, args.per_task, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,10 @@
-from . import integral
-from . import distributions
\ No newline at end of file
+# =================================
+# Add user tallies here
+#   name -> module (relative to this package), imported on first use
+# =================================
+MANIFEST = {
+    "absorption": ".integral",
+    "fission": ".integral",
+    "nu-fission": ".integral",
+    "integral-set": ".integral",
+}
@@ -1,12 +1,17 @@
-import openmc4d as mc
+from core.lazy import lazy_import
 from .registry import register_tally, Tally
 
+mc = lazy_import("openmc4d")
+
 # ---------------------------------------------------------
 # utility: extract 1d tally
 # ---------------------------------------------------------
-def extract_1d(statepoint, name):
+def extract_1d(statepoint, name, bins=None):
     t = statepoint.get_tally(name=name)
-    return t.mean
+    if bins is None:
+        return t.mean
+    # StatepointReader views read only the requested filter bins
+    return t.read_mean(bins=bins)
     
 
 @register_tally("absorption")
@@ -52,7 +57,6 @@ class Integral(Tally):
         return t
     
     def extract(self, statepoint):
-        t = []
-        for tally in self.tallies:
-            t.append(tally().extract(statepoint))
-        return t
\ No newline at end of file
+        # sub-tallies share the caller's open statepoint handle
+        return [extract_1d(statepoint, tally.name)
+                for tally in self.tallies]
\ No newline at end of file
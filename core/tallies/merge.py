@@ -0,0 +1,145 @@
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from core.lazy import lazy_import
+
+mc = lazy_import("openmc4d")
+
+# written next to tallies.xml; read back by StatepointReader
+TALLY_MAP_FILE = "tally_map.json"
+
+
+# ---------------------------------------------------------
+# signature: what two tallies must share to be merged
+# ---------------------------------------------------------
+class Unkeyable(Exception):
+    """
+    A filter or derivative whose full definition cannot be read.
+    """
+
+
+def _xml_key(obj, drop=()):
+    """
+    The object's XML definition without ids (and without the child
+    elements named in `drop`), so equal definitions compare equal.
+    """
+    try:
+        elem = obj.to_xml_element()
+    except (AttributeError, TypeError, NotImplementedError) as err:
+        raise Unkeyable(type(obj).__name__) from err
+    for e in elem.iter():
+        e.attrib.pop("id", None)
+        e.attrib.pop("name", None)
+        for child in [c for c in e if c.tag in drop]:
+            e.remove(child)
+    return ET.tostring(elem, encoding="unicode")
+
+
+def _filter_key(f):
+    mesh = getattr(f, "mesh", None)
+    if mesh is None:
+        return [type(f).__name__, _xml_key(f)]
+    # a mesh filter's bins are its mesh id; key on the mesh itself,
+    # grid spacing included
+    return [type(f).__name__, _xml_key(f, drop=("bins",)), _xml_key(mesh)]
+
+
+def _signature(tally):
+    """
+    JSON key of everything a tally shares with its merge partners,
+    or None when it cannot be fully keyed and must stay on its own.
+    """
+    derivative = getattr(tally, "derivative", None)
+    try:
+        key = {
+            "filters": [_filter_key(f) for f in tally.filters or []],
+            "nuclides": list(tally.nuclides or []),
+            "estimator": getattr(tally, "estimator", None),
+            "derivative": (None if derivative is None
+                           else _xml_key(derivative)),
+            "multiply_density": getattr(tally, "multiply_density", True),
+        }
+    except Unkeyable:
+        return None
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+# ---------------------------------------------------------
+# merge: one tally per distinct filter/nuclide set
+# ---------------------------------------------------------
+def merge_tallies(tallies):
+    """
+    Merges tallies that share filters (meshes compared by their full
+    definition), nuclides, estimator, derivative and multiply_density
+    into one tally scoring the union of their scores; exact duplicates
+    collapse into a single tally. Tallies with a filter that cannot be
+    keyed exactly are left alone.
+
+    Returns (tallies, tally_map). tally_map gives, for each original
+    tally name that now lives inside a merged tally,
+    {"tally": merged name, "scores": its own scores}, so its results
+    can still be read as a separate view.
+    """
+    groups = {}
+    for t in tallies:
+        signature = _signature(t)
+        groups.setdefault(signature or id(t), []).append(t)
+
+    merged, tally_map = [], {}
+    for group in groups.values():
+        names = list(dict.fromkeys(t.name for t in group))
+        scores = list(dict.fromkeys(s for t in group for s in t.scores))
+
+        duplicates = (len(names) == 1
+                      and all(list(t.scores) == scores for t in group))
+        if len(group) == 1 or duplicates:
+            merged.append(group[0])
+            continue
+
+        first = group[0]
+        tally = mc.Tally(name="+".join(names))
+        tally.filters = list(first.filters or [])
+        tally.nuclides = list(first.nuclides or [])
+        for attr in ("estimator", "derivative", "multiply_density"):
+            if getattr(first, attr, None) is not None:
+                setattr(tally, attr, getattr(first, attr))
+        tally.scores = scores
+
+        # each member's triggers keep applying to its own scores only
+        triggers = []
+        for t in group:
+            for tr in t.triggers or []:
+                trigger = mc.Trigger(tr.trigger_type, tr.threshold)
+                trigger.scores = list(t.scores)
+                triggers.append(trigger)
+        if triggers:
+            tally.triggers = triggers
+
+        merged.append(tally)
+        for t in group:
+            entry = tally_map.setdefault(
+                t.name, {"tally": tally.name, "scores": []})
+            entry["scores"] += [s for s in t.scores
+                                if s not in entry["scores"]]
+
+    return merged, tally_map
+
+
+# ---------------------------------------------------------
+# map file: per-case record of merged tallies
+# ---------------------------------------------------------
+def write_tally_map(tally_map, case_dir):
+    path = Path(case_dir) / TALLY_MAP_FILE
+    path.unlink(missing_ok=True)
+    if tally_map:
+        with open(path, "w") as f:
+            json.dump(tally_map, f, indent=2)
+
+
+def read_tally_map(case_dir):
+    path = Path(case_dir) / TALLY_MAP_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
@@ -1,6 +1,8 @@
-import openmc4d as mc
+from core.lazy import LazyRegistry, lazy_import
 
-TALLIES_REGISTRY = {}
+mc = lazy_import("openmc4d")
+
+TALLIES_REGISTRY = LazyRegistry("core.tallies", "tally")
 
 class Tally:
     default_config = {}
@@ -26,11 +28,23 @@ class Tally:
     def extract(self, statepoint):
         raise NotImplementedError
     
+    @property
+    def rel_err_target(self):
+        """
+        Relative-error target from the block config (`rel_err`), or None.
+        """
+        return getattr(self, 'cfg', self.default_config).get('rel_err')
+
     def attach(self, model):
         if model.tallies is None:
             model.tallies = mc.Tallies()
 
-        model.tallies += self.build()
+        tallies = self.build()
+        if self.rel_err_target is not None:
+            for t in tallies:
+                t.triggers = [mc.Trigger('rel_err', self.rel_err_target)]
+
+        model.tallies += tallies
 
 def register_tally(type_name):
 
@@ -38,10 +52,10 @@ def register_tally(type_name):
     Decorator used by tally to register themselves.
     """
     def decorator(cls):
-        if type_name in TALLIES_REGISTRY:
+        if TALLIES_REGISTRY.is_loaded(type_name):
             raise ValueError(f"Tally '{type_name}' already registered.")
         cls.type_name = type_name
-        TALLIES_REGISTRY[type_name] = cls
+        TALLIES_REGISTRY.register(type_name, cls)
         return cls
     return decorator
 
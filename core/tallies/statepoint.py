@@ -0,0 +1,292 @@
+from pathlib import Path
+
+from core.lazy import lazy_import
+from .merge import read_tally_map
+
+h5py = lazy_import("h5py")
+np = lazy_import("numpy")
+
+# ---------------------------------------------------------
+# statepoint: lazy reader over a single statepoint.h5
+# ---------------------------------------------------------
+class StatepointReader:
+    """
+    Opens a statepoint file once and hands out lazy tally views.
+
+    Only the tally index (ids and names) is read on open. Results are
+    read on demand, as a memory map when the dataset is stored
+    contiguously and as an HDF5 hyperslab otherwise, so asking for a
+    few filter bins never loads the whole tally.
+
+    get_tally(name=...) mirrors the openmc4d StatePoint call used by
+    Tally.extract, so existing extract methods work unchanged. Tallies
+    merged at assembly (see core.tallies.merge) are looked up through
+    the case's tally_map.json and returned as views of their own scores.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = h5py.File(self.path, "r")
+        self._views = {}
+
+        self._groups = {}
+        tallies = self._file["tallies"]
+        for tally_id in tallies.attrs.get("ids", []):
+            group = tallies[f"tally {tally_id}"]
+            if "name" in group:
+                name = group["name"][()]
+                if isinstance(name, bytes):
+                    name = name.decode()
+                self._groups[name] = group
+
+        self._merged = read_tally_map(Path(self.path).parent)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._views.clear()
+        self._file.close()
+
+    @property
+    def tally_names(self):
+        targets = {entry["tally"] for entry in self._merged.values()}
+        return ([n for n in self._groups if n not in targets]
+                + list(self._merged))
+
+    @property
+    def batches(self):
+        """
+        Number of batches actually run.
+        """
+        return int(self._file["current_batch"][()])
+
+    @property
+    def keff(self):
+        """
+        Combined k-effective estimate as (mean, std_dev).
+        """
+        mean, std_dev = self._file["k_combined"][()]
+        return float(mean), float(std_dev)
+
+    def get_tally(self, name):
+        if name not in self._views:
+            entry = self._merged.get(name)
+            if entry is not None and entry["tally"] in self._groups:
+                self._views[name] = TallyView(
+                    self, self._groups[entry["tally"]],
+                    scores=entry["scores"])
+            elif name in self._groups:
+                self._views[name] = TallyView(self, self._groups[name])
+            else:
+                raise LookupError(
+                    f"Tally '{name}' not in {self.path}. "
+                    f"Available: {', '.join(self.tally_names)}"
+                )
+        return self._views[name]
+
+    def _filter_axes(self, filter_id):
+        """
+        Named axes of one filter, slowest first. Mesh filters expand to
+        their mesh dimensions (z, y, x; x varies fastest).
+        """
+        group = self._file["tallies"]["filters"][f"filter {filter_id}"]
+        ftype = group["type"][()]
+        ftype = ftype.decode() if isinstance(ftype, bytes) else ftype
+        n_bins = int(group["n_bins"][()])
+
+        if ftype == "mesh":
+            mesh_id = int(np.ravel(group["bins"][()])[0])
+            mesh = self._file["tallies"]["meshes"][f"mesh {mesh_id}"]
+            dims = [int(d) for d in mesh["dimension"][()]]
+            names = ("x", "y", "z")[:len(dims)]
+            return list(zip(names, dims))[::-1]
+
+        return [(ftype, n_bins)]
+
+    def _results(self, dset):
+        # contiguous, unfiltered datasets can be mapped directly
+        offset = dset.id.get_offset()
+        if offset is None or dset.chunks is not None:
+            return dset
+        return np.memmap(self.path, mode="r", dtype=dset.dtype,
+                         shape=dset.shape, offset=offset)
+
+
+# ---------------------------------------------------------
+# view: one tally, read slice by slice
+# ---------------------------------------------------------
+class TallyView:
+    """
+    Lazy handle to one tally's results.
+
+    Arrays are shaped (filter bins, nuclides, scores) like the
+    openmc4d Tally.mean / Tally.std_dev attributes. read() accepts a
+    filter-bin selection (slice or index array) and score indices so
+    only that part of the results dataset is touched. With `scores`,
+    the view covers only those scores of the stored tally.
+    """
+
+    def __init__(self, reader, group, scores=None):
+        name = group["name"][()]
+        self.name = name.decode() if isinstance(name, bytes) else name
+        self.n_realizations = int(group["n_realizations"][()])
+        self._stored_scores = [
+            s.decode() if isinstance(s, bytes) else s
+            for s in group["score_bins"][()]
+        ]
+        self.scores = list(scores) if scores else self._stored_scores
+        self._columns = (
+            [self._stored_scores.index(s) for s in scores]
+            if scores else None
+        )
+        self.nuclides = [
+            n.decode() if isinstance(n, bytes) else n
+            for n in group["nuclides"][()]
+        ]
+        self._results = reader._results(group["results"])
+        self._reader = reader
+        self._filter_ids = (
+            [int(i) for i in group["filters"][()]]
+            if "filters" in group else []
+        )
+        self._axes = None
+
+    @property
+    def axes(self):
+        """
+        [(name, size), ...] over the filter bins in storage order.
+        Repeated names get a numeric suffix.
+        """
+        if self._axes is None:
+            axes, seen = [], {}
+            for fid in self._filter_ids:
+                for name, size in self._reader._filter_axes(fid):
+                    seen[name] = seen.get(name, 0) + 1
+                    if seen[name] > 1:
+                        name = f"{name}{seen[name]}"
+                    axes.append((name, size))
+            self._axes = axes or [("bin", self.shape[0])]
+        return self._axes
+
+    @property
+    def shape(self):
+        n_bins = self._results.shape[0]
+        return (n_bins, len(self.nuclides), len(self.scores))
+
+    def _select(self, bins, column):
+        if bins is None:
+            bins = slice(None)
+        raw = np.asarray(self._results[bins, :, column], dtype=float)
+        raw = raw.reshape((-1, len(self.nuclides), len(self._stored_scores)))
+        if self._columns is not None:
+            raw = raw[..., self._columns]
+        return raw
+
+    def _score_index(self, scores):
+        return [self.scores.index(s) if isinstance(s, str) else s
+                for s in scores]
+
+    def read_sum(self, bins=None, scores=None):
+        """
+        Sum of the scores over all realizations (not divided by
+        n_realizations) for the selected filter bins.
+        """
+        total = self._select(bins, 0)
+        if scores is not None:
+            total = total[..., self._score_index(scores)]
+        return total
+
+    def read_mean(self, bins=None, scores=None):
+        return self.read_sum(bins, scores) / self.n_realizations
+
+    def read(self, bins=None, scores=None):
+        """
+        Returns (mean, std_dev) for the selected filter bins.
+        """
+        n = self.n_realizations
+        total = self._select(bins, 0)
+        total_sq = self._select(bins, 1)
+
+        if scores is not None:
+            idx = self._score_index(scores)
+            total = total[..., idx]
+            total_sq = total_sq[..., idx]
+
+        mean = total / n
+        if n > 1:
+            var = (total_sq / n - mean**2) / (n - 1)
+            std_dev = np.sqrt(np.clip(var, 0.0, None))
+        else:
+            std_dev = np.zeros_like(mean)
+        return mean, std_dev
+
+    @property
+    def mean(self):
+        return self.read_mean()
+
+    @property
+    def std_dev(self):
+        return self.read()[1]
+
+
+# ---------------------------------------------------------
+# std_dev: run Tally.extract against standard deviations
+# ---------------------------------------------------------
+class StdDevReader:
+    """
+    Wraps a StatepointReader so that `.mean` on its tallies returns the
+    standard deviation. Passing it to Tally.extract yields the error
+    bars in exactly the shape extract gives the means.
+    """
+
+    def __init__(self, reader):
+        self._reader = reader
+
+    def get_tally(self, name):
+        return _StdDevView(self._reader.get_tally(name=name))
+
+
+class _StdDevView:
+
+    def __init__(self, view):
+        self._view = view
+
+    @property
+    def mean(self):
+        return self._view.std_dev
+
+    def read_mean(self, bins=None, scores=None):
+        return self._view.read(bins=bins, scores=scores)[1]
+
+
+# ---------------------------------------------------------
+# utility: worst relative error of each tally block
+# ---------------------------------------------------------
+def achieved_rel_err(statepoint_path, tally_blocks):
+    """
+    {block name: max std_dev / |mean| over its nonzero bins}.
+    """
+    achieved = {}
+    with StatepointReader(statepoint_path) as sp:
+        for b in tally_blocks:
+            mean = np.abs(np.asarray(b.extract(sp), dtype=float))
+            std_dev = np.asarray(b.extract(StdDevReader(sp)), dtype=float)
+            nonzero = mean > 0
+            achieved[b.name] = (
+                float(np.max(std_dev[nonzero] / mean[nonzero]))
+                if nonzero.any() else None
+            )
+        batches = sp.batches
+    return achieved, batches
+
+
+# ---------------------------------------------------------
+# utility: extract every tally block of a case in one open
+# ---------------------------------------------------------
+def extract_case(statepoint_path, tally_blocks):
+    with StatepointReader(statepoint_path) as sp:
+        return {b.name: b.extract(sp) for b in tally_blocks}
@@ -0,0 +1,203 @@
+from core.lazy import lazy_import
+from .statepoint import StatepointReader, StdDevReader
+
+np = lazy_import("numpy")
+
+
+# ---------------------------------------------------------
+# estimate: mean/std_dev arrays with error propagation
+# ---------------------------------------------------------
+class Estimate:
+    """
+    A mean array and its standard deviations, e.g. one tally stacked
+    over every case (cases x bins). Arithmetic works on whole arrays
+    and propagates the errors to first order, treating the operands
+    as independent (true across cases, which run separately). Use
+    bootstrap() for quantities built from correlated scores.
+
+    Scalars and plain arrays mix in as exact values.
+    """
+
+    # make ndarray <op> Estimate dispatch to the Estimate
+    __array_ufunc__ = None
+
+    def __init__(self, mean, std_dev=None):
+        self.mean = np.asarray(mean, dtype=float)
+        if std_dev is None:
+            std_dev = np.zeros_like(self.mean)
+        self.std_dev = np.asarray(std_dev, dtype=float)
+
+    @classmethod
+    def from_observable(cls, observable):
+        """
+        From the {"mean": ..., "std_dev": ...} dicts handed to
+        Metric.compute_batch.
+        """
+        return cls(observable["mean"], observable["std_dev"])
+
+    @staticmethod
+    def _coerce(other):
+        return other if isinstance(other, Estimate) else Estimate(other)
+
+    # -----------------------------
+    # arrays
+    # -----------------------------
+    @property
+    def shape(self):
+        return self.mean.shape
+
+    def __len__(self):
+        return len(self.mean)
+
+    def __getitem__(self, index):
+        return Estimate(self.mean[index], self.std_dev[index])
+
+    def reshape(self, *shape):
+        return Estimate(self.mean.reshape(*shape),
+                        self.std_dev.reshape(*shape))
+
+    @property
+    def rel_err(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.mean != 0,
+                            self.std_dev / np.abs(self.mean), np.nan)
+
+    # -----------------------------
+    # arithmetic
+    # -----------------------------
+    def __add__(self, other):
+        other = self._coerce(other)
+        return Estimate(self.mean + other.mean,
+                        np.hypot(self.std_dev, other.std_dev))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        return Estimate(self.mean - other.mean,
+                        np.hypot(self.std_dev, other.std_dev))
+
+    def __rsub__(self, other):
+        return self._coerce(other) - self
+
+    def __neg__(self):
+        return Estimate(-self.mean, self.std_dev)
+
+    def __mul__(self, other):
+        other = self._coerce(other)
+        return Estimate(self.mean * other.mean,
+                        np.hypot(self.std_dev * other.mean,
+                                 self.mean * other.std_dev))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._coerce(other)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.mean / other.mean
+            std_dev = np.hypot(self.std_dev / other.mean,
+                               mean * other.std_dev / other.mean)
+        return Estimate(mean, std_dev)
+
+    def __rtruediv__(self, other):
+        return self._coerce(other) / self
+
+    def __pow__(self, power):
+        # d(x^p)/dx = p x^(p-1), finite at x = 0 for p >= 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std_dev = np.abs(power * self.mean ** (power - 1)) * self.std_dev
+        return Estimate(self.mean ** power, std_dev)
+
+    # -----------------------------
+    # reductions
+    # -----------------------------
+    def sum(self, axis=None):
+        return Estimate(self.mean.sum(axis=axis),
+                        np.sqrt((self.std_dev**2).sum(axis=axis)))
+
+    def average(self, axis=None):
+        n = self.mean.size if axis is None else self.mean.shape[axis]
+        return self.sum(axis=axis) / n
+
+    def to_dict(self):
+        return {"mean": self.mean, "std_dev": self.std_dev}
+
+    def __repr__(self):
+        return f"Estimate(shape={self.shape})"
+
+
+# ---------------------------------------------------------
+# tally layer: a block's extract with its error bars
+# ---------------------------------------------------------
+def extract_estimate(block, reader):
+    """
+    Runs block.extract on an open StatepointReader for both the means
+    and the standard deviations.
+    """
+    return Estimate(block.extract(reader), block.extract(StdDevReader(reader)))
+
+
+# ---------------------------------------------------------
+# bootstrap: resample batches for correlated quantities
+# ---------------------------------------------------------
+def interval_batches(statepoints, name):
+    """
+    Per-interval means of tally `name` from statepoints written at
+    increasing batch counts (statepoint.10.h5, statepoint.20.h5, ...),
+    shaped (intervals, filter bins, nuclides, scores). Each row is the
+    mean over the batches run since the previous statepoint; write
+    statepoints at a fixed interval so rows weigh the same.
+    """
+    rows = []
+    previous_sum, previous_n = 0.0, 0
+    for path in statepoints:
+        with StatepointReader(path) as sp:
+            view = sp.get_tally(name=name)
+            total = view.read_sum()
+            n = view.n_realizations
+        if n <= previous_n:
+            raise ValueError(
+                f"Statepoints must be in batch order; {path} has "
+                f"{n} realizations after {previous_n}"
+            )
+        rows.append((total - previous_sum) / (n - previous_n))
+        previous_sum, previous_n = total, n
+    return np.stack(rows)
+
+
+def bootstrap(func, *batches, n_resamples=1000, seed=0, chunk=64):
+    """
+    Bootstrap estimate of func over per-batch data.
+
+    Each array in `batches` has the batch index first; batches are
+    resampled jointly so correlations between the inputs are kept.
+    func receives the resampled batch means with a leading resample
+    axis and must work along the trailing axes. Returns an Estimate
+    of func at the full-sample means, with the bootstrap standard
+    deviation. Resamples are drawn `chunk` at a time, so memory stays
+    at chunk x bins.
+    """
+    batches = [np.asarray(b, dtype=float) for b in batches]
+    n = batches[0].shape[0]
+    if any(b.shape[0] != n for b in batches):
+        raise ValueError("All inputs need the same number of batches")
+
+    flat = [b.reshape(n, -1) for b in batches]
+    center = np.asarray(func(*[b.mean(axis=0)[None] for b in batches]))[0]
+
+    rng = np.random.default_rng(seed)
+    total = np.zeros_like(center)
+    total_sq = np.zeros_like(center)
+    for start in range(0, n_resamples, chunk):
+        k = min(chunk, n_resamples - start)
+        weights = rng.multinomial(n, np.full(n, 1.0 / n), size=k) / n
+        means = [(weights @ f).reshape((k,) + b.shape[1:])
+                 for f, b in zip(flat, batches)]
+        # shifted sums keep the variance accurate for large means
+        delta = np.asarray(func(*means)) - center
+        total += delta.sum(axis=0)
+        total_sq += (delta**2).sum(axis=0)
+
+    shift = total / n_resamples
+    var = (total_sq / n_resamples - shift**2) * n_resamples / (n_resamples - 1)
+    return Estimate(center, np.sqrt(np.clip(var, 0.0, None)))
@@ -0,0 +1,132 @@
+import numpy as np
+
+# filter bins read per chunk when the dataset is not chunked itself
+DEFAULT_CHUNK_BINS = 1 << 18
+
+
+# ---------------------------------------------------------
+# chunks: stream a tally's filter bins with bounded memory
+# ---------------------------------------------------------
+def iter_chunks(view, score=0, nuclide=0, chunk_bins=None):
+    """
+    Yields (start, mean, variance) for consecutive blocks of filter
+    bins of one score/nuclide of a TallyView. Block size follows the
+    HDF5 chunking when the dataset is chunked.
+    """
+    n_bins = view.shape[0]
+    if chunk_bins is None:
+        chunks = getattr(view._results, "chunks", None)
+        chunk_bins = chunks[0] if chunks else DEFAULT_CHUNK_BINS
+
+    if isinstance(score, str):
+        score = view.scores.index(score)
+
+    for start in range(0, n_bins, chunk_bins):
+        stop = min(start + chunk_bins, n_bins)
+        mean, std_dev = view.read(bins=slice(start, stop), scores=[score])
+        mean = mean[:, nuclide, 0]
+        std_dev = std_dev[:, nuclide, 0]
+        yield start, mean, std_dev**2
+
+
+def _axis_index(view, axis):
+    names = [name for name, _ in view.axes]
+    if axis not in names:
+        raise LookupError(f"Tally '{view.name}' has no axis '{axis}': {names}")
+    return names.index(axis)
+
+
+def _unravel(view, start, count):
+    shape = [size for _, size in view.axes]
+    return np.unravel_index(np.arange(start, start + count), shape)
+
+
+# ---------------------------------------------------------
+# reduce: accumulate chunks into a small output by key
+# ---------------------------------------------------------
+def reduce_bins(view, key, n_out, score=0, nuclide=0, chunk_bins=None):
+    """
+    Sums bins into n_out outputs. key(index) maps the multi-index of a
+    chunk (tuple of arrays, one per axis) to output positions, with -1
+    for bins to skip. Variances add, so bins are treated as
+    independent. Returns (mean, std_dev) of length n_out.
+    """
+    total = np.zeros(n_out)
+    var = np.zeros(n_out)
+    for start, mean, variance in iter_chunks(view, score, nuclide,
+                                             chunk_bins):
+        out = np.asarray(key(_unravel(view, start, len(mean))))
+        keep = out >= 0
+        total += np.bincount(out[keep], weights=mean[keep], minlength=n_out)
+        var += np.bincount(out[keep], weights=variance[keep], minlength=n_out)
+    return total, np.sqrt(var)
+
+
+def project(view, axis, score=0, nuclide=0, chunk_bins=None):
+    """
+    Profile along one axis (e.g. 'x'), summed over all others.
+    """
+    i = _axis_index(view, axis)
+    n_out = view.axes[i][1]
+    return reduce_bins(view, lambda idx: idx[i], n_out,
+                       score, nuclide, chunk_bins)
+
+
+def region_integral(view, region, score=0, nuclide=0, chunk_bins=None):
+    """
+    Sum over a box of bins; region maps axis names to (lo, hi) index
+    ranges, hi exclusive. Axes not named are summed over entirely.
+    """
+    bounds = [(_axis_index(view, a), lo, hi) for a, (lo, hi) in region.items()]
+
+    def key(idx):
+        inside = np.ones(len(idx[0]), dtype=bool)
+        for i, lo, hi in bounds:
+            inside &= (idx[i] >= lo) & (idx[i] < hi)
+        return np.where(inside, 0, -1)
+
+    mean, std_dev = reduce_bins(view, key, 1, score, nuclide, chunk_bins)
+    return mean[0], std_dev[0]
+
+
+def collapse_energy(view, group_edges, axis="energy", score=0, nuclide=0,
+                    chunk_bins=None):
+    """
+    Collapses fine energy bins into coarse groups. group_edges are
+    fine-bin indices delimiting the groups, e.g. [0, 40, 100] for two
+    groups. Returns arrays shaped like the other axes plus a trailing
+    group axis.
+    """
+    i = _axis_index(view, axis)
+    edges = np.asarray(group_edges)
+    n_groups = len(edges) - 1
+    other = [size for j, (_, size) in enumerate(view.axes) if j != i]
+    n_other = int(np.prod(other)) if other else 1
+
+    def key(idx):
+        group = np.searchsorted(edges, idx[i], side="right") - 1
+        valid = (group >= 0) & (group < n_groups)
+        rest = [idx[j] for j in range(len(idx)) if j != i]
+        flat = np.ravel_multi_index(rest, other) if rest else 0
+        return np.where(valid, flat * n_groups + group, -1)
+
+    mean, std_dev = reduce_bins(view, key, n_other * n_groups,
+                                score, nuclide, chunk_bins)
+    shape = tuple(other) + (n_groups,)
+    return mean.reshape(shape), std_dev.reshape(shape)
+
+
+def peak(view, score=0, nuclide=0, chunk_bins=None):
+    """
+    Largest bin: returns (mean, std_dev, {axis: index}).
+    """
+    best = (-np.inf, 0.0, 0)
+    for start, mean, variance in iter_chunks(view, score, nuclide,
+                                             chunk_bins):
+        j = int(np.argmax(mean))
+        if mean[j] > best[0]:
+            best = (float(mean[j]), float(np.sqrt(variance[j])), start + j)
+
+    idx = np.unravel_index(best[2], [size for _, size in view.axes])
+    where = {name: int(k) for (name, _), k in zip(view.axes, idx)}
+    return best[0], best[1], where
@@ -1,8 +1,8 @@
 import argparse
-import itertools
 import os
 from pathlib import Path
 import shutil
+import time
 import yaml
 import json
 
@@ -13,14 +13,22 @@ from core.models.registry import MODEL_REGISTRY, get_model_block
 # observables registration
 from core import tallies
 from core.tallies.registry import TALLIES_REGISTRY, get_tally_blocks
+from core.tallies.statepoint import achieved_rel_err
 
 # pipeline stages
 from core import pipeline
 from core.pipeline.attach import attach_tallies
-from core.pipeline.assemble import assemble_xml
-from core.pipeline.run import run_simulation
-from core.pipeline.plot import plot_slice
+from core.pipeline.assemble import ModelAssembler
+from core.pipeline.schedule import run_cases, WAIT
+from core.pipeline.executors import get_executor
+from core.pipeline.sweep import Cartesian, get_sweep
+from core.pipeline.warm import WarmStart
+from core.pipeline import cache
+from core.pipeline.manifest import Manifest
+from core.pipeline.plot import PlotStage
 from core.pipeline.scrape import scrape_results
+from core.pipeline.validate import calibrate, case_work, check_analysis, plan_cases
+from core.pipeline import trace
 
 
 # ---------------------------------------------------------
@@ -32,24 +40,7 @@ def expand_parameters(param_dict):
     Converts a dict of parameters into a list of concrete configs.
     Scalars become length-1 lists.
     """
-    if not param_dict:
-        return [{}]
-
-    keys = list(param_dict.keys())
-    values = []
-
-    for k in keys:
-        v = param_dict[k]
-        if isinstance(v, (list, tuple)):
-            values.append(v)
-        else:
-            values.append([v])
-
-    combos = []
-    for prod in itertools.product(*values):
-        combos.append(dict(zip(keys, prod)))
-
-    return combos
+    return list(Cartesian(param_dict or {}, {}).cases())
 
 
 # ---------------------------------------------------------
@@ -60,6 +51,94 @@ def case_name(index):
     return f"case_{index:04d}"
 
 
+# ---------------------------------------------------------
+# dry run: validate a study and predict its cost
+# ---------------------------------------------------------
+
+def dry_run(cfg, study_root, run_cfg, jobs):
+    """
+    Resolves the model, tallies and sweep, checks analysis.yaml against
+    the declared tallies and estimates transport cost from past run
+    manifests. Writes nothing. Returns the list of problems found.
+    """
+    problems = []
+    study_name = cfg["name"]
+    model_name = cfg["model"]
+
+    model_block = None
+    try:
+        model_block = get_model_block(model_name)
+    except (ValueError, ImportError) as err:
+        problems.append(f"model: {err}")
+
+    tally_blocks = None
+    try:
+        tally_blocks = get_tally_blocks(cfg.get("tallies", []))
+    except (ValueError, TypeError, ImportError) as err:
+        problems.append(f"tallies: {err}")
+
+    analysis_path = study_root / "analysis.yaml"
+    if analysis_path.exists() and tally_blocks is not None:
+        with open(analysis_path, "r") as f:
+            analysis = yaml.safe_load(f) or {}
+        problems += [f"analysis.yaml: {p}" for p in
+                     check_analysis(analysis, [b.name for b in tally_blocks])]
+
+    cases, bound = [], 0
+    try:
+        sweep = get_sweep(cfg.get("params", {}), cfg.get("sweep"))
+        cases, bound = plan_cases(sweep)
+    except (KeyError, ValueError, TypeError, ImportError) as err:
+        sweep = None
+        problems.append(f"sweep: {err!r}")
+
+    # cases whose statepoint is already in the study cache
+    cached = 0
+    if model_block is not None and tally_blocks is not None:
+        cache_root = Path("runs") / study_name / "cache"
+        cached = sum(
+            cache.is_cached(cache_root, cache.case_key(
+                model_name, model_block, p, tally_blocks, run_cfg=run_cfg))
+            for p in cases
+        )
+
+    print(f"Study: {study_name}")
+    print(f"Model: {model_name}")
+    if sweep is not None:
+        limit = "up to " if sweep.adaptive else ""
+        print(f"Sweep: {sweep.type_name}, {limit}{bound} case(s), "
+              f"{cached} cached")
+    if tally_blocks is not None:
+        print(f"Tallies: {', '.join(b.name for b in tally_blocks)}")
+
+    # ------------------------
+    # cost estimate
+    # ------------------------
+    if cases and bound is not None:
+        per_case = sum(case_work(p, run_cfg.get("early_stopping"))
+                       for p in cases) / len(cases)
+        work = per_case * (bound - cached)
+        print(f"Cost: {work:.3g} particle-batches ({per_case:.3g} per case)")
+
+        rate, samples = calibrate("runs", model_name)
+        if rate is None:
+            print("Time: no finished cases in runs/*/manifest.json "
+                  "to calibrate against")
+        else:
+            seconds = work * rate
+            print(f"Time: {seconds / 3600:.2f} case-hours, "
+                  f"~{seconds / 3600 / jobs:.2f} h with -j {jobs} "
+                  f"(calibrated on {samples} past case(s))")
+    elif sweep is not None and bound is None:
+        print("Cost: unknown, the sweep sets no case limit")
+
+    for p in problems:
+        print(f"[INVALID] {p}")
+    print("Dry run OK." if not problems
+          else f"Dry run found {len(problems)} problem(s).")
+    return problems
+
+
 # ---------------------------------------------------------
 # main orchestration
 # ---------------------------------------------------------
@@ -69,6 +148,12 @@ def main(cli_args):
     ## read command-line arguments
     cli_study_name = cli_args.study
     plot_only = cli_args.plot
+    jobs = cli_args.jobs
+    threads = cli_args.threads_per_case
+    use_cache = not cli_args.no_cache
+    resume = cli_args.resume
+    retries = cli_args.retries
+    plot_jobs = cli_args.plot_jobs
 
     studies_root = Path("studies")
     # ------------------------
@@ -89,6 +174,16 @@ def main(cli_args):
     # -----------------------
     tally_entries = cfg.get("tallies", [])
     params = cfg.get("params", {})
+    early_stopping = cfg.get("early_stopping")
+    executor_cfg = dict(cfg.get("executor") or {})
+    warm_cfg = cfg.get("warm_start")
+
+    # run-mode settings that change the statepoint a case produces
+    run_cfg = {
+        k: v for k, v in
+        (("early_stopping", early_stopping), ("warm_start", warm_cfg))
+        if v
+    }
 
     # normalize plots
     plot_entries = cfg.get("plot", {})
@@ -99,6 +194,11 @@ def main(cli_args):
     else:
         raise TypeError("plot must be a dict or list")
 
+    if cli_args.dry_run:
+        if dry_run(cfg, studies_root / cli_study_name, run_cfg, jobs):
+            raise SystemExit(1)
+        return
+
     # -----------------------
     # read blocks
     # -----------------------
@@ -109,63 +209,213 @@ def main(cli_args):
     # ------------------------
     runs_root = Path("runs") / study_name
     cases_root = runs_root / "cases"
+    cache_root = runs_root / "cache"
 
     cases_root.mkdir(parents=True, exist_ok=True)
 
     # freeze config for reproducibility
     shutil.copy(config_path, runs_root / "study_frozen.yaml")
 
+    # per-stage timings of this invocation
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = "json" if cli_args.trace_format == "chrome" else "jsonl"
+    trace.start(runs_root / "trace" / f"simulate-{stamp}.{suffix}",
+                fmt=cli_args.trace_format, profile=cli_args.profile,
+                profile_dir=runs_root / "trace" / f"profile-{stamp}")
+
+    # per-case run state, kept across invocations with --resume
+    manifest = Manifest(runs_root / "manifest.json")
+    if not resume and not plot_only:
+        manifest.reset()
+
     # ------------------------
-    # expand parameter sweep
+    # parameter sweep
     # ------------------------
-    cases = expand_parameters(params)
+    sweep = get_sweep(params, cfg.get("sweep"))
+    if plot_only and sweep.adaptive:
+        raise ValueError(
+            f"Sweep '{sweep.type_name}' needs transport results "
+            "and cannot be used with --plot"
+        )
 
     print(f"Study: {study_name}")
     print(f"Model: {model_name}")
-    print(f"Total cases: {len(cases)}")
+    print(f"Sweep: {sweep.type_name}")
+
+    # reuses built models / xml between cases that share components
+    assembler = ModelAssembler(model_block, tally_blocks,
+                               early_stopping=early_stopping)
+
+    # geometry plots render in the background while cases run
+    plot_stage = PlotStage(plots, jobs=plot_jobs,
+                           cache_root=cache_root / "plots")
+
+    # seeds cases from the source of finished neighbours
+    warm = WarmStart(warm_cfg) if warm_cfg and not plot_only else None
 
     # ------------------------
-    # loop over cases
+    # stream cases
     # ------------------------
-    for i, params in enumerate(cases):
-
-        name = case_name(i+1)
-        case_dir = cases_root / name
-        case_dir.mkdir(exist_ok=True)
-
-        # save parameter realization
-        with open(case_dir / "params.json", "w") as f:
-            json.dump(params, f, indent=2)
-
-        # ------------------------
-        # attach tallies
-        # ------------------------
-        model = model_block(params)
-        print(params)
-        for block in tally_blocks:
-            block.attach(model)
-
-        # ------------------------
-        # build model + xml
-        # ------------------------
-        assemble_xml(model, case_dir)
-
-        # ------------------------
-        # plot geometry
-        # ------------------------
-        for p in plots:
-            name, plot_cfg = next(iter(p.items()))
-            plot_slice(model, case_dir,
-                       name, **plot_cfg)
-        if plot_only:
-            continue
-
-        # ------------------------
-        # run simulation
-        # ------------------------
-        run_simulation(
-            case_dir=case_dir,
-        )
+    case_keys = {}
+    case_params = {}
+
+    def observe(name, params, statepoint, key=None):
+        sweep.observe(params, statepoint)
+        if warm is not None:
+            warm.record(name, statepoint, key)
+
+    def numbered_cases():
+        # case numbers follow sweep order, whatever order they run in
+        index = 0
+        for params in sweep.cases():
+            if params is WAIT:
+                yield WAIT
+                continue
+            index += 1
+            yield index, params
+
+    stream = numbered_cases()
+    if warm is not None and not sweep.adaptive:
+        stream = warm.order(list(stream))
+
+    def prepare_cases():
+        """
+        Builds cases as the sweep generates them and yields the ones
+        that need transport. Runs lazily inside the scheduler.
+        """
+        for item in stream:
+            if item is WAIT:
+                yield WAIT
+                continue
+
+            index, params = item
+            name = case_name(index)
+            case_dir = cases_root / name
+            case_dir.mkdir(exist_ok=True)
+            case_params[case_dir] = params
+
+            # save parameter realization
+            with open(case_dir / "params.json", "w") as f:
+                json.dump(params, f, indent=2)
+
+            # the seed is fixed here, before the key that depends on it;
+            # it may have to wait for an earlier case to finish
+            seed, seed_key, seed_inactive = None, None, None
+            if warm is not None:
+                found = warm.seed_for(params)
+                while found is WAIT:
+                    yield WAIT
+                    found = warm.seed_for(params)
+                seed, seed_key = found
+                seed_inactive = warm.inactive
+                warm.add(name, params)
+
+            # ------------------------
+            # reuse cached statepoint
+            # ------------------------
+            if not plot_only:
+                case_run_cfg = run_cfg
+                if seed_key is not None:
+                    case_run_cfg = {**run_cfg, "warm_from": seed_key}
+                key = cache.case_key(model_name, model_block,
+                                     params, tally_blocks,
+                                     run_cfg=case_run_cfg)
+                if resume and manifest.is_done(name, key):
+                    print(f"[RESUME] {name} already done")
+                    observe(name, params, case_dir / "statepoint.h5", key)
+                    continue
+                if use_cache and cache.lookup(cache_root, key, case_dir):
+                    print(f"[CACHED] {name} {params}")
+                    manifest.update(name, state="done", key=key,
+                                    params=params, cached=True)
+                    observe(name, params, case_dir / "statepoint.h5", key)
+                    continue
+                cache.invalidate(case_dir)
+                case_keys[case_dir] = key
+                manifest.update(name, state="pending", key=key,
+                                params=params, cached=False)
+
+            # ------------------------
+            # build model, attach tallies, write xml
+            # ------------------------
+            print(params)
+            assembler.assemble(params, case_dir, seed=seed,
+                               seed_inactive=seed_inactive)
+            if not plot_only:
+                manifest.update(name, state="assembled",
+                                warm_from=str(seed) if seed else None)
+
+            # ------------------------
+            # plot geometry
+            # ------------------------
+            plot_stage.submit(case_dir)
+            if plot_only:
+                continue
+
+            yield case_dir
+
+    # ------------------------
+    # run simulations
+    # ------------------------
+    def on_start(case_dir, attempt):
+        manifest.update(case_dir.name, state="running", attempts=attempt)
+
+    def on_done(case_dir, usage):
+        trace.record("transport", case_dir.name, **usage)
+        cache.store(cache_root, case_keys[case_dir], case_dir)
+        manifest.update(case_dir.name, state="done",
+                        wall_time=usage["wall_time"],
+                        exit_status=usage.get("exit_status"), error=None)
+        if early_stopping:
+            achieved, batches = achieved_rel_err(
+                case_dir / "statepoint.h5", tally_blocks)
+            manifest.update(case_dir.name, rel_err=achieved,
+                            batches=batches)
+        observe(case_dir.name, case_params[case_dir],
+                case_dir / "statepoint.h5", case_keys[case_dir])
+
+    def on_fail(case_dir, error, attempt):
+        # None when the case failed before openmc4d ran
+        manifest.update(case_dir.name, state="failed",
+                        exit_status=getattr(error, "exit_status", None),
+                        error=str(error))
+        if attempt > retries:
+            observe(case_dir.name, case_params[case_dir], None)
+
+    if plot_only:
+        for _ in prepare_cases():
+            pass
+        failed = []
+    else:
+        backend = executor_cfg.pop("backend", "local")
+        if cli_args.executor:
+            backend = cli_args.executor
+        executor = get_executor(backend, jobs=jobs, threads=threads,
+                                batch_dir=runs_root / "batch",
+                                **executor_cfg)
+        if warm is not None:
+            # seeds skip the cases likely to be in flight alongside
+            warm.lag = executor.capacity
+        failed = run_cases(prepare_cases(), executor, retries=retries,
+                           on_start=on_start, on_done=on_done,
+                           on_fail=on_fail)
+
+    plot_failed = plot_stage.wait()
+    if plot_failed:
+        print(f"{len(plot_failed)} case(s) failed to plot")
+
+    # ------------------------
+    # ingest results
+    # ------------------------
+    if not plot_only:
+        with trace.stage("scrape"):
+            scrape_results(runs_root, tally_blocks)
+
+    if failed:
+        names = ", ".join(d.name for d in failed)
+        print(f"Run finished with {len(failed)} failed case(s): {names}")
+        print("Rerun with --resume to retry only the unfinished cases.")
+        return
 
     print("Run complete.")
 
@@ -180,6 +430,42 @@ if __name__ == "__main__":
     parser.add_argument("-p", "--plot",
                         action="store_true",
                         help="Plot geometry only (no simulation)")
+    parser.add_argument("-j", "--jobs",
+                        type=int, default=1,
+                        help="Number of cases run concurrently")
+    parser.add_argument("-t", "--threads-per-case",
+                        type=int, default=None,
+                        help="Threads per case (default: cores / jobs)")
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        help="Rerun every case, ignoring cached statepoints")
+    parser.add_argument("--resume",
+                        action="store_true",
+                        help="Run only cases not marked done in the manifest")
+    parser.add_argument("--retries",
+                        type=int, default=0,
+                        help="Resubmit a failed case up to this many times")
+    parser.add_argument("--executor",
+                        default=None,
+                        help="Case backend: local, async, slurm or fake-slurm "
+                             "(default: study.yaml executor.backend, else local)")
+    parser.add_argument("--trace-format",
+                        choices=["jsonl", "chrome"], default="jsonl",
+                        help="Format of runs/<study>/trace/ files")
+    parser.add_argument("--profile",
+                        nargs="+", default=[], metavar="STAGE",
+                        help="Run these stages under cProfile "
+                             "(e.g. model_build xml_assembly scrape)")
+    parser.add_argument("--dry-run",
+                        action="store_true",
+                        help="Validate the study and estimate its cost "
+                             "without running anything")
+    parser.add_argument("--plot-jobs",
+                        type=int, default=1,
+                        help="Geometry plots rendered concurrently")
 
     args = parser.parse_args()
-    main(args)
\ No newline at end of file
+    try:
+        main(args)
+    finally:
+        trace.stop()
\ No newline at end of file
@@ -0,0 +1,96 @@
+from pathlib import Path
+import argparse
+import csv
+import sys
+import time
+
+from core.lazy import lazy_import
+from core.pipeline.surrogate import SURROGATE_DIR, Surrogate
+
+np = lazy_import("numpy")
+
+
+# ---------------------------------------------------------
+# Utilities
+# ---------------------------------------------------------
+
+def surrogate_path(study_name, target):
+    return Path("runs") / study_name / SURROGATE_DIR / f"{target}.npz"
+
+
+def parse_points(args, inputs):
+    """
+    Points from --at name=value pairs or a --points CSV whose header
+    names the inputs.
+    """
+    if args.at:
+        point = dict(item.split("=", 1) for item in args.at)
+        return {k: float(v) for k, v in point.items()}
+
+    with open(args.points, "r", newline="") as f:
+        rows = list(csv.DictReader(f))
+    return {k: np.asarray([float(r[k]) for r in rows]) for k in inputs}
+
+
+def write_rows(header, rows):
+    writer = csv.writer(sys.stdout)
+    writer.writerow(header)
+    writer.writerows(rows)
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Query surrogates fitted by analyze.py "
+                    "(analysis.yaml `surrogate` block)")
+    parser.add_argument("study", help="Name of study")
+    parser.add_argument("target", nargs="?",
+                        help="Metric or tally the surrogate predicts")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--at", nargs="+", metavar="NAME=VALUE",
+                       help="Evaluate at one parameter point")
+    group.add_argument("--points",
+                       help="Evaluate at every row of a CSV file")
+    group.add_argument("--suggest", type=int, metavar="N",
+                       help="Propose N points where new cases help most")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the --suggest candidates")
+
+    args = parser.parse_args()
+
+    if args.target is None:
+        root = Path("runs") / args.study / SURROGATE_DIR
+        for path in sorted(root.glob("*.npz")):
+            model = Surrogate.load(path)
+            print(f"{model.target}: {', '.join(model.inputs)}")
+        return
+
+    model = Surrogate.load(surrogate_path(args.study, args.target))
+
+    if args.suggest:
+        points = model.suggest(args.suggest, seed=args.seed)
+        write_rows(model.inputs, points.tolist())
+        return
+
+    if not (args.at or args.points):
+        parser.error("give --at, --points or --suggest")
+
+    points = parse_points(args, model.inputs)
+    start = time.perf_counter()
+    estimate = model.predict(points)
+    elapsed = time.perf_counter() - start
+
+    X = model.to_array(points)
+    write_rows(
+        model.inputs + ["mean", "std_dev"],
+        np.column_stack([X, estimate.mean, estimate.std_dev]).tolist(),
+    )
+    print(f"{len(X)} point(s) in {elapsed * 1e3:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# tests import the pipeline modules the way the entry scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _write_statepoint(path, tallies, batches=20, seed=0):
+    """
+    Statepoint with the layout StatepointReader reads. tallies maps
+    name -> (n_bins, scores); results hold random sums with consistent
+    sums of squares over `batches` realizations.
+    """
+    import h5py
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    with h5py.File(path, "w") as f:
+        f.attrs["filetype"] = np.bytes_("statepoint")
+        f["current_batch"] = batches
+        f["k_combined"] = np.array([1.0 + 0.01 * rng.standard_normal(),
+                                    1e-3])
+
+        group = f.create_group("tallies")
+        group.attrs["ids"] = np.arange(1, len(tallies) + 1)
+        for tally_id, (name, (n_bins, scores)) in enumerate(
+                tallies.items(), start=1):
+            t = group.create_group(f"tally {tally_id}")
+            t["name"] = np.bytes_(name)
+            t["n_realizations"] = batches
+            t["score_bins"] = np.array([np.bytes_(s) for s in scores])
+            t["nuclides"] = np.array([np.bytes_("total")])
+
+            total = rng.random((n_bins, len(scores))) * batches
+            spread = 1.0 + 0.01 * rng.random((n_bins, len(scores)))
+            results = np.empty((n_bins, len(scores), 2))
+            results[..., 0] = total
+            results[..., 1] = total**2 / batches * spread
+            t["results"] = results
+    return path
+
+
+@pytest.fixture
+def write_statepoint():
+    return _write_statepoint
@@ -0,0 +1,109 @@
+import os
+import types
+
+import pytest
+
+from core.pipeline import assemble
+from core.pipeline.assemble import ModelAssembler
+from core.pipeline.attach import enable_triggers
+
+
+class Part:
+    def __init__(self, text):
+        self.text = text
+
+    def export_to_xml(self, path):
+        with open(path, "w") as f:
+            f.write(self.text)
+
+
+class Settings:
+    particles = 100
+    batches = 50
+    inactive = 10
+
+    def export_to_xml(self, path):
+        with open(path, "w") as f:
+            f.write(f"particles={self.particles}")
+
+
+BUILDS = []
+
+
+def build(params):
+    BUILDS.append(dict(params))
+    return types.SimpleNamespace(
+        geometry=Part(f"radius={params['radius']}"),
+        materials=Part(f"enrichment={params['enrichment']}"),
+        settings=Settings(),
+        tallies=None,
+    )
+
+
+build.components = {"geometry": ["radius"], "materials": ["enrichment"],
+                    "settings": ["particles"]}
+
+
+@pytest.fixture
+def assembler(monkeypatch):
+    monkeypatch.setattr(assemble, "mc",
+                        types.SimpleNamespace(reset_auto_ids=lambda: None))
+    BUILDS.clear()
+    return ModelAssembler(build, [], early_stopping={"interval": 5})
+
+
+def _case(tmp_path, name):
+    case_dir = tmp_path / name
+    case_dir.mkdir()
+    return case_dir
+
+
+def test_settings_change_reuses_model(tmp_path, assembler):
+    first, second = _case(tmp_path, "case_0001"), _case(tmp_path, "case_0002")
+    params = {"radius": 1.0, "enrichment": 3.0, "particles": 100}
+    assembler.assemble(params, first)
+    model = assembler.assemble({**params, "particles": 500}, second)
+
+    assert len(BUILDS) == 1
+    assert model.settings.particles == 500
+    assert (second / "settings.xml").read_text() == "particles=500"
+    assert (first / "settings.xml").read_text() == "particles=100"
+    for component in ("geometry", "materials"):
+        assert os.path.samefile(first / f"{component}.xml",
+                                second / f"{component}.xml")
+    assert not (second / "tallies.xml").exists()
+
+
+def test_rebuild_links_unchanged_components(tmp_path, assembler):
+    first, second = _case(tmp_path, "case_0001"), _case(tmp_path, "case_0002")
+    params = {"radius": 1.0, "enrichment": 3.0, "particles": 100}
+    assembler.assemble(params, first)
+    assembler.assemble({**params, "enrichment": 4.0}, second)
+
+    assert len(BUILDS) == 2
+    assert os.path.samefile(first / "geometry.xml", second / "geometry.xml")
+    assert not os.path.samefile(first / "materials.xml",
+                                second / "materials.xml")
+    assert (second / "materials.xml").read_text() == "enrichment=4.0"
+
+
+def test_enable_triggers():
+    settings = Settings()
+    enable_triggers(settings, None)
+    assert settings.batches == 50
+
+    enable_triggers(settings, {"interval": 5})
+    assert settings.batches == 11
+    assert settings.trigger_active
+    assert settings.trigger_max_batches == 50
+    assert settings.trigger_batch_interval == 5
+
+
+def test_reused_settings_keep_budget(tmp_path, assembler):
+    first, second = _case(tmp_path, "case_0001"), _case(tmp_path, "case_0002")
+    params = {"radius": 1.0, "enrichment": 3.0, "particles": 100}
+    assembler.assemble(params, first)
+    model = assembler.assemble({**params, "particles": 500}, second)
+    # triggers are applied to the original budget, not the first case's
+    assert model.settings.trigger_max_batches == 50
+    assert model.settings.batches == 11
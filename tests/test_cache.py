@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core.pipeline import cache
+from core.tallies.registry import Tally
+
+
+def model_block(params):
+    return params
+
+
+class FluxBlock(Tally):
+    type_name = "flux"
+
+    def __init__(self, cfg=None):
+        self.merge_config(cfg)
+        self.set_name("")
+
+
+def _key(params=None, blocks=None, run_cfg=None):
+    return cache.case_key("slab", model_block, params or {"radius": 1.0},
+                          blocks or [FluxBlock()], run_cfg)
+
+
+def test_case_key_tracks_inputs():
+    key = _key()
+    assert key == _key()
+    assert key != _key(params={"radius": 2.0})
+    assert key != _key(blocks=[FluxBlock({"rel_err": 0.01})])
+    assert key != _key(run_cfg={"early_stopping": {"interval": 5}})
+    assert cache.case_key("pin", model_block, {"radius": 1.0},
+                          [FluxBlock()]) != key
+
+
+def test_store_and_lookup(tmp_path):
+    case_dir = tmp_path / "case"
+    case_dir.mkdir()
+    (case_dir / "statepoint.h5").write_bytes(b"results")
+    (case_dir / cache.TALLY_MAP_FILE).write_text("{}")
+
+    root = tmp_path / "cache"
+    key = _key()
+    cache.store(root, key, case_dir)
+    assert (case_dir / "case.key").read_text() == key
+
+    restored = tmp_path / "restored"
+    restored.mkdir()
+    assert cache.lookup(root, key, restored)
+    assert (restored / "statepoint.h5").read_bytes() == b"results"
+    assert (restored / cache.TALLY_MAP_FILE).exists()
+    assert (restored / "case.key").read_text() == key
+    assert not cache.lookup(root, _key(params={"radius": 3.0}), restored)
+
+    cache.invalidate(restored)
+    assert list(restored.iterdir()) == []
+
+
+def test_link_file_replaces_target(tmp_path):
+    src = tmp_path / "src.xml"
+    src.write_text("new")
+    dst = tmp_path / "dst.xml"
+    dst.write_text("old")
+
+    cache.link_file(src, dst)
+    assert dst.read_text() == "new"
+    assert os.path.samefile(src, dst)
+
+    # linking again over the same file leaves no temporary behind
+    cache.link_file(src, dst)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dst.xml",
+                                                          "src.xml"]
+
+
+def test_link_file_concurrent(tmp_path):
+    src = tmp_path / "src.xml"
+    src.write_text("new")
+    dst = tmp_path / "dst.xml"
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: cache.link_file(src, dst), range(64)))
+    assert dst.read_text() == "new"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dst.xml",
+                                                          "src.xml"]
@@ -0,0 +1,238 @@
+import json
+import shlex
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from core.pipeline import executors, run, worker
+from core.pipeline.executors import (FakeSlurmExecutor, LocalExecutor,
+                                     SlurmExecutor, get_executor)
+from core.pipeline.run import TransportError
+from core.pipeline.worker import STATUS_FILE
+
+
+def _cases(tmp_path, n):
+    case_dirs = []
+    for i in range(1, n + 1):
+        case_dir = tmp_path / f"case_{i:04d}"
+        case_dir.mkdir()
+        case_dirs.append(case_dir)
+    return case_dirs
+
+
+def _status(case_dir, **status):
+    (case_dir / STATUS_FILE).write_text(json.dumps(status))
+
+
+def _flaky_simulation(case_dir, threads=None, log=None):
+    if case_dir.name == "case_0002":
+        raise TransportError("lost particles", 2)
+    return {"exit_status": 0}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown executor"):
+        get_executor("pbs")
+
+
+def test_local_executor(tmp_path, monkeypatch):
+    monkeypatch.setattr(run, "run_simulation", _flaky_simulation)
+    executor = LocalExecutor(jobs=2)
+    for case_dir in _cases(tmp_path, 2):
+        executor.submit(case_dir, 1)
+
+    results = []
+    while len(results) < 2:
+        results += executor.wait()
+    executor.close()
+
+    errors = {d.name: err for d, _, _, err in results}
+    assert errors["case_0001"] is None
+    assert "lost particles" in str(errors["case_0002"])
+    # the exit status survives the trip back from the worker process
+    assert errors["case_0002"].exit_status == 2
+
+
+def test_run_task_writes_status(tmp_path, monkeypatch):
+    def run_case(case_dir, threads=None, attempt=1):
+        if case_dir.name == "case_0003":
+            raise TransportError("lost particles", 3)
+        return {"wall_time": 2.5, "exit_status": 0}
+
+    monkeypatch.setattr(worker, "run_case", run_case)
+    case_dirs = _cases(tmp_path, 4)
+    case_list = tmp_path / "array.txt"
+    case_list.write_text("".join(f"{d} 2\n" for d in case_dirs))
+
+    worker.run_task(case_list, task=1, per_task=2)
+    assert not (case_dirs[1] / STATUS_FILE).exists()
+    failed = json.loads((case_dirs[2] / STATUS_FILE).read_text())
+    done = json.loads((case_dirs[3] / STATUS_FILE).read_text())
+    assert done == {"attempt": 2,
+                    "usage": {"wall_time": 2.5, "exit_status": 0}}
+    assert failed["error"] == "lost particles"
+    assert failed["exit_status"] == 3
+
+
+class FakeCluster:
+    """
+    Answers sbatch and squeue through subprocess.run.
+    """
+
+    def __init__(self):
+        self.arrays = []
+        self.queue = set()
+        self.polls = 0
+        self.failing = {}       # poll number -> squeue error
+        self.on_poll = None
+
+    def run(self, args, **kwargs):
+        if args[0] == "sbatch":
+            job_id = str(100 + len(self.arrays))
+            self.arrays.append(args)
+            self.queue.add(job_id)
+            stdout = f"{job_id};cluster\n"
+        else:
+            self.polls += 1
+            if self.on_poll:
+                self.on_poll(self.polls)
+            if self.polls in self.failing:
+                return types.SimpleNamespace(
+                    returncode=1, stdout="", stderr=self.failing[self.polls])
+            stdout = "\n".join(sorted(self.queue)) + "\n"
+        return types.SimpleNamespace(returncode=0, stdout=stdout, stderr="")
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    fake = FakeCluster()
+    monkeypatch.setattr(executors.subprocess, "run", fake.run)
+    return fake
+
+
+def test_slurm_submits_chunked_arrays(tmp_path, cluster):
+    executor = SlurmExecutor(tmp_path / "batch", threads=4, chunk_size=2,
+                             cases_per_task=2, poll_interval=0,
+                             sbatch_args=["--time=1:00:00"])
+    case_dirs = _cases(tmp_path, 3)
+    for case_dir in case_dirs:
+        executor.submit(case_dir, 1)
+    # a full chunk is submitted right away, the rest on flush
+    assert len(cluster.arrays) == 1
+    executor.flush()
+    assert len(cluster.arrays) == 2
+
+    first = cluster.arrays[0]
+    assert "--array=0-0" in first and "--cpus-per-task=4" in first
+    assert "--time=1:00:00" in first
+    script = Path(first[-1]).read_text()
+    assert "-m core.pipeline.worker" in script
+    assert "--per-task 2 --threads 4" in script
+    case_list = Path(first[-1]).with_suffix(".txt").read_text()
+    assert case_list.split() == [str(case_dirs[0].resolve()), "1",
+                                 str(case_dirs[1].resolve()), "1"]
+
+    _status(case_dirs[0], attempt=1, usage={"wall_time": 3.0})
+    _status(case_dirs[1], attempt=1, error="lost particles", exit_status=3)
+    results = {d.name: (t, err) for d, _, t, err in executor.wait()}
+    assert results["case_0001"] == ({"wall_time": 3.0}, None)
+    assert "lost particles" in str(results["case_0002"][1])
+    assert results["case_0002"][1].exit_status == 3
+
+
+def test_slurm_job_gone_without_status(tmp_path, cluster):
+    executor = SlurmExecutor(tmp_path / "batch", poll_interval=0)
+    case_dir, = _cases(tmp_path, 1)
+    executor.submit(case_dir, 2)
+    executor.flush()
+
+    cluster.queue.clear()
+    (result,) = executor.wait()
+    assert result[:3] == (case_dir, 2, None)
+    assert "without a status" in str(result[3])
+
+
+def test_slurm_squeue_failure_keeps_jobs(tmp_path, cluster):
+    executor = SlurmExecutor(tmp_path / "batch", poll_interval=0)
+    case_dir, = _cases(tmp_path, 1)
+    executor.submit(case_dir, 1)
+    executor.flush()
+
+    # squeue times out on the second poll, when the job has finished
+    # but its status is not visible yet
+    cluster.failing[2] = "slurm_load_jobs error: Socket timed out"
+    cluster.on_poll = lambda n: n == 2 and _status(
+        case_dir, attempt=1, usage={"wall_time": 1.0})
+    (result,) = executor.wait()
+    assert result == (case_dir, 1, {"wall_time": 1.0}, None)
+
+
+def test_slurm_first_poll_fails(tmp_path, cluster):
+    executor = SlurmExecutor(tmp_path / "batch", poll_interval=0)
+    case_dir, = _cases(tmp_path, 1)
+    executor.submit(case_dir, 1)
+    executor.flush()
+
+    # no job state seen yet: a failed query must not count as lost
+    cluster.queue.clear()
+    cluster.failing[1] = "slurm_load_jobs error: Socket timed out"
+    cluster.on_poll = lambda n: n == 2 and _status(
+        case_dir, attempt=1, usage={"wall_time": 1.0})
+    (result,) = executor.wait()
+    assert result == (case_dir, 1, {"wall_time": 1.0}, None)
+
+
+def test_slurm_purged_jobs(tmp_path, cluster):
+    executor = SlurmExecutor(tmp_path / "batch", poll_interval=0)
+    case_dir, = _cases(tmp_path, 1)
+    executor.submit(case_dir, 1)
+    executor.flush()
+
+    # squeue rejects a request whose jobs have all been purged
+    cluster.failing[1] = "slurm_load_jobs error: Invalid job id specified"
+    (result,) = executor.wait()
+    assert "without a status" in str(result[3])
+
+
+class ScriptedFakeSlurm(FakeSlurmExecutor):
+    """
+    Fake array tasks run worker.run_task with transport replaced by a
+    stub, so the batch path runs without openmc4d.
+    """
+
+    def _script(self, case_list):
+        code = (
+            "import os, sys; sys.path.insert(0, os.getcwd()); "
+            "from core.pipeline import worker; "
+            "worker.run_case = lambda d, t=None, a=1: {'attempt': a}; "
+            f"worker.run_task({str(case_list)!r}, "
+            "int(os.environ['SLURM_ARRAY_TASK_ID']), "
+            f"{self.cases_per_task})"
+        )
+        return (f"cd {shlex.quote(str(Path.cwd()))}\n"
+                f"{shlex.quote(sys.executable)} -c {shlex.quote(code)}\n")
+
+
+def test_fake_slurm_runs_array_tasks(tmp_path, monkeypatch):
+    monkeypatch.chdir(Path(__file__).resolve().parents[1])
+    executor = ScriptedFakeSlurm(tmp_path / "batch", cases_per_task=2,
+                                 poll_interval=0.05)
+    case_dirs = _cases(tmp_path, 3)
+    for case_dir in case_dirs:
+        executor.submit(case_dir, 1)
+    executor.flush()
+    assert len(executor.procs["fake1"]) == 2
+
+    results = []
+    while len(results) < 3:
+        results += executor.wait()
+    executor.close()
+    assert all(log.closed for log in executor.logs)
+    assert sorted((d.name, u, err) for d, _, u, err in results) == [
+        ("case_0001", {"attempt": 1}, None),
+        ("case_0002", {"attempt": 1}, None),
+        ("case_0003", {"attempt": 1}, None),
+    ]
@@ -0,0 +1,69 @@
+import pytest
+
+from core.pipeline.graph import Node, check_graph, run_graph
+
+
+def total(context, cfg):
+    return sum(context["values"]) * cfg.get("scale", 1)
+
+
+def count(context, cfg):
+    return len(context["values"])
+
+
+def report(context, cfg, inputs):
+    # artifacts run for their side effects
+    with open(cfg["path"], "w") as f:
+        f.write(f"{inputs['total'] / inputs['count']}")
+
+
+def tamper(context, cfg, inputs):
+    inputs["total"] = 0
+
+
+def _nodes(path):
+    return {
+        "report": Node("report", "artifact", report, {"path": str(path)},
+                       ["total", "count"]),
+        "total": Node("total", "metric", total, {"scale": 2}, []),
+        "count": Node("count", "metric", count, {}, []),
+    }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_graph(tmp_path, jobs):
+    path = tmp_path / "report.txt"
+    results = run_graph(_nodes(path), {"values": [1, 2, 3]}, jobs=jobs)
+    assert results == {"total": 12, "count": 3}
+    assert path.read_text() == "4.0"
+
+
+def test_unknown_dependency():
+    nodes = {"a": Node("a", "metric", count, {}, ["missing"])}
+    with pytest.raises(RuntimeError, match="unknown results"):
+        check_graph(nodes)
+
+
+def test_cycle():
+    nodes = {
+        "a": Node("a", "metric", count, {}, ["b"]),
+        "b": Node("b", "metric", count, {}, ["a"]),
+    }
+    with pytest.raises(RuntimeError, match="Dependency cycle"):
+        run_graph(nodes, {"values": []})
+
+
+def test_artifact_inputs_are_read_only():
+    nodes = {
+        "total": Node("total", "metric", total, {}, []),
+        "tamper": Node("tamper", "artifact", tamper, {}, ["total"]),
+    }
+    with pytest.raises(TypeError):
+        run_graph(nodes, {"values": [1]})
+
+
+def test_metric_cannot_depend_on_artifact(tmp_path):
+    nodes = _nodes(tmp_path / "report.txt")
+    nodes["late"] = Node("late", "metric", count, {}, ["report"])
+    with pytest.raises(RuntimeError, match="depends on artifacts"):
+        check_graph(nodes)
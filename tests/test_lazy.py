@@ -0,0 +1,95 @@
+import importlib
+import sys
+
+import pytest
+
+from core.lazy import LazyRegistry, lazy_import
+
+REGISTRY = LazyRegistry("lazy_plugins", "plugin")
+
+
+@pytest.fixture
+def plugins(tmp_path, monkeypatch):
+    """
+    A package declaring two plugins, each module recording its import.
+    """
+    pkg = tmp_path / "lazy_plugins"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(
+        'MANIFEST = {"alpha": ".alpha", "beta": ".beta"}\n'
+        "IMPORTED = []\n")
+    for name in ("alpha", "beta"):
+        (pkg / f"{name}.py").write_text(
+            "from test_lazy import REGISTRY\n"
+            "from . import IMPORTED\n"
+            f"IMPORTED.append({name!r})\n"
+            f"REGISTRY.register({name!r}, {name.upper()!r})\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("lazy_plugins")
+    for mod in [m for m in sys.modules if m.startswith("lazy_plugins")]:
+        del sys.modules[mod]
+    REGISTRY._entries.clear()
+    REGISTRY._manifest = None
+
+
+def test_registry_imports_on_lookup(plugins):
+    assert list(REGISTRY) == ["alpha", "beta"]
+    assert "beta" in REGISTRY and len(REGISTRY) == 2
+    assert plugins.IMPORTED == []
+
+    assert REGISTRY["beta"] == "BETA"
+    assert plugins.IMPORTED == ["beta"]
+    assert REGISTRY.is_loaded("beta") and not REGISTRY.is_loaded("alpha")
+
+    with pytest.raises(KeyError):
+        REGISTRY["gamma"]
+
+
+def test_manifest_module_missing(plugins):
+    plugins.MANIFEST["gamma"] = ".gamma"
+    assert "gamma" in REGISTRY
+    with pytest.raises(KeyError):
+        REGISTRY["gamma"]
+    with pytest.raises(RuntimeError, match="missing module"):
+        REGISTRY.check()
+
+
+def test_manifest_disagrees_with_decorators(plugins, tmp_path):
+    (tmp_path / "lazy_plugins" / "gamma.py").write_text(
+        "from test_lazy import REGISTRY\n"
+        "REGISTRY.register('delta', 'DELTA')\n")
+    plugins.MANIFEST["gamma"] = ".gamma"
+    with pytest.raises(RuntimeError, match=r"\['gamma'\] to .gamma"):
+        REGISTRY["gamma"]
+
+
+@pytest.mark.parametrize("module", ["core.models.registry",
+                                    "core.tallies.registry",
+                                    "core.metrics.registry",
+                                    "core.artifacts.registry"])
+def test_shipped_manifests_match_decorators(module):
+    registry = next(v for v in vars(importlib.import_module(module)).values()
+                    if isinstance(v, LazyRegistry))
+    registry.check()
+    assert sorted(registry) == sorted(registry.manifest)
+
+
+def test_missing_module_fails_on_use():
+    module = lazy_import("no_such_module_for_tests")
+    with pytest.raises(ImportError, match="no_such_module_for_tests"):
+        module.anything
+
+
+def test_module_executes_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "lazy_heavy.py").write_text(
+        "import builtins\nbuiltins.LAZY_HEAVY_RAN = True\nVALUE = 3\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import builtins
+    monkeypatch.delitem(sys.modules, "lazy_heavy", raising=False)
+
+    module = lazy_import("lazy_heavy")
+    assert not hasattr(builtins, "LAZY_HEAVY_RAN")
+    assert module.VALUE == 3
+    assert builtins.LAZY_HEAVY_RAN
+    del builtins.LAZY_HEAVY_RAN
+    del sys.modules["lazy_heavy"]
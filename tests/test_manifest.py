@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from core.pipeline.manifest import Manifest
+
+
+def test_updates_persist(tmp_path):
+    path = tmp_path / "manifest.json"
+    manifest = Manifest(path)
+    manifest.update("case_0001", state="done", key="abc")
+    manifest.update("case_0002", state="running")
+
+    reopened = Manifest(path)
+    assert reopened.is_done("case_0001", "abc")
+    assert not reopened.is_done("case_0001", "other-key")
+    assert reopened.state("case_0002") == "running"
+    assert reopened.unfinished() == ["case_0002"]
+    assert reopened.get("case_0003") == {}
+
+
+def test_unknown_state(tmp_path):
+    manifest = Manifest(tmp_path / "manifest.json")
+    with pytest.raises(ValueError):
+        manifest.update("case_0001", state="finished")
+
+
+def test_save_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / "manifest.json"
+    manifest = Manifest(path)
+    manifest.update("case_0001", state="done", key="abc")
+    before = path.read_text()
+
+    # a crash while writing leaves the previous snapshot in place
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(json, "dump", crash)
+    with pytest.raises(KeyboardInterrupt):
+        manifest.update("case_0002", state="running")
+    assert path.read_text() == before
+    assert Manifest(path).cases == {"case_0001": {"state": "done",
+                                                  "key": "abc"}}
+
+    monkeypatch.undo()
+    manifest.reset()
+    assert Manifest(path).cases == {}
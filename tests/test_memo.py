@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from core.pipeline.graph import Node, run_graph
+from core.pipeline.memo import Memo
+
+CALLS = []
+
+
+def total(context, cfg):
+    CALLS.append("total")
+    return 6 * cfg.get("scale", 1)
+
+
+def report(context, cfg, inputs):
+    CALLS.append("report")
+
+
+@pytest.fixture
+def context(tmp_path):
+    case_dir = tmp_path / "case_0001"
+    case_dir.mkdir()
+    (case_dir / "statepoint.h5").write_bytes(b"results")
+    (case_dir / "params.json").write_text("{}")
+    return {"cases": [{"statepoint": case_dir / "statepoint.h5",
+                       "params": case_dir / "params.json"}]}
+
+
+def _nodes(scale=1):
+    return {
+        "total": Node("total", "metric", total, {"scale": scale}, []),
+        "report": Node("report", "artifact", report, {}, ["total"]),
+    }
+
+
+def _run(context, root, scale=1):
+    CALLS.clear()
+    results = run_graph(_nodes(scale), context, memo=Memo(root))
+    return results, list(CALLS)
+
+
+def test_second_run_is_cached(tmp_path, context):
+    root = tmp_path / "analysis_cache"
+    assert _run(context, root) == ({"total": 6}, ["total", "report"])
+    # artifacts write files the memo cannot check, so they always run
+    assert _run(context, root) == ({"total": 6}, ["report"])
+
+
+def test_config_change_reruns_dependents(tmp_path, context):
+    root = tmp_path / "analysis_cache"
+    _run(context, root)
+    assert _run(context, root, scale=2) == ({"total": 12},
+                                            ["total", "report"])
+
+
+def test_changed_inputs_rerun_everything(tmp_path, context):
+    root = tmp_path / "analysis_cache"
+    _run(context, root)
+    context["cases"][0]["statepoint"].write_bytes(b"new results")
+    assert _run(context, root)[1] == ["total", "report"]
+
+
+def test_evict_unused(tmp_path, context):
+    root = tmp_path / "analysis_cache"
+    _run(context, root, scale=2)
+
+    memo = Memo(root)
+    run_graph(_nodes(), context, memo=memo)
+    assert memo.evict(max_age_days=1) == 0
+    assert memo.evict() == 1
+    assert len(list(root.glob("*.pkl"))) == 1
+
+
+def test_file_hashes_written_atomically(tmp_path, context, monkeypatch):
+    root = tmp_path / "analysis_cache"
+    _run(context, root)
+    path = root / "file_hashes.json"
+    before = path.read_text()
+
+    # a crash while writing leaves the previous hashes in place
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    context["cases"][0]["statepoint"].write_bytes(b"new results")
+    monkeypatch.setattr(json, "dump", crash)
+    with pytest.raises(KeyboardInterrupt):
+        Memo(root).study_fingerprint(context)
+    assert path.read_text() == before
@@ -0,0 +1,144 @@
+import json
+import types
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from core.tallies import merge
+from core.tallies.merge import (merge_tallies, read_tally_map,
+                                write_tally_map)
+
+
+# ---------------------------------------------------------
+# minimal stand-ins for the openmc4d objects merge_tallies touches
+# ---------------------------------------------------------
+class Tally:
+    def __init__(self, name="", filters=None, scores=None, nuclides=None,
+                 triggers=None):
+        self.name = name
+        self.filters = filters or []
+        self.scores = scores or []
+        self.nuclides = nuclides or []
+        self.triggers = triggers or []
+        self.estimator = None
+        self.derivative = None
+        self.multiply_density = True
+
+
+class Trigger:
+    def __init__(self, trigger_type, threshold):
+        self.trigger_type = trigger_type
+        self.threshold = threshold
+        self.scores = []
+
+
+class Mesh:
+    def __init__(self, mesh_id, dimension, width):
+        self.id = mesh_id
+        self.dimension = dimension
+        self.width = width
+
+    def to_xml_element(self):
+        elem = ET.Element("mesh", id=str(self.id))
+        ET.SubElement(elem, "dimension").text = " ".join(
+            map(str, self.dimension))
+        ET.SubElement(elem, "width").text = " ".join(map(str, self.width))
+        return elem
+
+
+class MeshFilter:
+    def __init__(self, filter_id, mesh):
+        self.id = filter_id
+        self.mesh = mesh
+
+    def to_xml_element(self):
+        elem = ET.Element("filter", id=str(self.id), type="mesh")
+        ET.SubElement(elem, "bins").text = str(self.mesh.id)
+        return elem
+
+
+class EnergyFilter:
+    def __init__(self, filter_id, edges):
+        self.id = filter_id
+        self.edges = edges
+
+    def to_xml_element(self):
+        elem = ET.Element("filter", id=str(self.id), type="energy")
+        ET.SubElement(elem, "bins").text = " ".join(map(str, self.edges))
+        return elem
+
+
+class OpaqueFilter:
+    pass
+
+
+@pytest.fixture(autouse=True)
+def fake_openmc(monkeypatch):
+    monkeypatch.setattr(merge, "mc",
+                        types.SimpleNamespace(Tally=Tally, Trigger=Trigger))
+
+
+def _mesh_filter(filter_id, mesh_id, width=(1.0, 1.0)):
+    return MeshFilter(filter_id, Mesh(mesh_id, (4, 4), width))
+
+
+def test_shared_filters_merge():
+    a = Tally("a", [_mesh_filter(1, 1)], ["flux"],
+              triggers=[Trigger("rel_err", 0.01)])
+    b = Tally("b", [_mesh_filter(2, 2)], ["fission", "flux"])
+
+    merged, tally_map = merge_tallies([a, b])
+    assert len(merged) == 1
+    tally = merged[0]
+    assert tally.name == "a+b"
+    assert tally.scores == ["flux", "fission"]
+    assert [t.scores for t in tally.triggers] == [["flux"]]
+    assert tally_map == {
+        "a": {"tally": "a+b", "scores": ["flux"]},
+        "b": {"tally": "a+b", "scores": ["fission", "flux"]},
+    }
+
+
+def test_different_definitions_stay_apart():
+    fine = Tally("fine", [_mesh_filter(1, 1, width=(0.5, 0.5))], ["flux"])
+    coarse = Tally("coarse", [_mesh_filter(2, 2)], ["flux"])
+    energy = Tally("energy", [EnergyFilter(3, [0.0, 1.0])], ["flux"])
+    tallies = [fine, coarse, energy]
+
+    merged, tally_map = merge_tallies(tallies)
+    assert merged == tallies
+    assert tally_map == {}
+
+    uranium = Tally("u", [], ["flux"], nuclides=["U235"])
+    weighted = Tally("w", [], ["flux"])
+    weighted.multiply_density = False
+    plain = Tally("t", [], ["flux"])
+    assert len(merge_tallies([uranium, weighted, plain])[0]) == 3
+
+
+def test_unkeyable_filters_are_not_merged():
+    a = Tally("a", [OpaqueFilter()], ["flux"])
+    b = Tally("b", [OpaqueFilter()], ["fission"])
+    merged, tally_map = merge_tallies([a, b])
+    assert merged == [a, b]
+    assert tally_map == {}
+
+
+def test_duplicates_collapse():
+    a = Tally("a", [EnergyFilter(1, [0.0, 1.0])], ["flux"])
+    b = Tally("a", [EnergyFilter(2, [0.0, 1.0])], ["flux"])
+    merged, tally_map = merge_tallies([a, b])
+    assert merged == [a]
+    assert tally_map == {}
+
+
+def test_tally_map_file(tmp_path):
+    tally_map = {"a": {"tally": "a+b", "scores": ["flux"]}}
+    write_tally_map(tally_map, tmp_path)
+    assert read_tally_map(tmp_path) == tally_map
+    path = tmp_path / merge.TALLY_MAP_FILE
+    assert json.loads(path.read_text()) == tally_map
+
+    # an unmerged re-assembly removes the stale map
+    write_tally_map({}, tmp_path)
+    assert read_tally_map(tmp_path) == {}
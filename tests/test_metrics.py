@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.metrics.registry import METRICS_REGISTRY, Metric
+from core.tallies.stats import Estimate
+
+
+class Results:
+    """
+    Stand-in for the results store: two cases, two bins each.
+    """
+
+    tally_names = ["nu-fission", "absorption"]
+
+    def stack(self, names):
+        data = {
+            "nu-fission": np.array([[2.0, 4.0], [3.0, 3.0]]),
+            "absorption": np.array([[1.0, 2.0], [2.0, 2.0]]),
+        }
+        return {n: {"mean": data[n], "std_dev": 0.1 * data[n]}
+                for n in names}
+
+
+def test_production_ratio_batch():
+    metric = METRICS_REGISTRY["production-ratio"]
+    assert metric.is_batch()
+
+    out = metric({"results": Results()}, {})
+    assert out["per_case"]["mean"] == pytest.approx([2.0, 1.5])
+    # first-order error of (sum nu-fission) / (sum absorption)
+    nu_err = 0.1 * np.hypot([2.0, 3.0], [4.0, 3.0]) / [6.0, 6.0]
+    abs_err = 0.1 * np.hypot([1.0, 2.0], [2.0, 2.0]) / [3.0, 4.0]
+    expected = [2.0, 1.5] * np.hypot(nu_err, abs_err)
+    assert out["per_case"]["std_dev"] == pytest.approx(expected)
+    assert out["aggregate"] == {"min": 1.5, "max": 2.0, "mean": 1.75}
+    assert isinstance(out["aggregate"]["mean"], float)
+
+
+def test_batch_metric_needs_results():
+    with pytest.raises(RuntimeError, match="results store"):
+        METRICS_REGISTRY["production-ratio"]({"results": None}, {})
+
+
+class PerCaseMetric(Metric):
+    def compute(self, context, cfg):
+        est = Estimate([1.0, 2.0], [0.1, 0.2])
+        return {"per_case": est, "pairs": [est, 3]}
+
+
+def test_compute_results_become_arrays():
+    out = PerCaseMetric()({}, {})
+    assert set(out["per_case"]) == {"mean", "std_dev"}
+    np.testing.assert_allclose(out["pairs"][0]["std_dev"], [0.1, 0.2])
+    assert out["pairs"][1] == 3
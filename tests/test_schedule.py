@@ -0,0 +1,168 @@
+import os
+
+import pytest
+
+from core.pipeline import run, schedule
+from core.pipeline.executors import Executor
+
+
+class ScriptedExecutor(Executor):
+    """
+    In-process backend: cases finish in submission order, failing
+    their first `fails[name]` attempts.
+    """
+
+    def __init__(self, capacity=2, fails=None):
+        self.capacity = capacity
+        self.fails = fails or {}
+        self.running = []
+        self.peak = 0
+        self.closed = False
+
+    def submit(self, case_dir, attempt):
+        self.running.append((case_dir, attempt))
+        self.peak = max(self.peak, len(self.running))
+
+    def wait(self):
+        case_dir, attempt = self.running.pop(0)
+        if attempt <= self.fails.get(case_dir.name, 0):
+            return [(case_dir, attempt, None, RuntimeError("lost particles"))]
+        return [(case_dir, attempt, {"wall_time": 1.0}, None)]
+
+    def close(self):
+        self.closed = True
+
+
+def _case(tmp_path, name):
+    (tmp_path / name).mkdir()
+    return tmp_path / name
+
+
+def test_threads_per_case(monkeypatch):
+    monkeypatch.setattr(schedule.os, "cpu_count", lambda: 16)
+    assert schedule.threads_per_case(1) is None
+    assert schedule.threads_per_case(4) == 4
+    assert schedule.threads_per_case(32) == 1
+    assert schedule.threads_per_case(4, threads=2) == 2
+
+
+def test_run_cases_retries(tmp_path):
+    case_dirs = [_case(tmp_path, f"case_{i:04d}") for i in range(1, 5)]
+    executor = ScriptedExecutor(capacity=2,
+                                fails={"case_0002": 1, "case_0003": 5})
+
+    events = []
+    failed = schedule.run_cases(
+        case_dirs, executor, retries=1,
+        on_start=lambda d, a: events.append(("start", d.name, a)),
+        on_done=lambda d, t: events.append(("done", d.name)),
+        on_fail=lambda d, e, a: events.append(("fail", d.name, a)),
+    )
+    assert failed == [tmp_path / "case_0003"]
+    assert executor.closed and executor.peak == 2
+    assert sorted(events) == sorted([
+        ("start", "case_0001", 1), ("done", "case_0001"),
+        ("start", "case_0002", 1), ("fail", "case_0002", 1),
+        ("start", "case_0002", 2), ("done", "case_0002"),
+        ("start", "case_0003", 1), ("fail", "case_0003", 1),
+        ("start", "case_0003", 2), ("fail", "case_0003", 2),
+        ("start", "case_0004", 1), ("done", "case_0004"),
+    ])
+
+
+def test_case_stream_waits_for_running_cases(tmp_path):
+    done = []
+
+    def stream():
+        yield _case(tmp_path, "case_0001")
+        yield schedule.WAIT
+        # only pulled once the first case has finished
+        assert [d.name for d in done] == ["case_0001"]
+        yield _case(tmp_path, "case_0002")
+
+    failed = schedule.run_cases(stream(), ScriptedExecutor(capacity=4),
+                                on_done=lambda d, t: done.append(d))
+    assert failed == []
+    assert [d.name for d in done] == ["case_0001", "case_0002"]
+
+    with pytest.raises(RuntimeError, match="waiting"):
+        schedule.run_cases(iter([schedule.WAIT]), ScriptedExecutor())
+
+
+@pytest.fixture
+def openmc_on_path(tmp_path, monkeypatch):
+    """
+    A stand-in openmc4d: echoes its arguments, writes a statepoint and
+    sleeps $FAKE_SLEEP seconds, or reports an error and exits with
+    $FAKE_STATUS.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    exe = bin_dir / "openmc4d"
+    exe.write_text('#!/bin/sh\necho "transport $*"\n'
+                   'echo results > statepoint.5.h5\n'
+                   'if [ -n "$FAKE_STATUS" ]; then\n'
+                   '  echo " ERROR: Lost too many particles."\n'
+                   '  exit $FAKE_STATUS\n'
+                   'fi\n'
+                   'sleep ${FAKE_SLEEP:-0}\n')
+    exe.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_run_case_usage(tmp_path, openmc_on_path):
+    case_dir = _case(tmp_path, "case_0001")
+    usage = run.run_case(case_dir)
+    assert set(usage) >= {"wall_time", "cpu_time", "max_rss_kb"}
+    assert usage["wall_time"] >= 0.0
+    assert usage["exit_status"] == 0
+    assert (case_dir / "statepoint.h5").read_text() == "results\n"
+
+
+def test_run_case_appends_retries_to_log(tmp_path, openmc_on_path):
+    case_dir = _case(tmp_path, "case_0001")
+    run.run_case(case_dir, threads=2)
+    run.run_case(case_dir, threads=2, attempt=2)
+    assert (case_dir / "run.log").read_text() == (
+        "# attempt 1\ntransport -s 2\n"
+        "# attempt 2\ntransport -s 2\n")
+
+
+def test_run_case_failure(tmp_path, openmc_on_path, monkeypatch):
+    monkeypatch.setenv("FAKE_STATUS", "3")
+    with pytest.raises(RuntimeError, match="exited with 3") as err:
+        run.run_case(_case(tmp_path, "case_0001"))
+    assert err.value.exit_status == 3
+    assert "Lost too many particles" in str(err.value)
+
+
+def test_run_case_interrupted(tmp_path, openmc_on_path, monkeypatch):
+    monkeypatch.setenv("FAKE_SLEEP", "30")
+    started = []
+    popen = run.subprocess.Popen
+
+    def spy(*args, **kwargs):
+        started.append(popen(*args, **kwargs))
+        return started[-1]
+
+    def interrupt(stream, out):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(run.subprocess, "Popen", spy)
+    monkeypatch.setattr(run, "_copy_output", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        run.run_case(_case(tmp_path, "case_0001"))
+    # openmc4d is killed and reaped, not left running
+    assert started[0].returncode is not None
+    with pytest.raises(ProcessLookupError):
+        os.kill(started[0].pid, 0)
+
+
+def test_collect_statepoint(tmp_path):
+    for batches in (10, 20):
+        (tmp_path / f"statepoint.{batches}.h5").write_text(str(batches))
+        os.utime(tmp_path / f"statepoint.{batches}.h5", (batches, batches))
+
+    target = run.collect_statepoint(tmp_path)
+    assert target == tmp_path / "statepoint.h5"
+    assert target.read_text() == "20"
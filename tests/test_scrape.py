@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("h5py")
+
+from core.pipeline.scrape import ResultsStore, is_stale, scrape_results
+from core.tallies.statepoint import StatepointReader
+
+TALLIES = {"absorption": (1, ["absorption"]), "flux": (5, ["flux"])}
+
+
+class Block:
+    def __init__(self, name):
+        self.name = name
+
+    def extract(self, sp):
+        return sp.get_tally(name=self.name).mean
+
+
+@pytest.fixture
+def runs_root(tmp_path, write_statepoint):
+    root = tmp_path / "study"
+    for i in range(3):
+        case_dir = root / "cases" / f"case_{i + 1:04d}"
+        case_dir.mkdir(parents=True)
+        with open(case_dir / "params.json", "w") as f:
+            json.dump({"tube_radius": 1.0 + i, "fuel": f"mix-{i}"}, f)
+        write_statepoint(case_dir / "statepoint.h5", TALLIES, seed=i)
+    return root
+
+
+def test_scrape_round_trip(runs_root):
+    assert is_stale(runs_root)
+    path = scrape_results(runs_root, [Block("absorption"), Block("flux")])
+    assert not is_stale(runs_root)
+
+    store = ResultsStore(path)
+    assert len(store) == 3
+    assert store.cases == ["case_0001", "case_0002", "case_0003"]
+    assert sorted(store.tally_names) == ["absorption", "flux"]
+    np.testing.assert_allclose(store.params["tube_radius"], [1.0, 2.0, 3.0])
+
+    mean = store.mean("flux")
+    assert mean.shape == (3, 5, 1, 1)
+    with StatepointReader(runs_root / "cases/case_0002/statepoint.h5") as sp:
+        view = sp.get_tally("flux")
+        np.testing.assert_allclose(mean[1], view.mean)
+        np.testing.assert_allclose(store.std_dev("flux")[1], view.std_dev)
+
+    with pytest.raises(LookupError):
+        store.mean("missing")
+
+
+def test_missing_statepoint_keeps_row(runs_root):
+    (runs_root / "cases/case_0002/statepoint.h5").unlink()
+
+    store = ResultsStore(scrape_results(runs_root, [Block("absorption")]))
+    absorption = store.mean("absorption")
+    assert absorption.shape == (3, 1, 1, 1)
+    assert np.isnan(absorption[1]).all()
+    assert np.isfinite(absorption[[0, 2]]).all()
+
+    stacked = store.stack(["absorption"])
+    np.testing.assert_array_equal(stacked["absorption"]["mean"], absorption)
+    assert stacked["absorption"]["std_dev"].shape == (3, 1, 1, 1)
+    with pytest.raises(LookupError):
+        store.stack(["absorption", "flux"])
@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("h5py")
+
+from core.metrics.registry import to_arrays
+from core.pipeline.snapshot import (load_metrics, read_snapshot,
+                                    write_metrics, write_snapshot)
+from core.tallies.stats import Estimate
+
+
+def test_round_trip(tmp_path):
+    data = {
+        "per_case": np.arange(12.0).reshape(3, 4),
+        "count": 3,
+        "ratio": 0.5,
+        "label": "flux",
+        "names": ["a", "b"],
+        "missing": None,
+        "ragged": [[1, 2], [3]],
+        "mixed": [1, "two", None],
+        "path/with/slashes": {"inner": np.ones(2, dtype=np.int32)},
+        "items": [{"x": np.zeros(2)}, {"x": np.ones(3)}],
+    }
+    path = tmp_path / "snapshot.h5"
+    write_snapshot(path, data)
+
+    back = read_snapshot(path)
+    assert list(back) == list(data)
+    assert isinstance(back["per_case"], np.memmap)
+    np.testing.assert_array_equal(back["per_case"], data["per_case"])
+    assert back["count"] == 3 and back["ratio"] == 0.5
+    assert back["label"] == "flux"
+    assert back["names"] == ["a", "b"]
+    assert back["missing"] is None
+    assert back["ragged"] == [[1, 2], [3]]
+    assert back["mixed"] == [1, "two", None]
+    assert back["path/with/slashes"]["inner"].dtype == np.int32
+    assert [len(item["x"]) for item in back["items"]] == [2, 3]
+
+    plain = read_snapshot(path, mmap=False)
+    assert not isinstance(plain["per_case"], np.memmap)
+
+
+def test_metrics_file(tmp_path):
+    estimate = Estimate([1.0, 2.0], [0.1, 0.2])
+    metrics = to_arrays({"ratio": {"per_case": estimate,
+                                   "pairs": [estimate, {"n": 2}]}})
+    write_metrics(tmp_path, metrics, cases=["case_0001", "case_0002"])
+
+    back = load_metrics(tmp_path)
+    np.testing.assert_allclose(back["ratio"]["per_case"]["std_dev"],
+                               [0.1, 0.2])
+    assert back["ratio"]["pairs"][1] == {"n": 2}
+    np.testing.assert_allclose(back["ratio"]["pairs"][0]["mean"], [1.0, 2.0])
+    assert read_snapshot(tmp_path / "metrics.h5")["cases"] == [
+        "case_0001", "case_0002"]
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+h5py = pytest.importorskip("h5py")
+
+from core.tallies.merge import TALLY_MAP_FILE
+from core.tallies.statepoint import (StatepointReader, StdDevReader,
+                                     achieved_rel_err, extract_case)
+
+BATCHES = 10
+
+
+@pytest.fixture
+def statepoint(tmp_path, write_statepoint):
+    return write_statepoint(tmp_path / "statepoint.h5", {
+        "flux": (12, ["flux", "absorption"]),
+        "keff-tally": (1, ["nu-fission"]),
+    }, batches=BATCHES)
+
+
+def _raw(path, tally_id):
+    with h5py.File(path, "r") as f:
+        return f["tallies"][f"tally {tally_id}"]["results"][()]
+
+
+def test_reader_index(statepoint):
+    with StatepointReader(statepoint) as sp:
+        assert sp.tally_names == ["flux", "keff-tally"]
+        assert sp.get_tally("flux") is sp.get_tally(name="flux")
+        assert sp.keff[1] == pytest.approx(1e-3)
+        assert sp.batches == BATCHES
+        with pytest.raises(LookupError):
+            sp.get_tally("missing")
+
+
+def test_view_matches_raw_results(statepoint):
+    raw = _raw(statepoint, 1)
+    mean = raw[..., 0] / BATCHES
+    var = (raw[..., 1] / BATCHES - mean**2) / (BATCHES - 1)
+
+    with StatepointReader(statepoint) as sp:
+        view = sp.get_tally("flux")
+        assert view.shape == (12, 1, 2)
+        assert view.axes == [("bin", 12)]
+        assert view.scores == ["flux", "absorption"]
+        assert view.nuclides == ["total"]
+        np.testing.assert_allclose(view.mean[:, 0, :], mean)
+        np.testing.assert_allclose(view.std_dev[:, 0, :],
+                                   np.sqrt(np.clip(var, 0, None)))
+
+
+def test_view_selects_bins_and_scores(statepoint):
+    raw = _raw(statepoint, 1)
+    with StatepointReader(statepoint) as sp:
+        view = sp.get_tally("flux")
+        part = view.read_mean(bins=slice(3, 7), scores=["absorption"])
+        assert part.shape == (4, 1, 1)
+        np.testing.assert_allclose(part[:, 0, 0], raw[3:7, 1, 0] / BATCHES)
+
+        picked = view.read_mean(bins=np.array([0, 5, 11]), scores=[0])
+        np.testing.assert_allclose(picked[:, 0, 0],
+                                   raw[[0, 5, 11], 0, 0] / BATCHES)
+
+
+def test_std_dev_reader(statepoint):
+    with StatepointReader(statepoint) as sp:
+        view = sp.get_tally("flux")
+        errors = StdDevReader(sp).get_tally("flux")
+        np.testing.assert_allclose(errors.mean, view.std_dev)
+        np.testing.assert_allclose(errors.read_mean(bins=slice(0, 2)),
+                                   view.read(bins=slice(0, 2))[1])
+
+
+def test_chunked_results(tmp_path, write_statepoint):
+    # chunked datasets are read as hyperslabs instead of memory maps
+    path = write_statepoint(tmp_path / "statepoint.h5",
+                            {"flux": (8, ["flux"])})
+    raw = _raw(path, 1)
+    with h5py.File(path, "a") as f:
+        group = f["tallies/tally 1"]
+        del group["results"]
+        group.create_dataset("results", data=raw, chunks=(2, 1, 2))
+
+    with StatepointReader(path) as sp:
+        np.testing.assert_allclose(sp.get_tally("flux").mean[:, 0, 0],
+                                   raw[:, 0, 0] / 20)
+
+
+class Block:
+    def __init__(self, name):
+        self.name = name
+
+    def extract(self, sp):
+        return sp.get_tally(name=self.name).mean
+
+
+def test_merged_tally_views(tmp_path, write_statepoint):
+    # two blocks merged at assembly into one stored tally
+    path = write_statepoint(tmp_path / "statepoint.h5",
+                            {"a+b": (4, ["flux", "fission", "absorption"])},
+                            batches=BATCHES)
+    with open(tmp_path / TALLY_MAP_FILE, "w") as f:
+        json.dump({
+            "a": {"tally": "a+b", "scores": ["flux", "fission"]},
+            "b": {"tally": "a+b", "scores": ["absorption"]},
+        }, f)
+
+    raw = _raw(path, 1)
+    with StatepointReader(path) as sp:
+        assert sorted(sp.tally_names) == ["a", "b"]
+        a, b = sp.get_tally("a"), sp.get_tally("b")
+        assert a.shape == (4, 1, 2)
+        assert b.scores == ["absorption"]
+        np.testing.assert_allclose(b.mean[:, 0, 0],
+                                   raw[:, 2, 0] / BATCHES)
+        np.testing.assert_allclose(a.read(scores=["fission"])[0][:, 0, 0],
+                                   raw[:, 1, 0] / BATCHES)
+
+
+def test_achieved_rel_err(statepoint):
+    achieved, batches = achieved_rel_err(statepoint, [Block("flux")])
+    assert batches == BATCHES
+    with StatepointReader(statepoint) as sp:
+        view = sp.get_tally("flux")
+        expected = (view.std_dev / view.mean).max()
+    assert achieved["flux"] == pytest.approx(expected)
+
+
+def test_extract_case(statepoint):
+    extracted = extract_case(statepoint, [Block("flux"), Block("keff-tally")])
+    assert extracted["flux"].shape == (12, 1, 2)
+    assert extracted["keff-tally"].shape == (1, 1, 1)
@@ -0,0 +1,79 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+h5py = pytest.importorskip("h5py")
+
+from core.tallies.stats import Estimate, bootstrap, interval_batches
+
+
+def test_estimate_propagation():
+    a = Estimate([2.0, 4.0], [0.2, 0.3])
+    b = Estimate([1.0, 2.0], [0.1, 0.4])
+
+    total = a + b
+    np.testing.assert_allclose(total.mean, [3.0, 6.0])
+    np.testing.assert_allclose(total.std_dev, np.hypot(a.std_dev, b.std_dev))
+
+    ratio = a / b
+    np.testing.assert_allclose(ratio.mean, [2.0, 2.0])
+    np.testing.assert_allclose(ratio.rel_err,
+                               np.hypot(a.rel_err, b.rel_err))
+
+    # scalars and arrays are exact; ndarray on the left still dispatches
+    scaled = np.array([2.0, 2.0]) * a
+    assert isinstance(scaled, Estimate)
+    np.testing.assert_allclose(scaled.std_dev, [0.4, 0.6])
+    np.testing.assert_allclose((1 - a).std_dev, a.std_dev)
+
+    summed = a.sum()
+    assert summed.mean == pytest.approx(6.0)
+    assert summed.std_dev == pytest.approx(np.hypot(0.2, 0.3))
+    assert a.average().mean == pytest.approx(3.0)
+
+
+def test_pow_at_zero():
+    x = Estimate([0.0, 3.0], [0.5, 0.5])
+    square = x ** 2
+    np.testing.assert_allclose(square.mean, [0.0, 9.0])
+    np.testing.assert_allclose(square.std_dev, [0.0, 3.0])
+    assert np.isfinite((x ** 1).std_dev).all()
+
+
+def test_bootstrap_matches_standard_error():
+    rng = np.random.default_rng(1)
+    batches = rng.normal(10.0, 2.0, size=(400, 3))
+
+    result = bootstrap(lambda m: m, batches, n_resamples=2000, seed=0)
+    np.testing.assert_allclose(result.mean, batches.mean(axis=0))
+    expected = batches.std(axis=0, ddof=1) / np.sqrt(len(batches))
+    np.testing.assert_allclose(result.std_dev, expected, rtol=0.1)
+
+    # perfectly correlated inputs: their ratio has no spread
+    ratio = bootstrap(lambda x, y: x / y, batches, 2 * batches,
+                      n_resamples=200)
+    np.testing.assert_allclose(ratio.mean, 0.5)
+    np.testing.assert_allclose(ratio.std_dev, 0.0, atol=1e-12)
+
+    with pytest.raises(ValueError):
+        bootstrap(lambda x, y: x, batches, batches[:10])
+
+
+def test_interval_batches(tmp_path, write_statepoint):
+    paths = []
+    for batches in (10, 20):
+        path = tmp_path / str(batches) / f"statepoint.{batches}.h5"
+        path.parent.mkdir()
+        write_statepoint(path, {"flux": (3, ["flux"])}, batches=batches,
+                         seed=batches)
+        paths.append(path)
+
+    rows = interval_batches(paths, "flux")
+    assert rows.shape == (2, 3, 1, 1)
+
+    sums = [h5py.File(p, "r")["tallies/tally 1/results"][:, 0, 0]
+            for p in paths]
+    np.testing.assert_allclose(rows[0, :, 0, 0], sums[0] / 10)
+    np.testing.assert_allclose(rows[1, :, 0, 0], (sums[1] - sums[0]) / 10)
+
+    with pytest.raises(ValueError):
+        interval_batches(paths[::-1], "flux")
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+h5py = pytest.importorskip("h5py")
+
+from core.tallies import stream
+from core.tallies.statepoint import StatepointReader
+
+# mesh (x=4, y=3) then 5 energy bins; energy varies fastest
+SHAPE = (3, 4, 5)
+
+
+@pytest.fixture
+def reader(tmp_path, write_statepoint):
+    path = write_statepoint(tmp_path / "statepoint.h5",
+                            {"flux": (int(np.prod(SHAPE)), ["flux"])})
+
+    # add the filter layout openmc4d writes: mesh filter, energy filter
+    with h5py.File(path, "a") as f:
+        tallies = f["tallies"]
+        mesh = tallies.create_group("meshes").create_group("mesh 1")
+        mesh["dimension"] = [4, 3]
+        filters = tallies.create_group("filters")
+        for filter_id, ftype, n_bins, bins in ((1, "mesh", 12, [1]),
+                                               (2, "energy", 5, [0.0] * 6)):
+            group = filters.create_group(f"filter {filter_id}")
+            group["type"] = np.bytes_(ftype)
+            group["n_bins"] = n_bins
+            group["bins"] = bins
+        tallies["tally 1"]["filters"] = [1, 2]
+
+    with StatepointReader(path) as sp:
+        yield sp
+
+
+def _full(view):
+    mean, std_dev = view.read()
+    return mean[:, 0, 0].reshape(SHAPE), std_dev[:, 0, 0].reshape(SHAPE)
+
+
+def test_axes(reader):
+    view = reader.get_tally("flux")
+    assert view.axes == [("y", 3), ("x", 4), ("energy", 5)]
+
+
+@pytest.mark.parametrize("chunk_bins", [None, 7, 60])
+def test_project(reader, chunk_bins):
+    view = reader.get_tally("flux")
+    mean, std_dev = _full(view)
+
+    profile, error = stream.project(view, "x", chunk_bins=chunk_bins)
+    np.testing.assert_allclose(profile, mean.sum(axis=(0, 2)))
+    np.testing.assert_allclose(error, np.sqrt((std_dev**2).sum(axis=(0, 2))))
+
+    with pytest.raises(LookupError):
+        stream.project(view, "z")
+
+
+def test_region_integral_and_peak(reader):
+    view = reader.get_tally("flux")
+    mean, _ = _full(view)
+
+    total, _ = stream.region_integral(view, {"x": (1, 3), "energy": (0, 2)},
+                                      chunk_bins=11)
+    assert total == pytest.approx(mean[:, 1:3, 0:2].sum())
+
+    value, _, where = stream.peak(view, chunk_bins=8)
+    assert value == pytest.approx(mean.max())
+    idx = np.unravel_index(np.argmax(mean), SHAPE)
+    assert where == {"y": idx[0], "x": idx[1], "energy": idx[2]}
+
+
+def test_collapse_energy(reader):
+    view = reader.get_tally("flux")
+    mean, std_dev = _full(view)
+
+    groups, errors = stream.collapse_energy(view, [0, 2, 5], chunk_bins=9)
+    assert groups.shape == (3, 4, 2)
+    np.testing.assert_allclose(groups[..., 0], mean[..., :2].sum(axis=-1))
+    np.testing.assert_allclose(groups[..., 1], mean[..., 2:].sum(axis=-1))
+    np.testing.assert_allclose(
+        errors[..., 1], np.sqrt((std_dev[..., 2:]**2).sum(axis=-1)))
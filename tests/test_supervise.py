@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+from core.pipeline import executors
+from core.pipeline.executors import get_executor
+from core.pipeline.supervise import (PROGRESS_FILE, parse_progress,
+                                     run_case_async)
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32",
+                                reason="process groups are POSIX only")
+
+# stands in for openmc4d: prints two batches, then writes a statepoint;
+# run with threads (-s) it hangs until killed
+FAKE_OPENMC = """\
+import os, signal, sys, time
+if os.environ.get("FAKE_IGNORE_TERM"):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print(" Simulating batch 1", flush=True)
+print("  2/1    1.02000    1.01000 +/- 0.00100", flush=True)
+print(" Calculation Rate (active)  =  5000.0 particles/second", flush=True)
+time.sleep(60 if "-s" in sys.argv else 0)
+open("statepoint.2.h5", "w").write("results")
+"""
+
+
+@pytest.fixture
+def openmc_exec(tmp_path):
+    script = tmp_path / "fake_openmc.py"
+    script.write_text(FAKE_OPENMC)
+    exe = tmp_path / "openmc4d"
+    exe.write_text(f'#!/bin/sh\nexec {sys.executable} {script} "$@"\n')
+    exe.chmod(0o755)
+    return str(exe)
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    case_dir = tmp_path / "case_0001"
+    case_dir.mkdir()
+    (case_dir / "settings.xml").write_text(
+        "<settings><particles>1000</particles>"
+        "<inactive>1</inactive></settings>")
+    return case_dir
+
+
+def test_parse_progress():
+    assert parse_progress("  12/1    1.02345") == {
+        "event": "batch", "batch": 12, "keff": 1.02345}
+    event = parse_progress("  12/1    1.02345    1.01234 +/- 0.00123")
+    assert event["keff_mean"] == 1.01234
+    assert event["keff_std_dev"] == 0.00123
+    assert parse_progress(" Simulating batch 7") == {
+        "event": "batch", "batch": 7}
+    assert parse_progress(
+        " Calculation Rate (inactive)  =  1.5e4 particles/second") == {
+        "event": "rate", "phase": "inactive",
+        "particles_per_second": 15000.0}
+    assert parse_progress(" Reading settings XML file...") is None
+
+
+def test_run_case_async(case_dir, openmc_exec):
+    events = []
+    usage = asyncio.run(run_case_async(
+        case_dir, openmc_exec=openmc_exec, poll_interval=0.05,
+        on_progress=lambda case, event: events.append((case, event))))
+
+    assert usage["exit_status"] == 0
+    assert {"wall_time", "cpu_time", "max_rss_kb"} <= set(usage)
+    assert (case_dir / "statepoint.h5").read_text() == "results"
+    assert [e["event"] for _, e in events] == ["batch", "batch", "rate"]
+    assert events[0][0] == "case_0001"
+    second = events[1][1]
+    assert second["keff_mean"] == 1.01 and second["active"]
+    assert second["particles_per_second"] > 0
+
+    log = (case_dir / "run.log").read_text()
+    assert log.startswith("# attempt 1\n")
+    assert "Simulating batch 1" in log
+    progress = (case_dir / PROGRESS_FILE).read_text().splitlines()
+    assert json.loads(progress[0])["case"] == "case_0001"
+    assert len(progress) == 3
+
+
+def test_run_case_async_timeout(case_dir, openmc_exec):
+    with pytest.raises(RuntimeError, match="timed out") as err:
+        asyncio.run(run_case_async(
+            case_dir, threads=1, openmc_exec=openmc_exec, timeout=0.3,
+            poll_interval=0.05, attempt=2))
+    assert err.value.exit_status == -signal.SIGTERM
+    assert not (case_dir / "statepoint.h5").exists()
+    assert "# killed: timed out" in (case_dir / "run.log").read_text()
+
+
+def test_async_executor(case_dir, openmc_exec, capsys):
+    executor = get_executor("async", jobs=1, openmc_exec=openmc_exec,
+                            poll_interval=0.05, progress_interval=0)
+    executor.submit(case_dir, 1)
+    [(done_dir, attempt, usage, err)] = executor.wait()
+    executor.close()
+
+    assert (done_dir, attempt, err) == (case_dir, 1, None)
+    assert usage["wall_time"] > 0
+    out = capsys.readouterr().out
+    assert "[PROGRESS] case_0001 batch 2 k=1.01000 +/- 0.00100" in out
+    assert "[PROGRESS] case_0001 active rate 5e+03 p/s" in out
+
+
+def test_async_executor_close_kills_stubborn_cases(case_dir, openmc_exec,
+                                                   monkeypatch):
+    monkeypatch.setenv("FAKE_IGNORE_TERM", "1")
+    monkeypatch.setattr(executors, "KILL_GRACE", 0.5)
+    executor = get_executor("async", jobs=1, threads=1,
+                            openmc_exec=openmc_exec, poll_interval=0.05)
+    executor.submit(case_dir, 1)
+    deadline = time.perf_counter() + 10
+    while not executor.procs and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    (proc,) = executor.procs
+    pid = proc.pid
+
+    executor.close()
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.pipeline.surrogate import Surrogate
+
+
+def _fitted(std_dev=None):
+    X = np.linspace(0.0, 2.0, 9)
+    return Surrogate(["radius"], "keff").fit(X, np.sin(X), std_dev), X
+
+
+def test_fit_and_predict():
+    model, X = _fitted()
+    at_cases = model.predict(X[:, None])
+    np.testing.assert_allclose(at_cases.mean, np.sin(X), atol=1e-4)
+    assert at_cases.std_dev.max() < 1e-2
+
+    between = model.predict({"radius": [0.6, 1.3]})
+    np.testing.assert_allclose(between.mean, np.sin([0.6, 1.3]), atol=1e-2)
+
+    # uncertainty grows away from the finished cases
+    far = model.predict({"radius": 5.0})
+    assert far.std_dev[0] > 10 * at_cases.std_dev.max()
+
+    with pytest.raises(KeyError):
+        model.predict({"height": 1.0})
+    with pytest.raises(ValueError):
+        Surrogate(["radius"], "keff").fit([1.0], [1.0])
+
+
+def test_save_and_load(tmp_path):
+    model, _ = _fitted(std_dev=np.full(9, 0.01))
+    path = tmp_path / "surrogates" / "keff.npz"
+    model.save(path)
+
+    loaded = Surrogate.load(path)
+    assert loaded.inputs == ["radius"] and loaded.target == "keff"
+    points = {"radius": np.linspace(-0.5, 2.5, 13)}
+    a, b = model.predict(points), loaded.predict(points)
+    np.testing.assert_allclose(a.mean, b.mean)
+    np.testing.assert_allclose(a.std_dev, b.std_dev)
+
+
+def test_suggest_spreads_points():
+    X = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    model = Surrogate(["a", "b"], "y").fit(X, X.sum(axis=1))
+    points = model.suggest(3, seed=0)
+    assert points.shape == (3, 2)
+    assert len({tuple(p) for p in points}) == 3
+
+    # the model is left as fitted
+    np.testing.assert_allclose(model.X, X)
+    np.testing.assert_allclose(model.predict(X).mean, X.sum(axis=1),
+                               atol=1e-4)
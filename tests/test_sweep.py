@@ -0,0 +1,80 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.pipeline.schedule import WAIT
+from core.pipeline.sweep import Bisect, get_sweep
+
+
+def test_cartesian_default():
+    params = {"a": [1, 2], "b": ["x", "y"], "c": 0}
+    cases = list(get_sweep(params, None).cases())
+    assert cases == [
+        {"a": 1, "b": "x", "c": 0}, {"a": 1, "b": "y", "c": 0},
+        {"a": 2, "b": "x", "c": 0}, {"a": 2, "b": "y", "c": 0},
+    ]
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown sweep"):
+        get_sweep({}, {"strategy": "grid-search"})
+
+
+def test_lhs_covers_every_stratum():
+    params = {
+        "radius": {"min": 1.0, "max": 2.0},
+        "density": {"min": 1e-3, "max": 1e-1, "log": True},
+        "tubes": {"min": 2, "max": 10, "integer": True},
+        "fuel": ["uo2", "mox"],
+        "fixed": 7,
+    }
+    cases = list(get_sweep(params, {"strategy": "lhs", "samples": 8,
+                                    "seed": 3}).cases())
+    assert len(cases) == 8
+
+    radius = np.array([c["radius"] for c in cases])
+    assert sorted(np.floor((radius - 1.0) * 8).astype(int)) == list(range(8))
+    assert all(1e-3 <= c["density"] <= 1e-1 for c in cases)
+    assert all(isinstance(c["tubes"], int) and 2 <= c["tubes"] <= 10
+               for c in cases)
+    assert {c["fuel"] for c in cases} <= {"uo2", "mox"}
+    assert all(c["fixed"] == 7 for c in cases)
+
+    again = list(get_sweep(params, {"strategy": "lhs", "samples": 8,
+                                    "seed": 3}).cases())
+    assert again == cases
+
+
+def test_bisect_waits_and_converges():
+    # objective: keff = 0.9 + 0.1 * radius, target 1.0 at radius 1.0
+    sweep = get_sweep({"radius": {"min": 0.0, "max": 4.0}},
+                      {"strategy": "bisect", "param": "radius", "target": 1.0,
+                       "tolerance": 1e-3, "max_cases": 30})
+    assert isinstance(sweep, Bisect) and sweep.adaptive
+    sweep.objective = lambda keff: keff
+
+    stream = sweep.cases()
+    lo, hi = next(stream), next(stream)
+    assert (lo["radius"], hi["radius"]) == (0.0, 4.0)
+    assert next(stream) is WAIT
+
+    for case in (lo, hi):
+        sweep.observe(case, 0.9 + 0.1 * case["radius"])
+    last = None
+    for case in stream:
+        if case is WAIT:
+            sweep.observe(last, 0.9 + 0.1 * last["radius"])
+            continue
+        last = case
+    assert last["radius"] == pytest.approx(1.0, abs=1e-2)
+    assert abs(sweep.values[last["radius"]]) <= 1e-3
+
+
+def test_bisect_stops_on_failed_end_point():
+    sweep = get_sweep({"radius": {"min": 0.0, "max": 1.0}},
+                      {"strategy": "bisect", "param": "radius"})
+    stream = sweep.cases()
+    lo, hi = next(stream), next(stream)
+    sweep.observe(lo, None)
+    sweep.observe(hi, None)
+    assert list(stream) == []
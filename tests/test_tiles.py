@@ -0,0 +1,157 @@
+import json
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+
+from core.pipeline import tiles
+
+PALETTE = [(200, 0, 0), (0, 200, 0)]
+
+
+def test_id_colours_round_trip():
+    ids = np.array([[0, 1, 255], [256, 70000, tiles.VOID]])
+    rgb = np.array([[tiles._encode(i) if i != tiles.VOID
+                     else tiles.BACKGROUND for i in row] for row in ids])
+    # matplotlib reads PNGs back as floats in [0, 1]
+    np.testing.assert_array_equal(tiles._decode(rgb / 255.0), ids)
+
+
+def test_colorize():
+    ids = np.array([[tiles.VOID, 3], [4, 5]])
+    rgb = tiles.colorize(ids, {5: (1, 2, 3)}, PALETTE)
+    assert rgb.shape == (2, 2, 3) and rgb.dtype == np.uint8
+    assert tuple(rgb[0, 0]) == tiles.BACKGROUND
+    assert tuple(rgb[0, 1]) == PALETTE[1]
+    assert tuple(rgb[1, 0]) == PALETTE[0]
+    assert tuple(rgb[1, 1]) == (1, 2, 3)
+
+
+def test_raster_shape():
+    assert tiles.raster_shape([4.0, 2.0], [30, 10]) == (30, 10)
+    assert tiles.raster_shape([4.0, 1.0], 400) == (40, 10)
+
+
+class Plot:
+    pass
+
+
+class Plots:
+    """
+    Stands in for openmc4d plotting: exporting the plot stores it, and
+    plot_geometry paints its left half with the first cell's colour.
+    """
+    exported = {}
+
+    def __init__(self, plots):
+        self.plots = plots
+
+    def export_to_xml(self, directory):
+        Plots.exported[directory] = self.plots[0]
+
+    @staticmethod
+    def plot_geometry(output, openmc_exec, cwd):
+        import matplotlib.image as mpimg
+
+        plot = Plots.exported.pop(cwd)
+        n_h, n_v = plot.pixels
+        rgb = np.full((n_v, n_h, 3), plot.background, dtype=np.uint8)
+        rgb[:, :n_h // 2] = plot.colors[min(plot.colors)]
+        mpimg.imsave(f"{cwd}/{plot.filename}.png", rgb)
+
+
+def test_render_tile(tmp_path, monkeypatch):
+    monkeypatch.setattr(tiles, "mc", types.SimpleNamespace(
+        Plot=Plot, Plots=Plots, plot_geometry=Plots.plot_geometry))
+    (tmp_path / "geometry.xml").write_text(
+        '<geometry><cell id="70000"/><cell id="71000"/></geometry>')
+    view = {"basis": "xy", "color_by": "cell", "origin": [0.0, 0.0, 0.0],
+            "width": [4.0, 4.0], "pixels": [8, 8]}
+    path = tmp_path / "tiles" / "tile.npy"
+
+    # several cases rendering one tile at once each write their own file
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: tiles.render_tile(tmp_path, view, path),
+                      range(8)))
+    ids = np.load(path)
+    assert (ids[:, :4] == 70000).all() and (ids[:, 4:] == tiles.VOID).all()
+    assert [p.name for p in path.parent.iterdir()] == ["tile.npy"]
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """
+    Replaces openmc4d rasterization: each pixel's id encodes its
+    lattice row and column, so the mosaic can be checked exactly.
+    """
+    calls = []
+
+    def render_tile(case_dir, view, path):
+        d = view["width"][0] / view["pixels"][0]
+        h_axis, v_axis = tiles.BASES[view["basis"]]
+        col = round((view["origin"][h_axis] - view["width"][0] / 2) / d)
+        row = round(-(view["origin"][v_axis] + view["width"][1] / 2) / d)
+        rows, cols = np.indices(view["pixels"][::-1])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, (row + rows) * 1000 + (col + cols))
+        calls.append(path)
+        return path
+
+    monkeypatch.setattr(tiles, "render_tile", render_tile)
+    return calls
+
+
+@pytest.fixture
+def mosaic(tmp_path, monkeypatch):
+    """
+    Renders a slice and returns its id raster instead of colours.
+    """
+    captured = []
+
+    def colorize(ids, colors, palette):
+        captured.append(ids.copy())
+        return np.zeros(ids.shape + (3,), dtype=np.uint8)
+
+    monkeypatch.setattr(tiles, "colorize", colorize)
+
+    def render(**cfg):
+        cfg = {"tiles": 4, "width": [10.0, 6.0], "pixels": [10, 6], **cfg}
+        tiles.plot_tiled(tmp_path, cfg, "geom", tmp_path / "tiles",
+                         PALETTE, tmp_path / "slice.png")
+        return captured[-1]
+
+    return render
+
+
+def test_plot_tiled_assembles_and_caches(rendered, mosaic):
+    ids = mosaic(origin=[1.0, 2.0, 0.0])
+    # columns -4..5, rows -5..0 of the unit pixel lattice: 3 x 3 tiles
+    rows, cols = np.indices((6, 10))
+    np.testing.assert_array_equal(ids, (rows - 5) * 1000 + cols - 4)
+    assert len(rendered) == 9
+
+    # same view: every tile cached; pan by one tile: only new ones
+    mosaic(origin=[1.0, 2.0, 0.0])
+    assert len(rendered) == 9
+    ids = mosaic(origin=[5.0, 2.0, 0.0])
+    np.testing.assert_array_equal(ids, (rows - 5) * 1000 + cols)
+    assert len(rendered) == 12
+
+    # another slice position is a different set of tiles
+    mosaic(origin=[1.0, 2.0, 1.0])
+    assert len(rendered) == 21
+
+
+def test_write_pyramid(tmp_path):
+    ids = np.arange(100).reshape(10, 10)
+    root = tiles.write_pyramid(ids, {}, PALETTE, 4, tmp_path / "slice.png")
+
+    meta = json.loads((root / "pyramid.json").read_text())
+    assert meta["tile_size"] == 4
+    assert [lvl["shape"] for lvl in meta["levels"]] == [
+        [10, 10], [5, 5], [3, 3]]
+    assert len(list((root / "0").glob("*.png"))) == 9
+    assert len(list((root / "2").glob("*.png"))) == 1
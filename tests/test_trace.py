@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from core.pipeline import trace
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    def start(fmt="jsonl", profile=()):
+        return trace.start(tmp_path / "trace" / f"trace.{fmt}", fmt=fmt,
+                           profile=profile)
+    yield start
+    trace.stop()
+
+
+def test_hooks_are_noops_without_tracer():
+    with trace.stage("model_build", "case_0001"):
+        pass
+    trace.record("transport", "case_0001", wall_time=1.0)
+
+
+def test_jsonl_records(tracer):
+    t = tracer()
+    with trace.stage("model_build", "case_0001"):
+        sum(range(1000))
+    trace.record("transport", "case_0001", wall_time=2.0, cpu_time=1.5)
+    trace.stop()
+
+    records = [json.loads(line) for line in t.path.read_text().splitlines()]
+    assert [(r["stage"], r["case"]) for r in records] == [
+        ("model_build", "case_0001"), ("transport", "case_0001")]
+    assert {"wall_time", "cpu_time", "max_rss_kb"} <= set(records[0])
+    assert records[1]["wall_time"] == 2.0 and records[1]["cpu_time"] == 1.5
+
+
+def test_chrome_lanes(tracer):
+    t = tracer(fmt="chrome")
+    for case in ("case_0001", "case_0002", "case_0001"):
+        trace.record("transport", case, wall_time=1.0)
+    trace.stop()
+
+    events = json.loads(t.path.read_text())["traceEvents"]
+    lanes = {e["args"]["name"]: e["tid"] for e in events if e["ph"] == "M"}
+    assert lanes == {"case_0001": 0, "case_0002": 1}
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["tid"] for e in spans] == [0, 1, 0]
+    assert spans[0]["dur"] == pytest.approx(1e6)
+
+
+def test_profiled_stage(tracer):
+    t = tracer(profile=["scrape"])
+    with trace.stage("scrape"):
+        sorted(range(1000))
+    with trace.stage("model_build", "case_0001"):
+        pass
+    assert [p.name for p in t.profile_dir.glob("*.prof")] == [
+        "scrape-study.prof"]
+
+
+def _work(n):
+    return sum(range(n))
+
+
+def test_measured(tmp_path):
+    result, usage = trace.measured(_work, 1000)
+    assert result == sum(range(1000))
+    assert {"wall_time", "cpu_time"} <= set(usage)
+    assert "profile" not in usage
+
+    path = tmp_path / "work.prof"
+    _, usage = trace.measured(_work, 1000, profile=path)
+    assert usage["profile"] == str(path) and path.exists()
+
+
+def test_unprofiled_stage_reported_once(tracer, capsys):
+    t = tracer(profile=["plot", "transport"])
+    assert trace.profile_path("plot", "case_0001") == (
+        t.profile_dir / "plot-case_0001.prof")
+    assert trace.profile_path("scrape") is None
+
+    for case in ("case_0001", "case_0002"):
+        trace.record("transport", case, wall_time=1.0)
+    assert capsys.readouterr().out.count("cannot be profiled") == 1
+
+
+def test_profile_path_is_a_safe_file_name(tracer):
+    t = tracer(profile=["metric:k/eff"])
+    assert trace.profile_path("metric:k/eff") == (
+        t.profile_dir / "metric_k_eff-study.prof")
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        trace.Tracer(tmp_path / "trace.txt", fmt="csv")
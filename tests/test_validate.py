@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from core.pipeline import validate
+from core.pipeline.manifest import Manifest
+from core.pipeline.schedule import WAIT
+
+
+def test_parse_entry():
+    assert validate.parse_entry("m") == ("m", {})
+    assert validate.parse_entry({"name": "m", "x": 1}) == (
+        "m", {"name": "m", "x": 1})
+    assert validate.parse_entry({"m": {"x": 1}}) == ("m", {"x": 1})
+    assert validate.parse_entry({"m": None}) == ("m", {})
+    with pytest.raises(TypeError):
+        validate.parse_entry({"a": 1, "b": 2})
+
+
+def test_check_analysis():
+    analysis = {"metrics": ["production-ratio"]}
+    assert validate.check_analysis(analysis, ["nu-fission",
+                                              "absorption"]) == []
+
+    problems = validate.check_analysis(analysis, ["nu-fission"])
+    assert len(problems) == 1
+    assert "absorption" in problems[0]
+
+    problems = validate.check_analysis(
+        {"metrics": ["no-such-metric"], "artifacts": ["no-such-plot"]}, [])
+    assert len(problems) == 2
+    assert "unknown metric 'no-such-metric'" in problems[0]
+    assert "unknown artifact 'no-such-plot'" in problems[1]
+
+
+def test_example_study_feeds_its_metrics():
+    study = Path(__file__).resolve().parents[1] / "studies" / "example"
+    with open(study / "study.yaml", "r") as f:
+        tallies = [validate.parse_entry(t)[0]
+                   for t in yaml.safe_load(f)["tallies"]]
+    analysis = {"metrics": ["production-ratio"]}
+    assert validate.check_analysis(analysis, tallies) == []
+
+
+class Sweep:
+    def __init__(self, cases, adaptive=False, max_cases=None):
+        self._cases = cases
+        self.adaptive = adaptive
+        self.max_cases = max_cases
+
+    def cases(self):
+        yield from self._cases
+
+
+def test_plan_cases():
+    cases = [{"tube_radius": r} for r in (1.0, 2.0)]
+    assert validate.plan_cases(Sweep(cases)) == (cases, 2)
+
+    # adaptive sweeps stop at their first wait, bounded by max_cases
+    sweep = Sweep(cases + [WAIT, {"tube_radius": 3.0}], True, 8)
+    assert validate.plan_cases(sweep) == (cases, 8)
+
+
+def test_case_work():
+    params = {"particles": 1000, "batches": 20}
+    assert validate.case_work(params) == 20000
+    assert validate.case_work(params, {"max_batches": 50}) == 50000
+
+
+def _study(root, name, model, entries):
+    (root / name).mkdir()
+    (root / name / "study_frozen.yaml").write_text(f"model: {model}\n")
+    manifest = Manifest(root / name / "manifest.json")
+    for case, fields in entries.items():
+        manifest.update(case, **fields)
+
+
+def test_calibrate(tmp_path):
+    params = {"particles": 100, "batches": 10}
+    _study(tmp_path, "a", "pin", {
+        "case_0000": dict(state="done", params=params, wall_time=2.0),
+        # early stopped after 5 batches
+        "case_0001": dict(state="done", params=params, wall_time=1.0,
+                          batches=5),
+        "case_0002": dict(state="done", params=params, wall_time=9.0,
+                          cached=True),
+        "case_0003": dict(state="failed", params=params, wall_time=9.0),
+    })
+    _study(tmp_path, "b", "lattice", {
+        "case_0000": dict(state="done", params=params, wall_time=10.0),
+    })
+
+    rate, n = validate.calibrate(tmp_path, "pin")
+    assert n == 2
+    assert rate == pytest.approx(3.0 / 1500)
+
+    # no study of this model: fall back to every other one
+    rate, n = validate.calibrate(tmp_path, "other")
+    assert n == 3
+    assert rate == pytest.approx(13.0 / 2500)
+
+    assert validate.calibrate(tmp_path / "empty") == (None, 0)
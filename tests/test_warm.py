@@ -0,0 +1,78 @@
+import types
+
+import pytest
+
+from core.pipeline import warm
+from core.pipeline.schedule import WAIT
+from core.pipeline.warm import WarmStart, apply_warm_start, distance
+
+
+def test_distance():
+    assert distance({"r": 1.0, "n": 4}, {"r": 1.0, "n": 4}) == 0.0
+    assert distance({"r": 1.0}, {"r": 2.0}) == pytest.approx(0.5)
+    assert distance({"r": 1.0, "n": 4}, {"r": 2.0, "n": 5},
+                    keys=["n"]) == pytest.approx(0.2)
+    assert distance({"fuel": "uo2"}, {"fuel": "mox"}) == float("inf")
+
+
+def test_order_chains_neighbours():
+    items = list(enumerate([{"r": 1.0}, {"r": 4.0}, {"r": 2.0},
+                            {"r": 3.0}]))
+    chain = WarmStart({}).order(items)
+    assert [i for i, _ in chain] == [0, 2, 3, 1]
+    assert WarmStart({}).order([]) == []
+
+
+def _statepoint(tmp_path, name):
+    path = tmp_path / f"{name}.h5"
+    path.write_text("")
+    return path
+
+
+def test_seed_is_nearest_earlier_case(tmp_path):
+    start = WarmStart({"inactive": 5})
+    assert start.seed_for({"r": 1.0}) == (None, None)
+
+    for name, r in (("a", 1.0), ("b", 3.0), ("c", 2.1), ("d", 2.0)):
+        start.add(name, {"r": r})
+    start.record("a", _statepoint(tmp_path, "a"), "key-a")
+    start.record("b", _statepoint(tmp_path, "b"), "key-b")
+    # failed or missing cases are never seeds
+    start.record("c", None, "key-c")
+    start.record("d", tmp_path / "missing.h5", "key-d")
+
+    # the seed's cache key comes with it, for the seeded case's key
+    assert start.seed_for({"r": 2.5}) == (tmp_path / "b.h5", "key-b")
+    assert start.seed_for({"r": 1.2}) == (tmp_path / "a.h5", "key-a")
+    assert start.seed_for({"fuel": "mox"}) == (None, None)
+
+
+def test_seed_waits_for_running_case(tmp_path):
+    start = WarmStart({})
+    start.add("a", {"r": 1.0})
+    start.add("b", {"r": 2.0})
+    start.record("a", _statepoint(tmp_path, "a"), "key-a")
+
+    # b is nearer and still running: wait rather than take a
+    assert start.seed_for({"r": 2.2}) is WAIT
+    start.record("b", _statepoint(tmp_path, "b"), "key-b")
+    assert start.seed_for({"r": 2.2}) == (tmp_path / "b.h5", "key-b")
+
+
+def test_seed_skips_cases_in_flight(tmp_path):
+    # with three cases in flight, the two just before are not seeds
+    start = WarmStart({}, lag=3)
+    for name, r in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+        start.add(name, {"r": r})
+    assert start.seed_for({"r": 3.1}) is WAIT
+    start.record("a", _statepoint(tmp_path, "a"), "key-a")
+    assert start.seed_for({"r": 3.1}) == (tmp_path / "a.h5", "key-a")
+
+
+def test_apply_warm_start(monkeypatch):
+    monkeypatch.setattr(warm, "mc",
+                        types.SimpleNamespace(FileSource=lambda p: ("file", p)))
+    settings = types.SimpleNamespace(batches=150, inactive=50, source=None)
+    apply_warm_start(settings, "statepoint.h5", 10)
+    assert settings.source == ("file", "statepoint.h5")
+    assert (settings.inactive, settings.batches) == (10, 110)